@@ -25,11 +25,12 @@
 
 """
 # встроенные модули
-from typing import Any, Optional, Collection, List, Generator, Union
+from typing import Any, Optional, Collection, List, Generator, Union, Iterable
 
 # модули проекта
 from trivial_tools.special.special import fail
 from trivial_tools.formatters.base import s_type
+from trivial_tools.containers.class_carousel_view import CarouselView
 
 
 class Carousel:
@@ -152,6 +153,56 @@ class Carousel:
 
         return old_value
 
+    def _as_block(self, source: Iterable[Any]) -> List[Any]:
+        """
+        Привести входную пачку элементов к типу внутреннего хранилища
+        """
+        if isinstance(source, list):
+            return source
+        return list(source)
+
+    def push_many(self, source: Iterable[Any]) -> List[Any]:
+        """
+        Добавить в карусель целую пачку элементов
+
+        Работает как последовательный вызов push, но укладывает данные в хранилище
+        не более чем двумя присваиваниями среза
+
+        :param source: последовательность новых элементов
+        :return: старые элементы, которые были вытолкнуты при добавлении (в порядке добавления)
+        """
+        values = self._as_block(source)
+        total = len(values)
+
+        if not total:
+            return values[:0]
+
+        if total >= self.window:
+            # новая пачка полностью замещает содержимое
+            edge = total - self.window
+            evicted = self.get_contents() + values[:edge]
+            self._data[:] = values[edge:]
+            self._index = 0
+            self._len = self.window
+            return evicted
+
+        index = self._index
+        head = min(total, self.window - index)
+        tail = total - head
+
+        old_values = self._data[index:index + head] + self._data[:tail]
+        self._data[index:index + head] = values[:head]
+        if tail:
+            # пустое присваивание среза array считает изменением размера
+            self._data[:tail] = values[head:]
+
+        # вытолкнуты только те ячейки, которые были заполнены до нас
+        pushed_out = max(0, self._len + total - self.window)
+        self._index = (index + total) % self.window
+        self._len = min(self._len + total, self.window)
+
+        return old_values[total - pushed_out:]
+
     def resize(self, new_window: int) -> None:
         """
         Изменить размер карусели
@@ -173,6 +224,16 @@ class Carousel:
         result = [x for x in self._internals() if x is not self._sentinel]
         return result
 
+    def view(self) -> CarouselView:
+        """
+        Получить представление содержимого в порядке добавления без копирования
+
+        Представление действительно до следующего изменения карусели
+        """
+        if self._len == self.window:
+            return CarouselView(self._data, self._index, self._len)
+        return CarouselView(self._data, 0, self._len)
+
     def extract(self) -> List[Any]:
         """
         Получить копию внутреннего хранилища и очистить его
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Представление содержимого карусели без копирования
+
+    Внутреннее хранилище карусели закольцовано, поэтому элементы в порядке добавления
+    лежат в нём двумя отрезками: от текущего индекса до конца и от начала до индекса.
+    Представление запоминает только границы этих отрезков и читает данные напрямую
+    из хранилища, поэтому создаётся за O(1).
+
+    Пример работы с представлением:
+    c = Carousel([1, 2, 3, 4], window=3)  # внутреннее хранилище: [4, 2, 3]
+    v = c.view()
+    len(v) --> 3
+    v[0] --> 2
+    list(v) --> [2, 3, 4]
+
+    Представление отражает состояние карусели на момент своего создания и становится
+    недействительным после следующего изменения карусели.
+
+"""
+# встроенные модули
+from itertools import chain
+from typing import Any, Iterator, List, Sequence, Tuple, Union
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+
+
+class CarouselView:
+    """
+    Упорядоченное представление содержимого карусели, только для чтения
+    """
+    __slots__ = ('_data', '_start', '_len', '_window')
+
+    def __init__(self, data: Sequence, start: int, length: int):
+        """
+        Создание экземпляра
+
+        :param data: внутреннее хранилище карусели
+        :param start: индекс самого старого элемента в хранилище
+        :param length: количество заполненных ячеек
+        """
+        self._data = data
+        self._start = start
+        self._len = length
+        self._window = len(data)
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return f'{s_type(self)}(len={self._len}, start={self._start})'
+
+    def __len__(self) -> int:
+        """
+        Количество элементов в представлении
+        """
+        return self._len
+
+    def _bounds(self) -> Tuple[int, int]:
+        """
+        Длины первого и второго отрезков хранилища
+        """
+        head = min(self._len, self._window - self._start)
+        return head, self._len - head
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Проитерироваться по элементам в порядке добавления
+        """
+        head, tail = self._bounds()
+        getter = self._data.__getitem__
+        return chain(map(getter, range(self._start, self._start + head)),
+                     map(getter, range(tail)))
+
+    def __getitem__(self, item: Union[int, slice]) -> Any:
+        """
+        Обратиться к элементу по индексу в порядке добавления
+
+        :param item: ключ индексации
+        :return: элемент или список элементов для среза
+        """
+        if isinstance(item, int):
+            if not -self._len <= item < self._len:
+                fail(f'В экземпляре {s_type(self)} нет элемента с индексом {item!r}',
+                     reason=IndexError)
+
+            index = self._start + item % self._len
+            if index >= self._window:
+                index -= self._window
+            return self._data[index]
+
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(self._len))]
+
+        fail(f"Тип {s_type(self)} поддерживает работу только с индексами int и slice!",
+             reason=IndexError)
+
+    def segments(self) -> Tuple[memoryview, memoryview]:
+        """
+        Получить два отрезка хранилища в порядке добавления в виде memoryview
+
+        Доступно только для хранилищ, поддерживающих buffer protocol
+        (например у NumericCarousel). Отрезки можно передать в векторизованный код
+        без копирования
+        """
+        try:
+            buffer = memoryview(self._data)
+        except TypeError as exc:
+            fail(f'Хранилище {s_type(self._data)} не поддерживает buffer protocol',
+                 raise_from=exc)
+
+        head, tail = self._bounds()
+        return buffer[self._start:self._start + head], buffer[0:tail]
+
+    def tolist(self) -> List[Any]:
+        """
+        Получить копию содержимого в виде списка
+        """
+        return list(self)
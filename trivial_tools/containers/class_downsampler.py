@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Класс для прореживания данных: сворачивание строк с метками времени в интервалы
+    фиксированной длины (секунды в минуты, минуты в часы и т.п.)
+
+    Для текущего интервала хранится только сумма, количество, минимум, максимум и
+    последнее значение по каждому столбцу, поэтому состояние не зависит от количества
+    строк, а всё прореживание выполняется за один проход.
+
+    Пример работы с контейнером:
+
+    d = Downsampler(interval=60, aggregates=('mean', 'max'), epoch=True)
+    d.push((0, 1.0))    # []
+    d.push((30, 3.0))   # []
+    d.push((60, 7.0))   # [[0, 2.0, 3.0]]
+    d.flush()           # [[60, 7.0, 7.0]]
+
+    Интервалы без единой строки не выдаются. Значения None (например заполнители
+    от Resampler) в агрегаты не попадают.
+
+"""
+# встроенные модули
+from datetime import timedelta
+from typing import Any, Iterable, List, Sequence
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+
+AGGREGATES = ('mean', 'min', 'max', 'sum', 'count', 'last')
+
+
+class Downsampler:
+    """
+    Сворачивает строки с метками времени в интервалы фиксированной длины.
+    Создаётся по одному экземпляру на источник данных
+    """
+    __slots__ = ('interval', 'datetime_index', 'aggregates', 'epoch', '_bucket', '_moment',
+                 '_counts', '_sums', '_mins', '_maxes', '_lasts')
+
+    def __init__(self, interval: int = 60, datetime_index: int = 0,
+                 aggregates: Sequence[str] = ('mean',), epoch: bool = False):
+        """
+        Создание экземпляра
+
+        :param interval: длина интервала в секундах (60 - минуты, 3600 - часы)
+        :param datetime_index: индекс метки времени в кортеже данных
+        :param aggregates: какие агрегаты выдавать по каждому столбцу и в каком порядке
+        (mean, min, max, sum, count, last)
+        :param epoch: метки времени приходят целыми секундами эпохи вместо datetime
+        """
+        unknown = [x for x in aggregates if x not in AGGREGATES]
+        if interval < 1 or not aggregates or unknown:
+            fail(f'Для создания экземпляра {s_type(self)} необходимо указать положительный '
+                 f'интервал и агрегаты из списка {AGGREGATES}', reason=ValueError)
+
+        self.interval = interval
+        self.datetime_index = datetime_index
+        self.aggregates = tuple(aggregates)
+        self.epoch = epoch
+        self.clear()
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return (f'{s_type(self)}(interval={self.interval}, '
+                f'datetime_index={self.datetime_index}, aggregates={self.aggregates!r})')
+
+    def _start(self, bucket: int, moment: Any, width: int) -> None:
+        """
+        Начать новый интервал
+        """
+        self._bucket = bucket
+        if self.epoch:
+            self._moment = bucket
+        else:
+            self._moment = moment - timedelta(seconds=moment.timestamp() - bucket)
+        self._counts = [0] * width
+        self._sums = [0] * width
+        self._mins = [None] * width
+        self._maxes = [None] * width
+        self._lasts = [None] * width
+
+    def _collect(self) -> list:
+        """
+        Собрать выходную строку по текущему интервалу
+        """
+        row = [self._moment]
+        for i, count in enumerate(self._counts):
+            if i == self.datetime_index:
+                continue
+
+            for name in self.aggregates:
+                if name == 'mean':
+                    row.append(self._sums[i] / count if count else None)
+                elif name == 'min':
+                    row.append(self._mins[i])
+                elif name == 'max':
+                    row.append(self._maxes[i])
+                elif name == 'sum':
+                    row.append(self._sums[i])
+                elif name == 'count':
+                    row.append(count)
+                else:
+                    row.append(self._lasts[i])
+        return row
+
+    def push(self, payload: tuple) -> List[list]:
+        """
+        Добавить строку данных с меткой времени
+
+        :param payload: кортеж данных с временной меткой
+        :return: список завершённых интервалов (пустой или из одной строки)
+        """
+        if not payload:
+            return []
+
+        moment = payload[self.datetime_index]
+        seconds = moment if self.epoch else int(moment.timestamp())
+        bucket = seconds - seconds % self.interval
+
+        result = []
+        if self._bucket is None:
+            self._start(bucket, moment, len(payload))
+
+        elif bucket > self._bucket:
+            result.append(self._collect())
+            self._start(bucket, moment, len(payload))
+
+        elif bucket < self._bucket:
+            # это значение слишком старое
+            return []
+
+        counts, sums, mins, maxes, lasts = (self._counts, self._sums, self._mins,
+                                            self._maxes, self._lasts)
+        for i, value in enumerate(payload):
+            if i == self.datetime_index or value is None:
+                continue
+
+            counts[i] += 1
+            sums[i] += value
+            lasts[i] = value
+            if mins[i] is None or value < mins[i]:
+                mins[i] = value
+            if maxes[i] is None or value > maxes[i]:
+                maxes[i] = value
+
+        return result
+
+    def push_batch(self, rows: Iterable[tuple]) -> List[list]:
+        """
+        Добавить пачку отсортированных по времени строк за один проход
+
+        :param rows: последовательность кортежей данных с временной меткой
+        :return: список завершённых интервалов
+        """
+        result = []
+        for payload in rows:
+            result.extend(self.push(payload))
+        return result
+
+    def flush(self) -> List[list]:
+        """
+        Выдать текущий незавершённый интервал и сбросить состояние
+        """
+        if self._bucket is None:
+            return []
+
+        result = [self._collect()]
+        self.clear()
+        return result
+
+    def clear(self) -> None:
+        """
+        Сбросить в исходное состояние
+        """
+        self._bucket = None
+        self._moment = None
+        self._counts = []
+        self._sums = []
+        self._mins = []
+        self._maxes = []
+        self._lasts = []
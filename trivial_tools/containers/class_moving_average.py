@@ -16,7 +16,7 @@
 
 """
 # встроенные модули
-from typing import Union, Optional, Sequence, Any
+from typing import Union, Optional, Sequence, Any, Iterable, List
 
 # модули проекта
 from trivial_tools.containers.class_moving_sum import MovingSum
@@ -30,16 +30,17 @@ class MovingAverage(MovingSum):
     __slots__ = ('_avg',)
 
     def __init__(self, source: Optional[Sequence] = None,
-                 window: int = 0, sentinel: Any = object()):
+                 window: int = 0, sentinel: Any = object(), correction: Optional[str] = None):
         """
         Создание экземпляра
 
         :param source: исходная коллекция элементов, на базе которой надо собрать экземпляр
         :param window: максимальное киличество элементов (ширина окна вычисления)
         :param sentinel: элемент для заполнения пустых ячеек (можно добавить свой)
+        :param correction: режим борьбы с накоплением ошибки округления (см. MovingSum)
         """
         self._avg = 0.0
-        super().__init__(source, window, sentinel)
+        super().__init__(source, window, sentinel, correction)
 
     def push(self, value: Union[int, float]) -> None:
         """
@@ -52,7 +53,19 @@ class MovingAverage(MovingSum):
         :param value: новое число, которое соответствует сдвигу окна среднего на один элемент
         """
         super().push(value)
-        self._avg = self._sum / len(self)
+        self._avg = self.sum / len(self)
+
+    def push_many(self, source: Iterable[Union[int, float]]) -> List[Union[int, float]]:
+        """
+        Добавить в контейнер целую пачку чисел
+
+        :param source: последовательность новых чисел
+        :return: вытолкнутые при добавлении числа
+        """
+        evicted = super().push_many(source)
+        if len(self):
+            self._avg = self.sum / len(self)
+        return evicted
 
     def restore(self) -> None:
         """
@@ -77,4 +90,4 @@ class MovingAverage(MovingSum):
         :param value: данные для записи (любой тип)
         """
         super().__setitem__(key, value)
-        self._avg = self._sum / len(self)
+        self._avg = self.sum / len(self)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Основа для контейнеров скользящего минимума и максимума
+
+    Рядом с кольцевым хранилищем ведётся монотонная очередь: в ней лежат только те элементы
+    окна, которые ещё могут стать экстремумом. Каждый элемент попадает в очередь и
+    покидает её не более одного раза, поэтому добавление стоит O(1) амортизированно,
+    а экстремум всегда лежит в голове очереди.
+
+    Пример работы монотонной очереди для максимума с окном 3:
+    push(5)  # очередь: [5]
+    push(3)  # очередь: [5, 3]
+    push(4)  # очередь: [5, 4]     3 уже никогда не станет максимумом
+    push(1)  # очередь: [4, 1]     5 вышла из окна
+
+"""
+# встроенные модули
+from collections import deque
+from typing import Union, Optional, Sequence, Any, Iterable, List, Callable, Tuple, Deque
+
+# модули проекта
+from trivial_tools.containers.class_carousel import Carousel
+
+
+class MonotonicQueue:
+    """
+    Монотонная очередь пар (позиция в потоке, значение)
+    """
+    __slots__ = ('_items', '_dominates')
+
+    def __init__(self, dominates: Callable[[Any, Any], bool]):
+        """
+        Создание экземпляра
+
+        :param dominates: функция сравнения, возвращающая True, если новое значение
+        делает старое бесполезным (operator.ge для максимума, operator.le для минимума)
+        """
+        self._items: Deque[Tuple[int, Any]] = deque()
+        self._dominates = dominates
+
+    def __len__(self) -> int:
+        """
+        Количество кандидатов в очереди
+        """
+        return len(self._items)
+
+    @property
+    def front(self) -> Optional[Any]:
+        """
+        Текущий экстремум (None для пустой очереди)
+        """
+        if self._items:
+            return self._items[0][1]
+        return None
+
+    def push(self, position: int, value: Any) -> None:
+        """
+        Добавить значение, выбросив с конца все доминируемые им элементы
+        """
+        items = self._items
+        dominates = self._dominates
+        while items and dominates(value, items[-1][1]):
+            items.pop()
+        items.append((position, value))
+
+    def evict(self, oldest: int) -> None:
+        """
+        Выбросить из головы элементы, позиция которых вышла за пределы окна
+        """
+        items = self._items
+        while items and items[0][0] < oldest:
+            items.popleft()
+
+    def rebuild(self, start: int, values: Iterable[Any]) -> None:
+        """
+        Собрать очередь заново по содержимому окна
+        """
+        self._items.clear()
+        for position, value in enumerate(values, start=start):
+            self.push(position, value)
+
+    def clear(self) -> None:
+        """
+        Очистить очередь
+        """
+        self._items.clear()
+
+
+class MovingExtremum(Carousel):
+    """
+    Основа для контейнеров скользящих экстремумов.
+    Потомки задают набор функций сравнения, по одной монотонной очереди на каждую
+    """
+    __slots__ = ('_queues', '_pushes')
+
+    _comparators: Tuple[Callable[[Any, Any], bool], ...] = ()
+
+    def __init__(self, source: Optional[Sequence] = None,
+                 window: int = 0, sentinel: Any = object()):
+        """
+        Создание экземпляра
+
+        :param source: исходная коллекция элементов, на базе которой надо собрать экземпляр
+        :param window: максимальное киличество элементов (ширина окна вычисления)
+        :param sentinel: элемент для заполнения пустых ячеек (можно добавить свой)
+        """
+        self._queues = tuple(MonotonicQueue(comparator) for comparator in self._comparators)
+        self._pushes = 0
+        super().__init__(source, window, sentinel)
+
+    def push(self, value: Union[int, float]) -> None:
+        """
+        Добавить элемент в контейнер
+
+        :param value: новое число, которое соответствует сдвигу окна на один элемент
+        """
+        super().push(value)
+        position = self._pushes
+        self._pushes += 1
+        oldest = self._pushes - self._len
+
+        for queue in self._queues:
+            queue.push(position, value)
+            queue.evict(oldest)
+
+    def push_many(self, source: Iterable[Union[int, float]]) -> List[Union[int, float]]:
+        """
+        Добавить в контейнер целую пачку чисел
+
+        :param source: последовательность новых чисел
+        :return: вытолкнутые при добавлении числа
+        """
+        values = self._as_block(source)
+        evicted = super().push_many(values)
+        start = self._pushes
+        self._pushes += len(values)
+
+        if len(values) >= self.window:
+            # в окне остались только элементы пачки
+            self.rebuild()
+            return evicted
+
+        oldest = self._pushes - self._len
+        for queue in self._queues:
+            for position, value in enumerate(values, start=start):
+                queue.push(position, value)
+            queue.evict(oldest)
+
+        return evicted
+
+    def rebuild(self) -> None:
+        """
+        Собрать монотонные очереди заново по содержимому окна (O(window))
+        """
+        start = self._pushes - self._len
+        for queue in self._queues:
+            queue.rebuild(start, self.view())
+
+    def restore(self) -> None:
+        """
+        Сбросить параметры
+        """
+        self._pushes = 0
+        for queue in self._queues:
+            queue.clear()
+        super().restore()
+
+    def __setitem__(self, key: Union[int, slice], value: Union[int, float, Sequence]) -> None:
+        """
+        Записать элемент по индексу.
+        Подмена элемента нарушает монотонность очередей, поэтому они собираются заново
+
+        :param key: ключ индексации
+        :param value: данные для записи (любой тип)
+        """
+        super().__setitem__(key, value)
+        self.rebuild()
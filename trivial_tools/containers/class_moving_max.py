@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящего максимума.
+    В него можно постоянно можно добавлять элементы и быстро получать максимум
+
+    Пример работы с контейнером:
+    m = MovingMax(window=3)
+    m.push(5)
+    m.push(3)
+    m.push(4)
+    m.push(1)
+    m.max --> 4
+
+"""
+# встроенные модули
+from operator import ge
+from typing import Union, Optional
+
+# модули проекта
+from trivial_tools.containers.class_moving_extremum import MovingExtremum
+
+
+class MovingMax(MovingExtremum):
+    """
+    Контейнер для вычисления скользящего максимума.
+    Добавление стоит O(1) амортизированно
+    """
+    __slots__ = ()
+
+    _comparators = (ge,)
+
+    @property
+    def max(self) -> Optional[Union[int, float]]:
+        """
+        Максимум всех элементов (None для пустого контейнера)
+        """
+        return self._queues[0].front
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящего минимума.
+    В него можно постоянно можно добавлять элементы и быстро получать минимум
+
+    Пример работы с контейнером:
+    m = MovingMin(window=3)
+    m.push(5)
+    m.push(3)
+    m.push(4)
+    m.push(1)
+    m.min --> 1
+
+"""
+# встроенные модули
+from operator import le
+from typing import Union, Optional
+
+# модули проекта
+from trivial_tools.containers.class_moving_extremum import MovingExtremum
+
+
+class MovingMin(MovingExtremum):
+    """
+    Контейнер для вычисления скользящего минимума.
+    Добавление стоит O(1) амортизированно
+    """
+    __slots__ = ()
+
+    _comparators = (le,)
+
+    @property
+    def min(self) -> Optional[Union[int, float]]:
+        """
+        Минимум всех элементов (None для пустого контейнера)
+        """
+        return self._queues[0].front
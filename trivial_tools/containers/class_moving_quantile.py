@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящих квантилей (медианы, перцентилей).
+    В него можно постоянно можно добавлять элементы и быстро получать любой квантиль
+
+    Рядом с кольцевым хранилищем содержимое окна хранится в отсортированном виде
+    (SortedBlocks), поэтому и добавление, и запрос квантиля стоят O(log n)
+    вместо сортировки всего окна на каждом шаге.
+
+    Пример работы с контейнером:
+    m = MovingQuantile(window=4)
+    m.push_many([7, 1, 3, 9, 5])  # в окне [1, 3, 9, 5]
+    m.median --> 4.0
+    m.quantile(0.95) --> 8.4
+
+"""
+# встроенные модули
+from typing import Union, Optional, Sequence, Any, Iterable, List
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+from trivial_tools.containers.class_carousel import Carousel
+from trivial_tools.containers.class_sorted_blocks import SortedBlocks
+
+
+class MovingQuantile(Carousel):
+    """
+    Контейнер для вычисления скользящих квантилей.
+    Добавление и запрос квантиля стоят O(log n)
+    """
+    __slots__ = ('_sorted',)
+
+    def __init__(self, source: Optional[Sequence] = None,
+                 window: int = 0, sentinel: Any = object()):
+        """
+        Создание экземпляра
+
+        :param source: исходная коллекция элементов, на базе которой надо собрать экземпляр
+        :param window: максимальное киличество элементов (ширина окна вычисления)
+        :param sentinel: элемент для заполнения пустых ячеек (можно добавить свой)
+        """
+        self._sorted = SortedBlocks()
+        super().__init__(source, window, sentinel)
+
+    def push(self, value: Union[int, float]) -> None:
+        """
+        Добавить элемент в контейнер
+
+        :param value: новое число, которое соответствует сдвигу окна на один элемент
+        """
+        old_value = super().push(value)
+
+        if old_value is not self._sentinel:
+            self._sorted.remove(old_value)
+
+        self._sorted.add(value)
+
+    def push_many(self, source: Iterable[Union[int, float]]) -> List[Union[int, float]]:
+        """
+        Добавить в контейнер целую пачку чисел
+
+        :param source: последовательность новых чисел
+        :return: вытолкнутые при добавлении числа
+        """
+        values = self._as_block(source)
+        evicted = super().push_many(values)
+
+        if len(values) >= self.window:
+            # в окне остались только элементы пачки
+            self._rebuild()
+            return evicted
+
+        for old_value in evicted:
+            self._sorted.remove(old_value)
+
+        for value in values:
+            self._sorted.add(value)
+
+        return evicted
+
+    def _rebuild(self) -> None:
+        """
+        Собрать отсортированное содержимое заново по окну
+        """
+        self._sorted.clear()
+        for value in sorted(self.view()):
+            self._sorted.add(value)
+
+    def restore(self) -> None:
+        """
+        Сбросить параметры
+        """
+        self._sorted.clear()
+        super().restore()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Вычислить квантиль с линейной интерполяцией между соседними элементами
+        (как numpy.quantile по умолчанию)
+
+        :param q: уровень квантиля от 0 до 1
+        :return: значение квантиля (None для пустого контейнера)
+        """
+        if not 0.0 <= q <= 1.0:
+            fail(f'Уровень квантиля должен лежать в диапазоне [0, 1], получено {q!r}',
+                 reason=ValueError)
+
+        if not self._len:
+            return None
+
+        position = q * (self._len - 1)
+        lower = int(position)
+        value = self._sorted[lower]
+
+        if lower == self._len - 1:
+            return value
+
+        fraction = position - lower
+        if not fraction:
+            return value
+
+        return value + (self._sorted[lower + 1] - value) * fraction
+
+    @property
+    def median(self) -> Optional[float]:
+        """
+        Медиана всех элементов
+        """
+        return self.quantile(0.5)
+
+    def __setitem__(self, key: Union[int, slice], value: Union[int, float, Sequence]) -> None:
+        """
+        Записать элемент по индексу.
+        Обеспечивается обычный доступ к внутреннему хранилищу, просто со смещением индекса
+
+        :param key: ключ индексации
+        :param value: данные для записи (любой тип)
+        """
+        if isinstance(key, int):
+            old_value = self[key]
+            super().__setitem__(key, value)
+            self._sorted.remove(old_value)
+            self._sorted.add(value)
+            return
+
+        fail(f"Тип {s_type(self)} поддерживает работу только с индексами типа int!",
+             reason=IndexError)
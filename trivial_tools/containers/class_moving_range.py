@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящего размаха (разницы между максимумом и минимумом).
+    В него можно постоянно можно добавлять элементы и быстро получать минимум, максимум и размах
+
+    Пример работы с контейнером:
+    m = MovingRange(window=3)
+    m.push(5)
+    m.push(3)
+    m.push(4)
+    m.push(1)
+    m.min --> 1
+    m.max --> 4
+    m.range --> 3
+
+"""
+# встроенные модули
+from operator import le, ge
+from typing import Union, Optional
+
+# модули проекта
+from trivial_tools.containers.class_moving_extremum import MovingExtremum
+
+
+class MovingRange(MovingExtremum):
+    """
+    Контейнер для вычисления скользящего размаха.
+    Добавление стоит O(1) амортизированно
+    """
+    __slots__ = ()
+
+    _comparators = (le, ge)
+
+    @property
+    def min(self) -> Optional[Union[int, float]]:
+        """
+        Минимум всех элементов (None для пустого контейнера)
+        """
+        return self._queues[0].front
+
+    @property
+    def max(self) -> Optional[Union[int, float]]:
+        """
+        Максимум всех элементов (None для пустого контейнера)
+        """
+        return self._queues[1].front
+
+    @property
+    def range(self) -> Union[int, float]:
+        """
+        Разница между максимумом и минимумом (0 для пустого контейнера)
+        """
+        if not self._len:
+            return 0
+        return self._queues[1].front - self._queues[0].front
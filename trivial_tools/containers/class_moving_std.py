@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящего стандартного отклонения.
+    В него можно постоянно можно добавлять элементы и быстро получать отклонение и z-оценку
+
+    Пример работы с контейнером:
+    m = MovingStd(window=3)
+    m.push(1)
+    m.push(2)
+    m.push(3)        # среднее 2, отклонение 1
+    m.zscore(5)      # 3.0, значение 5 отстоит от среднего на три отклонения
+
+"""
+# встроенные модули
+from math import sqrt
+from typing import Union
+
+# модули проекта
+from trivial_tools.containers.class_moving_variance import MovingVariance
+
+
+class MovingStd(MovingVariance):
+    """
+    Контейнер для вычисления скользящего стандартного отклонения.
+    В него можно постоянно можно добавлять элементы и быстро получать отклонение
+    """
+    __slots__ = ()
+
+    @property
+    def std(self) -> float:
+        """
+        Стандартное отклонение всех элементов
+        """
+        return sqrt(self.variance)
+
+    def zscore(self, value: Union[int, float]) -> float:
+        """
+        Вычислить на сколько стандартных отклонений значение отстоит от среднего окна
+
+        :param value: проверяемое число
+        :return: z-оценка (0, если отклонение нулевое)
+        """
+        std = self.std
+        if not std:
+            return 0.0
+        return (value - self._mean) / std
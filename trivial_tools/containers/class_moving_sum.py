@@ -17,33 +17,90 @@
     m.push(3)    # сумма равна 147
     m.push(2)    # сумма равна 91
 
+    При длительной работе с дробными числами сумма, которую мы ведём через += и -=,
+    постепенно уплывает от настоящей суммы окна. Для таких случаев есть режимы коррекции:
+
+    MovingSum(window=4, correction='neumaier')   # компенсированное суммирование Ноймайера
+    MovingSum(window=4, correction='recompute')  # точный пересчёт суммы раз в window добавлений
+
+    Оба режима остаются O(1) на одно добавление (для пересчёта - амортизированно).
+
 """
 # встроенные модули
-from typing import Union, Optional, Sequence, Any
+from math import fsum
+from typing import Union, Optional, Sequence, Any, Iterable, List
 
 # модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
 from trivial_tools.containers.class_carousel import Carousel
 
+CORRECTIONS = (None, 'neumaier', 'recompute')
+
 
 class MovingSum(Carousel):
     """
     Контейнер для вычисления скользящей суммы.
     В него можно постоянно можно добавлять элементы и быстро получать сумму
     """
-    __slots__ = ('_sum',)
+    __slots__ = ('_sum', '_compensation', '_correction', '_pushes')
 
     def __init__(self, source: Optional[Sequence] = None,
-                 window: int = 0, sentinel: Any = object()):
+                 window: int = 0, sentinel: Any = object(), correction: Optional[str] = None):
         """
         Создание экземпляра
 
         :param source: исходная коллекция элементов, на базе которой надо собрать экземпляр
         :param window: максимальное киличество элементов (ширина окна вычисления)
         :param sentinel: элемент для заполнения пустых ячеек (можно добавить свой)
+        :param correction: режим борьбы с накоплением ошибки округления
+        (None - без коррекции, 'neumaier' - компенсированное суммирование,
+        'recompute' - периодический точный пересчёт по содержимому)
         """
+        if correction not in CORRECTIONS:
+            fail(f'Неизвестный режим коррекции {correction!r} для {s_type(self)}, '
+                 f'допустимые варианты: {CORRECTIONS}', reason=ValueError)
+
         self._sum: Union[int, float] = 0
+        self._compensation = 0.0
+        self._correction = correction
+        self._pushes = 0
         super().__init__(source, window, sentinel)
 
+    @property
+    def correction(self) -> Optional[str]:
+        """
+        Режим коррекции суммы
+        """
+        return self._correction
+
+    def _add(self, value: Union[int, float]) -> None:
+        """
+        Прибавить число к сумме по алгоритму Ноймайера, накапливая потерянные младшие разряды
+        """
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - total) + value
+        else:
+            self._compensation += (value - total) + self._sum
+        self._sum = total
+
+    def _count(self, pushes: int) -> None:
+        """
+        Учесть добавленные элементы и при необходимости точно пересчитать сумму
+        """
+        self._pushes += pushes
+        if self._pushes >= self.window:
+            self._pushes = 0
+            self.recalculate()
+
+    def recalculate(self) -> None:
+        """
+        Точно пересчитать сумму по текущему содержимому (O(window))
+        """
+        self._sum = fsum(self.view())
+        self._compensation = 0.0
+
     def push(self, value: Union[int, float]) -> None:
         """
         Добавить элемент в контейнер
@@ -56,16 +113,53 @@ class MovingSum(Carousel):
         """
         old_value = super().push(value)
 
+        if self._correction == 'neumaier':
+            if old_value is not self._sentinel:
+                self._add(-old_value)
+            self._add(value)
+            return
+
         if old_value is not self._sentinel:
             self._sum -= old_value
 
         self._sum += value
 
+        if self._correction == 'recompute':
+            self._count(1)
+
+    def push_many(self, source: Iterable[Union[int, float]]) -> List[Union[int, float]]:
+        """
+        Добавить в контейнер целую пачку чисел
+
+        Сумма корректируется один раз на всю пачку: вычитаем сумму вытолкнутых
+        элементов и прибавляем сумму добавленных
+
+        :param source: последовательность новых чисел
+        :return: вытолкнутые при добавлении числа
+        """
+        values = self._as_block(source)
+        evicted = super().push_many(values)
+
+        if self._correction == 'neumaier':
+            self._add(-fsum(evicted))
+            self._add(fsum(values))
+
+        elif self._correction == 'recompute':
+            self._sum += sum(values) - sum(evicted)
+            self._count(len(values))
+
+        else:
+            self._sum += sum(values) - sum(evicted)
+
+        return evicted
+
     def restore(self) -> None:
         """
         Сбросить параметры
         """
         self._sum = 0
+        self._compensation = 0.0
+        self._pushes = 0
         super().restore()
 
     @property
@@ -73,6 +167,8 @@ class MovingSum(Carousel):
         """
         Сумма всех элементов
         """
+        if self._compensation:
+            return self._sum + self._compensation
         return self._sum
 
     def __setitem__(self, key: Union[int, slice], value: Union[int, float, Sequence]) -> None:
@@ -84,7 +180,12 @@ class MovingSum(Carousel):
         :param value: данные для записи (любой тип)
         """
         if isinstance(key, int):
-            self._sum -= self._data[self.get_real_index(key)]
-            self._sum += value
+            old_value = self._data[self.get_real_index(key)]
+            if self._correction == 'neumaier':
+                self._add(-old_value)
+                self._add(value)
+            else:
+                self._sum -= old_value
+                self._sum += value
 
         super().__setitem__(key, value)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящей дисперсии.
+    В него можно постоянно можно добавлять элементы и быстро получать среднее и дисперсию
+
+    Вместо пересчёта по всему окну хранятся первый и второй моменты (среднее и сумма
+    квадратов отклонений), которые обновляются по алгоритму Уэлфорда при каждом
+    добавлении, вытеснении и подмене элемента. Стоимость добавления O(1).
+
+    Пример работы с контейнером:
+    m = MovingVariance(window=3)  # дисперсия равна 0
+    m.push(1)   # среднее 1, дисперсия 0
+    m.push(2)   # среднее 1,5, дисперсия 0,5
+    m.push(3)   # среднее 2, дисперсия 1
+    m.push(7)   # среднее 4, дисперсия 7
+
+"""
+# встроенные модули
+from math import fsum
+from typing import Union, Optional, Sequence, Any, Iterable, List, Tuple
+
+# модули проекта
+from trivial_tools.containers.class_carousel import Carousel
+
+
+class MovingVariance(Carousel):
+    """
+    Контейнер для вычисления скользящей дисперсии.
+    В него можно постоянно можно добавлять элементы и быстро получать дисперсию
+    """
+    __slots__ = ('_mean', '_m2', 'ddof')
+
+    def __init__(self, source: Optional[Sequence] = None,
+                 window: int = 0, sentinel: Any = object(), ddof: int = 1):
+        """
+        Создание экземпляра
+
+        :param source: исходная коллекция элементов, на базе которой надо собрать экземпляр
+        :param window: максимальное киличество элементов (ширина окна вычисления)
+        :param sentinel: элемент для заполнения пустых ячеек (можно добавить свой)
+        :param ddof: поправка степеней свободы (1 - выборочная дисперсия как в
+        statistics.variance, 0 - дисперсия генеральной совокупности как в statistics.pvariance)
+        """
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.ddof = ddof
+        super().__init__(source, window, sentinel)
+
+    @staticmethod
+    def _moments(values: Sequence[Union[int, float]]) -> Tuple[int, float, float]:
+        """
+        Точно посчитать количество, среднее и сумму квадратов отклонений для пачки чисел
+        """
+        count = len(values)
+        if not count:
+            return 0, 0.0, 0.0
+
+        mean = fsum(values) / count
+        m2 = fsum((x - mean) ** 2 for x in values)
+        return count, mean, m2
+
+    def _append(self, value: Union[int, float]) -> None:
+        """
+        Учесть новый элемент в свободной ячейке (длина уже увеличена)
+        """
+        delta = value - self._mean
+        self._mean += delta / self._len
+        self._m2 += delta * (value - self._mean)
+
+    def _replace(self, old_value: Union[int, float], value: Union[int, float]) -> None:
+        """
+        Учесть замену одного элемента другим при неизменной длине
+        """
+        delta = value - old_value
+        old_mean = self._mean
+        self._mean += delta / self._len
+        self._m2 += delta * (value - self._mean + old_value - old_mean)
+        if self._m2 < 0.0:
+            self._m2 = 0.0
+
+    def recalculate(self) -> None:
+        """
+        Точно пересчитать моменты по текущему содержимому (O(window))
+        """
+        _, self._mean, self._m2 = self._moments(self.view())
+
+    def push(self, value: Union[int, float]) -> None:
+        """
+        Добавить элемент в контейнер
+
+        Если при добавлении был вытолкнут старый элемент, моменты пересчитываются
+        как при замене одного элемента другим
+
+        :param value: новое число, которое соответствует сдвигу окна на один элемент
+        """
+        old_value = super().push(value)
+
+        if old_value is self._sentinel:
+            self._append(value)
+        else:
+            self._replace(old_value, value)
+
+    def push_many(self, source: Iterable[Union[int, float]]) -> List[Union[int, float]]:
+        """
+        Добавить в контейнер целую пачку чисел
+
+        Моменты вытолкнутых элементов вычитаются, а моменты новых добавляются одним шагом
+        (параллельный вариант алгоритма Уэлфорда)
+
+        :param source: последовательность новых чисел
+        :return: вытолкнутые при добавлении числа
+        """
+        values = self._as_block(source)
+        count = self._len
+        evicted = super().push_many(values)
+
+        if len(values) >= self.window:
+            # пачка полностью заместила окно, дешевле посчитать заново
+            self.recalculate()
+            return evicted
+
+        mean, m2 = self._mean, self._m2
+
+        removed, removed_mean, removed_m2 = self._moments(evicted)
+        if removed:
+            rest = count - removed
+            rest_mean = (count * mean - removed * removed_mean) / rest
+            delta = removed_mean - rest_mean
+            m2 -= removed_m2 + delta * delta * rest * removed / count
+            count, mean = rest, rest_mean
+
+        added, added_mean, added_m2 = self._moments(values)
+        if added:
+            total = count + added
+            delta = added_mean - mean
+            mean += delta * added / total
+            m2 += added_m2 + delta * delta * count * added / total
+
+        self._mean = mean
+        self._m2 = max(m2, 0.0)
+        return evicted
+
+    def restore(self) -> None:
+        """
+        Сбросить параметры
+        """
+        self._mean = 0.0
+        self._m2 = 0.0
+        super().restore()
+
+    @property
+    def mean(self) -> float:
+        """
+        Среднее всех элементов
+        """
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        """
+        Дисперсия всех элементов (0, если элементов недостаточно)
+        """
+        if self._len <= self.ddof:
+            return 0.0
+        return self._m2 / (self._len - self.ddof)
+
+    def __setitem__(self, key: Union[int, slice], value: Union[int, float, Sequence]) -> None:
+        """
+        Записать элемент по индексу.
+        Обеспечивается обычный доступ к внутреннему хранилищу, просто со смещением индекса
+
+        :param key: ключ индексации
+        :param value: данные для записи (любой тип)
+        """
+        if isinstance(key, int):
+            old_value = self[key]
+            super().__setitem__(key, value)
+            self._replace(old_value, value)
+            return
+
+        super().__setitem__(key, value)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Типизированная карусель для чисел на базе array.array
+
+    В отличие от обычной карусели не хранит каждый элемент как отдельный объект Python,
+    а держит их в компактном массиве фиксированного типа (8 байт на элемент для 'd').
+    Пустые ячейки не заполняются sentinel, вместо этого ведётся счётчик заполнения.
+
+    Пример работы с контейнером:
+    c = NumericCarousel(window=3)  # внутреннее хранилище: [0.0, 0.0, 0.0], длина 0
+    c.push(1)                      # внутреннее хранилище: [1.0, 0.0, 0.0], длина 1
+    c.push(2)                      # внутреннее хранилище: [1.0, 2.0, 0.0], длина 2
+    c.push(3)                      # внутреннее хранилище: [1.0, 2.0, 3.0], длина 3
+    c.push(4)                      # внутреннее хранилище: [4.0, 2.0, 3.0], длина 3
+    c.get_contents() --> array('d', [2.0, 3.0, 4.0])
+
+    Внутреннее хранилище поддерживает buffer protocol, поэтому его можно передавать
+    в векторизованный код (например numpy.frombuffer) без копирования.
+
+"""
+# встроенные модули
+from array import array
+from typing import Any, Optional, Collection, Generator, Union, Iterable
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+from trivial_tools.containers.class_carousel import Carousel
+
+
+class NumericCarousel(Carousel):
+    """
+    Контейнер с бегущим индексом на базе типизированного массива.
+    Хранит только числа заданного типа (коды типов как в модуле array)
+    """
+    __slots__ = ('_dtype',)
+
+    def __init__(self, source: Optional[Collection] = None,
+                 window: int = 0, dtype: str = 'd'):
+        """
+        Создание экземпляра. Можно задать базовую коллекцию, размер и тип хранимых чисел
+
+        :param source: исходная коллекция элементов, на базе которой надо собрать экземпляр
+        :param window: максимальное количество элементов (ширина окна вычисления)
+        :param dtype: код типа элементов для array.array ('d', 'f', 'l', 'q' и т.п.)
+        """
+        self._dtype = dtype
+        super().__init__(source, window, sentinel=None)
+
+    @property
+    def dtype(self) -> str:
+        """
+        Код типа хранимых элементов
+        """
+        return self._dtype
+
+    @property
+    def itemsize(self) -> int:
+        """
+        Размер одного элемента в байтах
+        """
+        return self._data.itemsize
+
+    def populate(self, source: Collection[Any]) -> None:
+        """
+        Наполнить хранилище предоставленными данными
+
+        В отличие от обычной карусели элементы укладываются одним присваиванием среза,
+        из источника берутся только последние window элементов
+
+        :param source: некоторая коллекция, элементы которой надо последовательно переложить
+        """
+        values = array(self._dtype, source)[-self.window:]
+        self._data[0:len(values)] = values
+        self._len = len(values)
+        self._index = self._len % self.window
+
+    def push(self, element: Union[int, float]) -> Optional[Union[int, float]]:
+        """
+        Добавить элемент в карусель
+
+        :param element: новое число
+        :return: старый элемент, который был вытолкнут при добавлении (None если его не было)
+        """
+        index = self._index
+        old_value = self._data[index] if self._len == self.window else None
+        self._data[index] = element
+
+        index += 1
+        if index == self.window:
+            index = 0
+        self._index = index
+
+        if self._len < self.window:
+            self._len += 1
+
+        return old_value
+
+    def _as_block(self, source: Iterable[Union[int, float]]) -> array:
+        """
+        Привести входную пачку элементов к типу внутреннего хранилища
+        """
+        if isinstance(source, array) and source.typecode == self._dtype:
+            return source
+        return array(self._dtype, source)
+
+    def push_many(self, source: Iterable[Union[int, float]]) -> array:
+        """
+        Добавить в карусель целую пачку чисел (список, массив или любой буфер)
+
+        :param source: последовательность новых чисел
+        :return: массив чисел, которые были вытолкнуты при добавлении (в порядке добавления)
+        """
+        return super().push_many(source)
+
+    def resize(self, new_window: int) -> None:
+        """
+        Изменить размер карусели
+
+        :param new_window: новая предельная длина для внутреннего хранилища
+        """
+        if new_window == self.window:
+            return
+
+        old_data = self.get_contents()
+        self.window = new_window
+        self.restore()
+        self.populate(old_data)
+
+    def get_contents(self) -> array:
+        """
+        Получить копию внутреннего хранилища в порядке добавления элементов
+        """
+        if self._len == self.window:
+            return self._data[self._index:] + self._data[:self._index]
+        return self._data[:self._len]
+
+    def restore(self) -> None:
+        """
+        Сбросить индекс и длину, заполнить внутреннее хранилище нулями
+        """
+        self._len = 0
+        self._index = 0
+        self._data = array(self._dtype, [0]) * self.window
+
+    def _internals(self) -> Generator[Any, None, None]:
+        """
+        Проитерироваться по элементам внутреннего хранилища (пустые ячейки выдаются как None)
+        """
+        if self._len == self.window:
+            yield from self._data[self._index:]
+            yield from self._data[:self._index]
+        else:
+            yield from self._data[:self._len]
+            yield from (None for _ in range(self.window - self._len))
+
+    def __iter__(self) -> Any:
+        """
+        Проитерироваться по элементам внутреннего хранилища (без пустых элементов)
+        Сохраняет порядок вставки элементов
+        """
+        return iter(self.get_contents())
+
+    def _check_index(self, key: int) -> None:
+        """
+        Убедиться, что индекс указывает на заполненную ячейку
+        """
+        if not self._len:
+            fail(f'Попытка обратиться по индексу {key} к пустому объекту {s_type(self)}',
+                 reason=IndexError)
+
+        if not -self._len <= key < self._len:
+            fail(f'В экземпляре {s_type(self)} нет элемента с индексом {key!r}',
+                 reason=IndexError)
+
+    def __getitem__(self, item: Union[int, slice]) -> Any:
+        """
+        Обратиться к элементу по индексу.
+        Обеспечивается обычный доступ к внутреннему хранилищу, просто со смещением индекса
+
+        :param item: ключ индексации
+        :return: содержимое внутреннего хранилища
+        """
+        if isinstance(item, int):
+            self._check_index(item)
+            return self._data[self.get_real_index(item % self._len)]
+
+        if isinstance(item, slice):
+            return self.get_contents()[item]
+
+        fail(f"Тип {s_type(self)} поддерживает работу только с индексами int и slice!",
+             reason=IndexError)
+
+    def __setitem__(self, key: Union[int, slice], value: Union[int, float]) -> None:
+        """
+        Записать элемент по индексу.
+        Обеспечивается обычный доступ к внутреннему хранилищу, просто со смещением индекса
+
+        :param key: ключ индексации, только int
+        :param value: число для записи
+        """
+        if not isinstance(key, int):
+            fail(f"Тип {s_type(self)} поддерживает работу только с индексами типа int!",
+                 reason=IndexError)
+
+        self._check_index(key)
+        self._data[self.get_real_index(key % self._len)] = value
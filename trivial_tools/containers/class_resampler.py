@@ -18,15 +18,40 @@
         [datetime(2019, 12, 1, 12, 0, 4), 'B']
     ]
 
+    Если метки времени уже лежат в виде целых секунд эпохи, можно обойтись
+    без datetime совсем:
+
+    r = Resampler(epoch=True)
+    r.push((1575190800, 'A'))
+    r.push((1575190802, 'B')) --> [[1575190800, 'A'], [1575190801, 'A'], [1575190802, 'B']]
+
+    Для пачки строк есть вариант, который сразу собирает результат по столбцам:
+
+    r = Resampler()
+    columns = r.push_batch([
+        (datetime(2019, 12, 1, 12, 0, 0), 'A'),
+        (datetime(2019, 12, 1, 12, 0, 2), 'B'),
+    ])
+
+    В columns будет лежать:
+    [
+        [datetime(2019, 12, 1, 12, 0, 0), datetime(2019, 12, 1, 12, 0, 1), ...],
+        ['A', 'A', 'B']
+    ]
+
 """
 # встроенные модули
+import asyncio
 from datetime import timedelta
-from typing import Generator, Any
+from itertools import repeat
+from typing import Generator, Any, Iterable, List, Optional, Union, AsyncIterable, AsyncGenerator
 
 # модули проекта
 from trivial_tools.formatters.base import s_type
 from trivial_tools.datetime_tools.text import datetime_to_text_s
 
+ONE_SECOND = timedelta(seconds=1)
+
 
 class Resampler:
     """
@@ -34,9 +59,10 @@ class Resampler:
     Создаётся по одному экземпляру на источник данных
     Сами данные не хранит, работает по двум меткам времени
     """
-    __slots__ = ('max_gap', 'datetime_index', 'previous', 'placeholder', '_full_on')
+    __slots__ = ('max_gap', 'datetime_index', 'previous', 'placeholder', '_full_on', 'epoch')
 
-    def __init__(self, max_gap: int = 30, datetime_index: int = 0, placeholder: Any = None):
+    def __init__(self, max_gap: int = 30, datetime_index: int = 0, placeholder: Any = None,
+                 epoch: bool = False):
         """
         Создание экземпляра
 
@@ -49,8 +75,11 @@ class Resampler:
         :param placeholder: заполнитель для случая, когда у нас не нашлось значения для подстановки
         :param _full_on: флаг, показывающий, что ресемплер вошёл в рабочий режим. Без него
         будет съедено первое значение в списке
+        :param epoch: метки времени приходят целыми секундами эпохи вместо datetime.
+        В этом режиме вся работа с временем сводится к целочисленной арифметике
         """
         self.max_gap = max_gap
+        self.epoch = epoch
         self.datetime_index = datetime_index
         self.placeholder = placeholder
         self.previous = None
@@ -64,7 +93,8 @@ class Resampler:
             f'{s_type(self)}('
             f'max_gap={self.max_gap}, '
             f'datetime_index={self.datetime_index}, '
-            f'placeholder={self.placeholder!r})'
+            f'placeholder={self.placeholder!r}'
+            f'{", epoch=True" if self.epoch else ""})'
         )
         return result
 
@@ -72,7 +102,9 @@ class Resampler:
         """
         Текстовое представление
         """
-        if self.previous:
+        if self.previous and self.epoch:
+            previous = str(self.previous[self.datetime_index])
+        elif self.previous:
             previous = datetime_to_text_s(self.previous[self.datetime_index])
         else:
             previous = 'None'
@@ -130,8 +162,10 @@ class Resampler:
             self._full_on = True
 
         # генерируем серию промежуточных значений
-        for i in range(1, delta):
-            moment = old_moment + timedelta(seconds=i)
+        step = self.get_step()
+        moment = old_moment
+        for _ in range(1, delta):
+            moment += step
             body[self.datetime_index] = moment
             yield list(body)
 
@@ -151,12 +185,117 @@ class Resampler:
             result.append(each)
         return result
 
+    async def aiter_push(self, source: AsyncIterable[tuple],
+                         yield_every: int = 1000) -> AsyncGenerator[list, None]:
+        """
+        Асинхронный вариант iter_push для целого потока данных
+
+        Принимает асинхронный итератор кортежей и выдаёт ресемплированные строки как
+        асинхронный генератор. Через каждые yield_every синтезированных строк управление
+        отдаётся циклу событий, поэтому длинный разрыв не блокирует другие корутины
+
+        :param source: асинхронный итератор кортежей данных с временной меткой
+        :param yield_every: через сколько выданных строк уступать циклу событий
+        :return: асинхронная последовательность ресемплированных строк
+        """
+        produced = 0
+        async for payload in source:
+            for row in self.iter_push(payload):
+                yield row
+                produced += 1
+                if produced >= yield_every:
+                    produced = 0
+                    await asyncio.sleep(0)
+
+    def push_batch(self, rows: Iterable[tuple]) -> List[list]:
+        """
+        Ресемплировать целую пачку отсортированных по времени строк за один проход
+
+        Результат такой же, как при последовательном вызове push для каждой строки,
+        но собирается сразу по столбцам: повторяющиеся значения в разрывах добавляются
+        в столбцы целиком, без создания отдельного списка на каждую секунду.
+        Параллельные массивы можно подать как push_batch(zip(*columns))
+
+        :param rows: последовательность кортежей данных с временной меткой
+        :return: список столбцов (столбец с индексом datetime_index содержит метки времени)
+        """
+        index = self.datetime_index
+        one_second = self.get_step()
+        columns: Optional[List[list]] = None
+
+        previous = self.previous
+        old_seconds = None if previous is None else self.get_seconds(previous)
+
+        for payload in rows:
+            if not payload:
+                continue
+
+            if previous is None:
+                previous = payload
+                old_seconds = self.get_seconds(payload)
+                continue
+
+            new_seconds = self.get_seconds(payload)
+
+            if new_seconds == old_seconds:
+                # при равенстве мы всё-равно замещаем старые показания новыми
+                previous = payload
+                continue
+
+            if new_seconds < old_seconds:
+                # это значение слишком старое
+                continue
+
+            if columns is None:
+                columns = [[] for _ in range(len(previous))]
+
+            if not self._full_on:
+                # первое значение в списке требует особого отношения
+                for column, value in zip(columns, previous):
+                    column.append(value)
+                self._full_on = True
+
+            delta = new_seconds - old_seconds
+            missing = delta - 1
+
+            if missing:
+                gap = delta > self.max_gap
+                for i, (column, value) in enumerate(zip(columns, previous)):
+                    if i == index:
+                        moment = value
+                        for _ in range(missing):
+                            moment += one_second
+                            column.append(moment)
+                    else:
+                        column.extend(repeat(self.placeholder if gap else value, missing))
+
+            for column, value in zip(columns, payload):
+                column.append(value)
+
+            previous = payload
+            old_seconds = new_seconds
+
+        if previous is not None:
+            self.previous = list(previous)
+
+        return columns if columns is not None else []
+
     def get_seconds(self, payload: list) -> int:
         """
         Выделить число секунд для datetime
         """
+        if self.epoch:
+            return payload[self.datetime_index]
         return int(payload[self.datetime_index].timestamp())
 
+    def get_step(self) -> Union[int, timedelta]:
+        """
+        Шаг в одну секунду в единицах меток времени
+        """
+        if self.epoch:
+            return 1
+        return ONE_SECOND
+
     def clear(self):
         """
         Сбросить в исходное состояние
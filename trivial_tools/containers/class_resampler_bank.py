@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Банк ресемплеров: посекундное выравнивание сразу многих источников данных
+
+    Вместо отдельного Resampler на каждый источник и последующего объединения их выдачи
+    банк принимает общий поток (источник, метка времени, значение), отсортированный по
+    времени, и выдаёт широкие строки на общей посекундной сетке:
+    [метка времени, значение источника 1, значение источника 2, ...]
+
+    Правила заполнения те же, что у Resampler: секунды между двумя показаниями источника
+    заполняются предыдущим значением, а если разрыв больше max_gap - заполнителем.
+    Повторное показание источника с той же меткой времени заменяет предыдущее.
+    Строка выдаётся, как только каждый источник прислал показание с более поздней
+    меткой или замолчал дольше max_gap, поэтому задержка выдачи не превышает
+    max_gap + 1 секунд.
+
+    Состояние источников хранится в компактных массивах, а не в отдельных объектах.
+
+    Пример работы с банком:
+    b = ResamplerBank(['A', 'B'], epoch=True)
+    b.push('A', 100, 1)  # []
+    b.push('B', 100, 5)  # []
+    b.push('A', 102, 2)  # []
+    b.push('B', 102, 6)  # [[100, 1, 5], [101, 1, 5]]
+
+"""
+# встроенные модули
+from array import array
+from collections import deque
+from datetime import timedelta
+from typing import Any, Hashable, Iterable, List, Sequence, Tuple, Optional, Deque, Dict, Set
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+
+MISSING = -2 ** 63
+
+
+class ResamplerBank:
+    """
+    Выдаёт данные многих источников в посекундном виде на общей сетке.
+    Сами данные не хранит, кроме ещё не завершённых строк
+    """
+    __slots__ = ('sources', 'max_gap', 'placeholder', 'epoch', '_columns', '_seconds',
+                 '_values', '_rows', '_cursor', '_newest', '_origin', '_origin_seconds',
+                 '_pending', '_low')
+
+    def __init__(self, sources: Sequence[Hashable], max_gap: int = 30,
+                 placeholder: Any = None, epoch: bool = False):
+        """
+        Создание экземпляра
+
+        :param sources: идентификаторы источников, их порядок задаёт порядок столбцов
+        :param max_gap: предельно допустимое количество секунд между показаниями источника.
+        Периоды больше этого времени считаются периодом сбоя связи и забиваются заполнителем
+        :param placeholder: заполнитель для случая, когда у нас не нашлось значения для подстановки
+        :param epoch: метки времени приходят целыми секундами эпохи вместо datetime
+        """
+        if not sources:
+            fail(f'Для создания экземпляра {s_type(self)} необходимо указать источники данных',
+                 reason=ValueError)
+
+        self.sources = tuple(sources)
+        self.max_gap = max_gap
+        self.placeholder = placeholder
+        self.epoch = epoch
+        self._columns = {source: i for i, source in enumerate(self.sources)}
+
+        if len(self._columns) != len(self.sources):
+            fail(f'Идентификаторы источников в {s_type(self)} должны быть уникальны',
+                 reason=ValueError)
+
+        self._seconds = array('q')
+        self._values: List[Any] = []
+        self._rows: Deque[list] = deque()
+        self._cursor: Optional[int] = None
+        self._newest: Optional[int] = None
+        self._origin: Any = None
+        self._origin_seconds = 0
+        self._pending: Dict[int, Set[int]] = {}
+        self._low = 0
+        self.clear()
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return (f'{s_type(self)}(sources={len(self.sources)}, max_gap={self.max_gap}, '
+                f'placeholder={self.placeholder!r}, epoch={self.epoch})')
+
+    def _moment(self, seconds: int) -> Any:
+        """
+        Метка времени для секунды сетки в единицах входных данных
+        """
+        if self.epoch:
+            return seconds
+        return self._origin + timedelta(seconds=seconds - self._origin_seconds)
+
+    def _extend(self, seconds: int) -> None:
+        """
+        Нарастить незавершённые строки сетки вплоть до заданной секунды
+        """
+        blank = [self.placeholder] * len(self.sources)
+        for moment in range(self._newest + 1, seconds + 1):
+            self._rows.append([self._moment(moment), *blank])
+        self._newest = max(self._newest, seconds)
+
+    def _limit(self) -> int:
+        """
+        Последняя секунда, значения которой уже не могут измениться ни у одного источника
+
+        Это секунда перед самой ранней последней меткой среди не замолчавших источников,
+        но не позже newest - 1. Источники разложены по своим последним меткам, а самая
+        ранняя из них только растёт, поэтому поиск продолжается с прошлого места
+        """
+        newest = self._newest
+        pending = self._pending
+        silent = newest - self.max_gap
+        low = self._low
+        while low < newest:
+            columns = pending.get(low)
+            if columns is not None:
+                if low >= silent:
+                    break
+                # эти источники замолчали, их ячейки после low получат заполнитель
+                del pending[low]
+            low += 1
+        self._low = low
+        return low - 1
+
+    def _emit(self, limit: int) -> List[list]:
+        """
+        Выдать завершённые строки вплоть до заданной секунды
+        """
+        result = []
+        rows = self._rows
+        while rows and self._cursor <= limit:
+            result.append(rows.popleft())
+            self._cursor += 1
+        return result
+
+    def push(self, source: Hashable, timestamp: Any, value: Any) -> List[list]:
+        """
+        Добавить показание источника и получить завершённые строки сетки
+
+        Подразумевается, что общий поток показаний отсортирован по времени
+        и метки времени уже округлены до целых секунд
+
+        :param source: идентификатор источника
+        :param timestamp: метка времени (datetime или секунды эпохи)
+        :param value: значение
+        :return: список широких строк [метка времени, значения источников...]
+        """
+        column = self._columns.get(source)
+        if column is None:
+            fail(f'Источник {source!r} не зарегистрирован в {s_type(self)}', reason=KeyError)
+
+        seconds = timestamp if self.epoch else int(timestamp.timestamp())
+
+        if self._cursor is None:
+            self._cursor = seconds
+            self._newest = seconds - 1
+            self._origin = timestamp
+            self._origin_seconds = seconds
+            self._low = seconds
+
+        last = self._seconds[column]
+        if seconds < self._cursor or seconds < last:
+            # это значение слишком старое
+            return []
+
+        self._extend(seconds)
+        rows = self._rows
+        cursor = self._cursor
+        offset = column + 1
+
+        if last != MISSING and seconds > last + 1:
+            fill = self._values[column] if seconds - last <= self.max_gap else self.placeholder
+            for moment in range(max(last + 1, cursor), seconds):
+                rows[moment - cursor][offset] = fill
+
+        rows[seconds - cursor][offset] = value
+        self._seconds[column] = seconds
+        self._values[column] = value
+
+        columns = self._pending.get(last)
+        if columns is not None:
+            columns.discard(column)
+            if not columns:
+                del self._pending[last]
+        self._pending.setdefault(seconds, set()).add(column)
+        if seconds < self._low:
+            self._low = seconds
+
+        return self._emit(self._limit())
+
+    def push_batch(self, samples: Iterable[Tuple[Hashable, Any, Any]]) -> List[list]:
+        """
+        Добавить пачку показаний (источник, метка времени, значение)
+
+        :param samples: последовательность показаний, отсортированная по времени
+        :return: завершённые строки в виде столбцов [метки времени, источник 1, источник 2, ...]
+        """
+        result = []
+        for source, timestamp, value in samples:
+            result.extend(self.push(source, timestamp, value))
+
+        if not result:
+            return []
+        return [list(column) for column in zip(*result)]
+
+    def flush(self) -> List[list]:
+        """
+        Выдать все незавершённые строки, считая что новых показаний не будет.
+        Секунды после последнего показания источника получают заполнитель
+        """
+        if self._cursor is None:
+            return []
+
+        return self._emit(self._newest)
+
+    def clear(self) -> None:
+        """
+        Сбросить в исходное состояние
+        """
+        self._seconds = array('q', [MISSING]) * len(self.sources)
+        self._values = [self.placeholder] * len(self.sources)
+        self._rows.clear()
+        self._cursor = None
+        self._newest = None
+        self._origin = None
+        self._origin_seconds = 0
+        self._pending.clear()
+        self._low = 0
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Отсортированная коллекция с быстрым доступом по порядковому номеру
+
+    Элементы хранятся в нескольких коротких отсортированных списках (блоках). Вставка
+    и удаление двигают только один блок, а количество элементов в блоках учитывается
+    деревом Фенвика, поэтому поиск k-го по величине элемента стоит O(log n).
+
+    Пример работы с коллекцией:
+    s = SortedBlocks()
+    s.add(5)
+    s.add(1)
+    s.add(3)
+    s[1] --> 3
+    s.remove(1)
+    s[0] --> 3
+
+"""
+# встроенные модули
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, List, Tuple
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+
+
+class SortedBlocks:
+    """
+    Отсортированная коллекция на базе блоков с индексом по порядковому номеру
+    """
+    __slots__ = ('_blocks', '_maxes', '_tree', '_load', '_len')
+
+    def __init__(self, load: int = 256):
+        """
+        Создание экземпляра
+
+        :param load: типичный размер блока, при превышении двойного размера блок делится
+        """
+        self._load = load
+        self._blocks: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._tree: List[int] = []
+        self._len = 0
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return f'{s_type(self)}(len={self._len}, blocks={len(self._blocks)})'
+
+    def __len__(self) -> int:
+        """
+        Количество элементов
+        """
+        return self._len
+
+    def __iter__(self):
+        """
+        Проитерироваться по элементам в порядке возрастания
+        """
+        for block in self._blocks:
+            yield from block
+
+    def _build_tree(self) -> None:
+        """
+        Собрать дерево Фенвика по длинам блоков (O(количества блоков))
+        """
+        tree = [0] + [len(block) for block in self._blocks]
+        size = len(tree)
+        for i in range(1, size):
+            j = i + (i & -i)
+            if j < size:
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _update_tree(self, position: int, delta: int) -> None:
+        """
+        Учесть изменение длины блока в дереве
+        """
+        if not self._tree:
+            return
+
+        tree = self._tree
+        size = len(tree)
+        i = position + 1
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """
+        Найти номер блока и смещение внутри него для элемента с порядковым номером index
+        """
+        if not self._tree:
+            self._build_tree()
+
+        tree = self._tree
+        size = len(tree)
+        position = 0
+        bit = 1 << (size - 1).bit_length()
+
+        while bit:
+            step = position + bit
+            if step < size and tree[step] <= index:
+                index -= tree[step]
+                position = step
+            bit >>= 1
+
+        return position, index
+
+    def add(self, value: Any) -> None:
+        """
+        Добавить элемент, сохраняя порядок
+        """
+        self._len += 1
+
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+            self._tree = []
+            return
+
+        position = bisect_right(self._maxes, value)
+        if position == len(self._blocks):
+            position -= 1
+            self._blocks[position].append(value)
+            self._maxes[position] = value
+        else:
+            insort(self._blocks[position], value)
+
+        block = self._blocks[position]
+        if len(block) > 2 * self._load:
+            # блок разросся, делим его пополам, индекс придётся собрать заново
+            self._blocks[position:position + 1] = [block[:self._load], block[self._load:]]
+            self._maxes.insert(position, block[self._load - 1])
+            self._tree = []
+        else:
+            self._update_tree(position, 1)
+
+    def remove(self, value: Any) -> None:
+        """
+        Удалить один экземпляр элемента
+        """
+        position = bisect_left(self._maxes, value)
+        if position == len(self._blocks):
+            fail(f'В экземпляре {s_type(self)} нет элемента {value!r}', reason=ValueError)
+
+        block = self._blocks[position]
+        index = bisect_left(block, value)
+        if block[index] != value:
+            fail(f'В экземпляре {s_type(self)} нет элемента {value!r}', reason=ValueError)
+
+        del block[index]
+        self._len -= 1
+
+        if block:
+            self._maxes[position] = block[-1]
+            self._update_tree(position, -1)
+        else:
+            del self._blocks[position]
+            del self._maxes[position]
+            self._tree = []
+
+    def clear(self) -> None:
+        """
+        Удалить все элементы
+        """
+        self._blocks.clear()
+        self._maxes.clear()
+        self._tree = []
+        self._len = 0
+
+    def __getitem__(self, index: int) -> Any:
+        """
+        Получить элемент по порядковому номеру в отсортированном порядке
+        """
+        if not -self._len <= index < self._len:
+            fail(f'В экземпляре {s_type(self)} нет элемента с индексом {index!r}',
+                 reason=IndexError)
+
+        if index < 0:
+            index += self._len
+
+        position, offset = self._locate(index)
+        return self._blocks[position][offset]
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер с бегущим индексом, ограниченный не количеством элементов, а их возрастом
+
+    Элементы добавляются вместе с меткой времени, а при каждом добавлении из хвоста
+    выталкиваются все элементы старше заданной длительности окна. Хранилище устроено
+    как у карусели (кольцо на базе списков), только при заполнении оно удваивается,
+    поэтому и добавление, и выталкивание стоят O(1) амортизированно.
+
+    Метки времени могут быть числами (например секундами эпохи) или datetime,
+    длительность окна задаётся в тех же единицах (числом или timedelta).
+
+    Пример работы с контейнером:
+    c = TimedCarousel(duration=60)
+    c.push(0, 'A')
+    c.push(30, 'B')
+    c.push(70, 'C')    # вытолкнут 'A', так как он старше 60 секунд
+    c.get_contents() --> ['B', 'C']
+
+"""
+# встроенные модули
+from typing import Any, List, Tuple, Iterator
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+
+
+class TimedCarousel:
+    """
+    Контейнер с окном по времени на базе растущего кольцевого списка.
+    Нужен для обработки непрерывного входного потока данных с неравномерными метками времени
+    """
+    __slots__ = ('_times', '_values', '_start', '_len', 'duration')
+
+    def __init__(self, duration: Any, capacity: int = 16):
+        """
+        Создание экземпляра
+
+        :param duration: длительность окна (число или timedelta, в зависимости от меток времени)
+        :param capacity: начальный размер внутреннего хранилища, при нехватке удваивается
+        """
+        if not duration or capacity < 1:
+            fail(f'Для создания экземпляра {s_type(self)} необходимо указать положительную '
+                 'длительность окна и начальный размер хранилища.', reason=ValueError)
+
+        self.duration = duration
+        self._times: List[Any] = [None] * capacity
+        self._values: List[Any] = [None] * capacity
+        self._start = 0
+        self._len = 0
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return f'{s_type(self)}(len={self._len}, duration={self.duration!r})'
+
+    def __len__(self) -> int:
+        """
+        Количество элементов в окне
+        """
+        return self._len
+
+    @property
+    def capacity(self) -> int:
+        """
+        Текущий размер внутреннего хранилища
+        """
+        return len(self._times)
+
+    def _ordered(self, data: List[Any]) -> List[Any]:
+        """
+        Получить заполненную часть хранилища в порядке добавления
+        """
+        end = self._start + self._len
+        if end <= len(data):
+            return data[self._start:end]
+        return data[self._start:] + data[:end - len(data)]
+
+    def _grow(self) -> None:
+        """
+        Удвоить внутреннее хранилище, уложив элементы с начала
+        """
+        padding = [None] * len(self._times)
+        self._times = self._ordered(self._times) + padding
+        self._values = self._ordered(self._values) + padding
+        self._start = 0
+
+    @property
+    def newest(self) -> Any:
+        """
+        Метка времени последнего элемента (None для пустого контейнера)
+        """
+        if not self._len:
+            return None
+        return self._times[(self._start + self._len - 1) % len(self._times)]
+
+    def expire(self, now: Any) -> List[Any]:
+        """
+        Вытолкнуть все элементы, которые к моменту now стали старше длительности окна
+
+        :param now: текущий момент времени
+        :return: вытолкнутые значения в порядке добавления
+        """
+        border = now - self.duration
+        times = self._times
+        values = self._values
+        size = len(times)
+        evicted = []
+
+        while self._len and times[self._start] <= border:
+            evicted.append(values[self._start])
+            times[self._start] = None
+            values[self._start] = None
+            self._start += 1
+            if self._start == size:
+                self._start = 0
+            self._len -= 1
+
+        return evicted
+
+    def push(self, timestamp: Any, value: Any) -> List[Any]:
+        """
+        Добавить элемент с меткой времени
+
+        :param timestamp: метка времени, не меньше метки последнего добавленного элемента
+        :param value: новый элемент любого типа
+        :return: значения, которые были вытолкнуты по возрасту
+        """
+        if self._len and timestamp < self.newest:
+            fail(f'Метка времени {timestamp!r} старше последней добавленной '
+                 f'в {s_type(self)} ({self.newest!r})', reason=ValueError)
+
+        if self._len == len(self._times):
+            self._grow()
+
+        position = (self._start + self._len) % len(self._times)
+        self._times[position] = timestamp
+        self._values[position] = value
+        self._len += 1
+
+        return self.expire(timestamp)
+
+    def get_contents(self) -> List[Any]:
+        """
+        Получить копию значений в порядке добавления
+        """
+        return self._ordered(self._values)
+
+    def get_timestamps(self) -> List[Any]:
+        """
+        Получить копию меток времени в порядке добавления
+        """
+        return self._ordered(self._times)
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        """
+        Получить пары (метка времени, значение) в порядке добавления
+        """
+        return list(zip(self.get_timestamps(), self.get_contents()))
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Проитерироваться по значениям в порядке добавления
+        """
+        return iter(self.get_contents())
+
+    def restore(self) -> None:
+        """
+        Удалить все элементы, сохранив размер хранилища
+        """
+        capacity = len(self._times)
+        self._times = [None] * capacity
+        self._values = [None] * capacity
+        self._start = 0
+        self._len = 0
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящего среднего в окне по времени.
+    В него можно постоянно можно добавлять элементы с метками времени и быстро получать среднее
+    за последние duration секунд
+
+    Пример работы с контейнером:
+    m = TimedMovingAverage(duration=60)
+    m.push(0, 1)     # среднее равно 1
+    m.push(30, 3)    # среднее равно 2
+    m.push(65, 5)    # среднее равно 4, значение 1 вытолкнуто по возрасту
+
+"""
+# модули проекта
+from trivial_tools.containers.class_timed_moving_sum import TimedMovingSum
+
+
+class TimedMovingAverage(TimedMovingSum):
+    """
+    Контейнер для вычисления скользящего среднего в окне по времени.
+    Добавление и выталкивание стоят O(1) амортизированно
+    """
+    __slots__ = ()
+
+    @property
+    def avg(self) -> float:
+        """
+        Среднее всех элементов в окне (0 для пустого окна)
+        """
+        if not self._len:
+            return 0.0
+        return self._sum / self._len
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Контейнер для вычисления скользящей суммы в окне по времени.
+    В него можно постоянно можно добавлять элементы с метками времени и быстро получать сумму
+    за последние duration секунд
+
+    Пример работы с контейнером:
+    m = TimedMovingSum(duration=60)
+    m.push(0, 8)     # сумма равна 8
+    m.push(30, 41)   # сумма равна 49
+    m.push(65, 9)    # сумма равна 50, значение 8 вытолкнуто по возрасту
+    m.expire(100)    # сумма равна 9
+
+"""
+# встроенные модули
+from typing import Union, Any, List
+
+# модули проекта
+from trivial_tools.containers.class_timed_carousel import TimedCarousel
+
+
+class TimedMovingSum(TimedCarousel):
+    """
+    Контейнер для вычисления скользящей суммы в окне по времени.
+    Добавление и выталкивание стоят O(1) амортизированно
+    """
+    __slots__ = ('_sum',)
+
+    def __init__(self, duration: Any, capacity: int = 16):
+        """
+        Создание экземпляра
+
+        :param duration: длительность окна (число или timedelta, в зависимости от меток времени)
+        :param capacity: начальный размер внутреннего хранилища, при нехватке удваивается
+        """
+        self._sum: Union[int, float] = 0
+        super().__init__(duration, capacity)
+
+    def expire(self, now: Any) -> List[Union[int, float]]:
+        """
+        Вытолкнуть устаревшие элементы и вычесть их из суммы
+
+        :param now: текущий момент времени
+        :return: вытолкнутые значения в порядке добавления
+        """
+        evicted = super().expire(now)
+        if evicted:
+            self._sum -= sum(evicted)
+            if not self._len:
+                # окно опустело, заодно сбрасываем накопленную ошибку округления
+                self._sum = 0
+        return evicted
+
+    def push(self, timestamp: Any, value: Union[int, float]) -> List[Union[int, float]]:
+        """
+        Добавить элемент с меткой времени
+
+        :param timestamp: метка времени, не меньше метки последнего добавленного элемента
+        :param value: новое число
+        :return: значения, которые были вытолкнуты по возрасту
+        """
+        evicted = super().push(timestamp, value)
+        self._sum += value
+        return evicted
+
+    def restore(self) -> None:
+        """
+        Сбросить параметры
+        """
+        self._sum = 0
+        super().restore()
+
+    @property
+    def sum(self) -> Union[int, float]:
+        """
+        Сумма всех элементов в окне
+        """
+        return self._sum
@@ -3,39 +3,59 @@
 
     Экземпляр поля для кеширующего класса
 
+    Срок хранения задаётся по монотонным часам (time.monotonic), поэтому не зависит от
+    перевода системного времени. Момент протухания хранится как обычное число с
+    плавающей точкой.
+
 """
 # встроенные модули
+import time
 from typing import Any, Optional
-from datetime import datetime, timedelta
 
 
 class CachingInstance:
     """
     Экземпляры этого класса хранятся в кеширующей машине
     """
-    __slots__ = ('value', 'expires')
+    __slots__ = ('value', 'expires', 'size')
+
+    def __init__(self, value: Any, expires: Optional[int] = None, now: Optional[float] = None,
+                 size: int = 0):
+        """
+        Создание экземпляра
 
-    def __init__(self, value: Any, expires: Optional[int] = None):
+        :param value: хранимое значение
+        :param expires: через сколько секунд значение протухнет (None - никогда)
+        :param now: текущий момент по монотонным часам (если не указан - берётся сейчас)
+        :param size: учтённый размер значения в байтах
+        """
         self.value = value
+        self.size = size
 
         if expires is None:
             self.expires = None
         else:
-            self.expires = datetime.now() + timedelta(seconds=expires)
+            if now is None:
+                now = time.monotonic()
+            self.expires = now + expires
 
-    def expired(self) -> bool:
+    def expired(self, now: Optional[float] = None) -> bool:
         """
         Проверить, протухло ли значение
         """
-        return not self.not_expired()
+        return not self.not_expired(now)
 
-    def not_expired(self) -> bool:
+    def not_expired(self, now: Optional[float] = None) -> bool:
         """
         Проверить, не протухло ли значение
         """
         if self.expires is None:
             return True
-        return bool(self.expires > datetime.now())
+
+        if now is None:
+            now = time.monotonic()
+
+        return self.expires > now
 
     def __repr__(self):
         """
@@ -5,11 +5,27 @@
 
 """
 # встроенные модули
+import sys
+import time
+import heapq
+import asyncio
+import inspect
+import functools
+import threading
+from itertools import count
 from types import FunctionType
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, List, Tuple, Callable, Set, Iterable
 
 # модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
 from trivial_tools.storage.caching_instance import CachingInstance
+from trivial_tools.storage.eviction import make_policy
+from trivial_tools.storage.single_flight import SingleFlight, AsyncSingleFlight
+from trivial_tools.storage.periodic import PeriodicThread
+
+MISSING = object()
+_KWARGS_MARK = object()
 
 
 class CachingMachine:
@@ -17,11 +33,47 @@ class CachingMachine:
     Специальный класс для выполнения функции локального кеша.
     Redis для бедных. Подразумевается, что эта штука может его
     временно заменить при сильной необходимости
+
+    При заполнении сначала удаляются устаревшие элементы, а если их нет -
+    вытесняется элемент по выбранной политике (lru, lfu или fifo)
+
+    Элементы со сроком хранения дополнительно попадают в кучу, упорядоченную по моменту
+    протухания, поэтому очистка трогает только действительно устаревшие элементы
+
+    Время берётся из монотонных часов, их можно подменить через параметр clock
+    (например для тестов). Каждая операция читает часы не более одного раза
+
+    Кроме количества элементов можно ограничить их суммарный размер в байтах (max_bytes).
+    Размер значения либо передаётся при записи, либо оценивается функцией sizer.
+    Стандартная оценка sys.getsizeof не учитывает вложенные объекты, поэтому для
+    контейнеров лучше передавать размер явно или подставить свою функцию
+
+    Машина ведёт счётчики попаданий, промахов, вытеснений и протуханий (см. stats).
+
+    Машина не потокобезопасна: её можно использовать из одного потока или из корутин
+    одного цикла событий. Для работы из нескольких потоков, в том числе для
+    cache_call с потоками и для stale_while_revalidate у обычных функций (обновление
+    идёт в фоновом потоке), нужна ShardedCachingMachine
     """
-    def __init__(self, expiration: Optional[int] = None, max_items: int = 1000):
+    # можно ли обращаться к машине из нескольких потоков сразу
+    thread_safe = False
+
+    def __init__(self, expiration: Optional[int] = None, max_items: int = 1000,
+                 policy: str = 'lru', clock: Callable[[], float] = time.monotonic,
+                 max_bytes: Optional[int] = None, sizer: Callable[[Any], int] = sys.getsizeof):
         self.expiration = expiration
         self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.clock = clock
+        self.policy = policy
+        self._policy = make_policy(policy)
         self._cache: Dict[str, CachingInstance] = {}
+        self._expiry: List[Tuple[float, int, Any, CachingInstance]] = []
+        self._sequence = count()
+        self._bytes = 0
+        self._function_stats: Dict[str, List[int]] = {}
+        self.reset_stats()
 
     def __getitem__(self, item):
         """
@@ -35,47 +87,179 @@ class CachingMachine:
         """
         return item in self._cache
 
-    def extract(self, key: Any) -> Optional[Any]:
+    def extract(self, key: Any, default: Any = None) -> Optional[Any]:
         """
         Общая функция извлечения значения. В отличии от редиса,
         мы можем хранить какие попало значения, поэтому в итоге всё сводится к
         одной этой функции
+
+        :param default: что вернуть, если значения нет или оно протухло
         """
-        if key in self._cache:
-            instance = self._cache[key]
-            if instance.not_expired():
-                return self._cache[key].value
-            else:
-                self.delete(key)
-        return None
+        return self._extract(key, default, self.clock())
+
+    def _extract(self, key: Any, default: Any, now: float) -> Optional[Any]:
+        """
+        Извлечение значения на заданный момент
+        """
+        instance = self._cache.get(key)
+        if instance is not None:
+            if instance.not_expired(now):
+                self._hits += 1
+                self._policy.touch(key)
+                return instance.value
+            self._remove(key)
+            self._expirations += 1
+        self._misses += 1
+        return default
+
+    def extract_many(self, keys: Iterable[Any], default: Any = None) -> List[Any]:
+        """
+        Извлечь значения сразу для многих ключей (аналог MGET).
+        Часы читаются один раз на всю пачку
+
+        :param default: что подставить для отсутствующих и протухших значений
+        :return: значения в порядке ключей
+        """
+        now = self.clock()
+        extract = self._extract
+        return [extract(key, default, now) for key in keys]
 
-    def assign(self, key: Any, value: Any, expires: Optional[int] = None) -> bool:
+    def peek(self, key: Any) -> Optional[CachingInstance]:
+        """
+        Получить хранимый экземпляр без проверки срока и без учёта обращения
+        """
+        return self._cache.get(key)
+
+    def assign(self, key: Any, value: Any, expires: Optional[int] = None,
+               size: Optional[int] = None) -> bool:
         """
         Общая функция установки значения. В отличии от редиса,
         мы можем хранить какие попало значения, поэтому в итоге всё сводится к
         одной этой функции. Типы должны быть проверены перед вызовом
+
+        :param size: размер значения в байтах (если не указан и задан max_bytes - оценивается)
+        :return: False, если значение не влезает в ограничение по байтам даже в пустой кеш
         """
-        if self.is_full():
-            self.cleanup()
-            if self.is_full():
-                return False
+        return self._assign(key, value, expires, size, self.clock())
+
+    def _assign(self, key: Any, value: Any, expires: Optional[int],
+                size: Optional[int], now: float) -> bool:
+        """
+        Установка значения на заданный момент
+        """
+        cache = self._cache
+        max_bytes = self.max_bytes
+        if size is None:
+            size = 0 if max_bytes is None else self.sizer(value)
+
+        if max_bytes is not None and size > max_bytes:
+            return False
+
+        old = cache.get(key)
+        # быстрый путь: перезапись или свободное место без ограничения по байтам
+        if (max_bytes is not None or (old is None and len(cache) >= self.max_items)) \
+                and self._needs_room(key, size):
+            self.cleanup(now)
+            while cache and self._needs_room(key, size):
+                self.evict()
+            old = cache.get(key)
 
         if expires is None:
             expires = self.expiration
 
-        self._cache[key] = CachingInstance(
+        instance = CachingInstance(
             value=value,
-            expires=expires
+            expires=expires,
+            now=now,
+            size=size
         )
+        if old is not None:
+            self._bytes -= old.size
+        cache[key] = instance
+        self._bytes += size
+        self._policy.insert(key)
+
+        if instance.expires is not None:
+            self._index_expiry(key, instance)
+
         return True
 
+    def assign_many(self, mapping: Dict[Any, Any], expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много значений (аналог MSET).
+        Часы читаются один раз на всю пачку, все значения получают одинаковый срок
+
+        :return: False, если хотя бы одно значение не удалось сохранить
+        """
+        now = self.clock()
+        assign = self._assign
+        stored = True
+        for key, value in mapping.items():
+            stored &= assign(key, value, expires, None, now)
+        return stored
+
+    def _needs_room(self, key: Any, size: int) -> bool:
+        """
+        Нужно ли освободить место перед записью значения с таким размером
+        """
+        old = self._cache.get(key)
+        if old is None and self.is_full():
+            return True
+
+        if self.max_bytes is None:
+            return False
+
+        freed = 0 if old is None else old.size
+        return self._bytes - freed + size > self.max_bytes
+
+    def _index_expiry(self, key: Any, instance: CachingInstance) -> None:
+        """
+        Добавить элемент в кучу сроков хранения
+
+        Записи удалённых и перезаписанных элементов остаются в куче и выбрасываются лениво.
+        Если таких записей становится слишком много, куча пересобирается
+        """
+        entry = (instance.expires, next(self._sequence), key, instance)
+        heapq.heappush(self._expiry, entry)
+
+        if len(self._expiry) > 2 * len(self._cache) + 64:
+            self._expiry = [x for x in self._expiry if self._cache.get(x[2]) is x[3]]
+            heapq.heapify(self._expiry)
+
+    def evict(self) -> Optional[Any]:
+        """
+        Вытеснить один элемент согласно политике, вернуть его ключ
+        """
+        if not self._cache:
+            return None
+
+        key = self._policy.victim()
+        self._remove(key)
+        self._evictions += 1
+        return key
+
+    @property
+    def bytes_used(self) -> int:
+        """
+        Суммарный учтённый размер хранимых значений в байтах
+        """
+        return self._bytes
+
+    @property
+    def evictions(self) -> int:
+        """
+        Сколько элементов было вытеснено политикой (протухшие не считаются)
+        """
+        return self._evictions
+
     def get(self, key: str) -> Optional[str]:
         """
         Получить строковое значение по ключу
         """
         return self.extract(key)
 
-    def set(self, key: str, value: str, expires: Optional[int] = None) -> bool:
+    def set(self, key: str, value: str, expires: Optional[int] = None,
+            size: Optional[int] = None) -> bool:
         """
         Установить строковое значение по ключу
         """
@@ -83,7 +267,23 @@ class CachingMachine:
             print('Метод set принимает только строковые значения!')
             return False
 
-        return self.assign(key, value, expires)
+        return self.assign(key, value, expires, size)
+
+    def get_many(self, keys: Iterable[str]) -> List[Optional[str]]:
+        """
+        Получить строковые значения сразу для многих ключей
+        """
+        return self.extract_many(keys)
+
+    def set_many(self, mapping: Dict[str, str], expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много строковых значений
+        """
+        if not all(isinstance(value, str) for value in mapping.values()):
+            print('Метод set_many принимает только строковые значения!')
+            return False
+
+        return self.assign_many(mapping, expires)
 
     def exists(self, key: str) -> bool:
         """
@@ -95,10 +295,27 @@ class CachingMachine:
         """
         Удалить значение из кеша
         """
-        if self.exists(key):
-            del self._cache[key]
-            return True
-        return False
+        return self._remove(key)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Удалить сразу много значений, вернуть сколько было удалено
+        """
+        remove = self._remove
+        return sum(remove(key) for key in keys)
+
+    def _remove(self, key: Any) -> bool:
+        """
+        Убрать элемент из памяти. Через этот метод проходят и удаление,
+        и вытеснение, и очистка от протухших элементов
+        """
+        instance = self._cache.pop(key, None)
+        if instance is None:
+            return False
+
+        self._bytes -= instance.size
+        self._policy.remove(key)
+        return True
 
     def total(self) -> int:
         """
@@ -111,24 +328,143 @@ class CachingMachine:
         Очистить память
         """
         self._cache.clear()
+        self._policy.clear()
+        self._expiry.clear()
+        self._bytes = 0
 
-    def cleanup(self) -> int:
+    def cleanup(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
         """
         Удалить устаревшие элементы
+
+        Стоимость пропорциональна количеству удалённых элементов (плюс устаревшие записи кучи)
+
+        :param now: текущий момент по часам машины (если не указан - берётся сейчас)
+        :param limit: сколько записей кучи разобрать не более (по умолчанию - все устаревшие)
         """
+        if now is None:
+            now = self.clock()
+
+        if limit is None:
+            limit = len(self._expiry)
+
+        started = time.perf_counter()
         removed = 0
-        keys = list(self._cache.keys())
-        for key in keys:
-            if self.exists(key) and self[key].expired():
-                self.delete(key)
+        expiry = self._expiry
+        while limit > 0 and expiry and expiry[0][0] <= now:
+            limit -= 1
+            _, _, key, instance = heapq.heappop(expiry)
+            if self._cache.get(key) is instance:
+                self._remove(key)
                 removed += 1
+
+        self._expirations += removed
+        self._cleanups += 1
+        self._cleanup_seconds += time.perf_counter() - started
         return removed
 
+    def has_expired(self, now: Optional[float] = None) -> bool:
+        """
+        Остались ли в куче устаревшие записи
+        """
+        if now is None:
+            now = self.clock()
+        return bool(self._expiry) and self._expiry[0][0] <= now
+
+    def sweep(self, max_seconds: float = 0.001, batch: int = 64) -> int:
+        """
+        Активная очистка небольшими порциями, ограниченная по времени
+
+        Устаревшие элементы разбираются пачками по batch записей кучи, после каждой
+        пачки проверяется, не исчерпан ли бюджет времени. Так очистка не задерживает
+        остальные операции надолго, даже если устарело очень много элементов
+
+        :param max_seconds: бюджет времени на один вызов
+        :param batch: сколько записей кучи разбирать за одну порцию
+        :return: количество удалённых элементов
+        """
+        started = time.perf_counter()
+        now = self.clock()
+        removed = 0
+        while True:
+            removed += self.cleanup(now, batch)
+            if not self.has_expired(now) or time.perf_counter() - started >= max_seconds:
+                return removed
+
+    async def sweep_forever(self, interval: float = 1.0, max_seconds: float = 0.001,
+                            batch: int = 64) -> None:
+        """
+        Фоновая активная очистка для работы в цикле событий (как активное протухание в редисе)
+
+        Раз в interval секунд выполняется sweep. Если за отведённое время устаревшие
+        элементы разобрать не удалось, следующая порция идёт сразу после того,
+        как другие корутины получат управление
+
+        Сама машина не потокобезопасна, поэтому фоновая очистка в отдельном потоке
+        есть только у ShardedCachingMachine
+        """
+        while True:
+            self.sweep(max_seconds, batch)
+            await asyncio.sleep(0 if self.has_expired() else interval)
+
+    def _counters(self) -> Dict[str, Any]:
+        """
+        Значения счётчиков машины
+        """
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+            'cleanups': self._cleanups,
+            'cleanup_seconds': self._cleanup_seconds,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Снимок статистики работы машины
+
+        :return: словарь с количеством элементов и байт, попаданиями, промахами, долей
+        попаданий, вытеснениями, протуханиями, количеством и суммарным временем очисток,
+        а также попаданиями и промахами по каждой функции под cache_call
+        """
+        result = {'items': self.total(), 'bytes_used': self.bytes_used}
+        result.update(self._counters())
+        lookups = result['hits'] + result['misses']
+        result['hit_ratio'] = result['hits'] / lookups if lookups else 0.0
+        result['functions'] = {
+            name: {'hits': hits, 'misses': misses}
+            for name, (hits, misses) in list(self._function_stats.items())
+        }
+        return result
+
+    def reset_stats(self) -> None:
+        """
+        Обнулить счётчики статистики
+        """
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._cleanups = 0
+        self._cleanup_seconds = 0.0
+        for counters in self._function_stats.values():
+            counters[:] = [0, 0]
+
+    def report_stats(self, callback: Callable[[Dict[str, Any]], None],
+                     interval: float = 60.0) -> PeriodicThread:
+        """
+        Периодически передавать снимок статистики в callback (например для выгрузки
+        в систему метрик). Вызов идёт в фоновом потоке
+
+        :return: запущенная задача, её можно остановить через stop()
+        """
+        return PeriodicThread(interval, lambda: callback(self.stats())).start()
+
     def is_full(self):
         """
         Проверить заполнен ли кеш
         """
-        return self.total() == self.max_items
+        return self.total() >= self.max_items
 
     def keys(self) -> list:
         """
@@ -136,33 +472,149 @@ class CachingMachine:
         """
         return list(self._cache.keys())
 
-    def cache_call(self, expires: Optional[int] = None):
+    def _cached(self, func: FunctionType, make_key: Callable, expires: Optional[int],
+                stale_while_revalidate: bool) -> Callable:
         """
-        Кешировать результат выполнения функции
+        Обёртка для кеширования результатов функции
+
+        Одновременные промахи по одному ключу объединяются: функцию вычисляет только
+        первый вызывающий, остальные ждут его результата. В режиме stale_while_revalidate
+        протухшее значение отдаётся сразу, а обновление идёт в фоне.
+        Для корутинных функций кешируется результат ожидания, а не объект корутины
+
+        Объединение промахов из разных потоков безопасно только поверх потокобезопасной
+        машины (ShardedCachingMachine). Фоновое обновление обычных функций идёт в отдельном
+        потоке, поэтому на других машинах оно запрещено
+        """
+        if inspect.iscoroutinefunction(func):
+            return self._cached_async(func, make_key, expires, stale_while_revalidate)
+
+        if stale_while_revalidate and not self.thread_safe:
+            fail(f'{s_type(self)} не потокобезопасна, stale_while_revalidate для обычной '
+                 f'функции {func.__qualname__} требует ShardedCachingMachine',
+                 reason=ValueError)
+
+        flight = SingleFlight()
+        counters = self._function_stats.setdefault(func.__qualname__, [0, 0])
+
+        def load(key, args, kwargs):
+            # пока мы ждали своей очереди, значение мог положить другой поток.
+            # Смотрим через peek, чтобы не засчитать промах в статистику второй раз
+            instance = self.peek(key)
+            if instance is not None and instance.not_expired(self.clock()):
+                return instance.value
+
+            result = func(*args, **kwargs)
+            self.assign(key, result, expires)
+            return result
+
+        def refresh(key, args, kwargs):
+            # к идущему обновлению могут присоединиться обычные промахи, им нужен результат
+            result = func(*args, **kwargs)
+            self.assign(key, result, expires)
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+
+            if stale_while_revalidate:
+                instance = self.peek(key)
+                if instance is not None and instance.expired(self.clock()):
+                    if not flight.in_flight(key):
+                        threading.Thread(target=flight.do,
+                                         args=(key, refresh, key, args, kwargs),
+                                         daemon=True).start()
+                    counters[0] += 1
+                    return instance.value
+
+            result = self.extract(key, MISSING)
+            if result is MISSING:
+                counters[1] += 1
+                result = flight.do(key, load, key, args, kwargs)
+            else:
+                counters[0] += 1
+            return result
+        return wrapper
+
+    def _cached_async(self, func: Callable, make_key: Callable, expires: Optional[int],
+                      stale_while_revalidate: bool) -> Callable:
+        """
+        Обёртка для кеширования результатов корутинной функции
+        """
+        flight = AsyncSingleFlight()
+        counters = self._function_stats.setdefault(func.__qualname__, [0, 0])
+        refreshes: Set[asyncio.Task] = set()
+
+        async def load(key, args, kwargs):
+            instance = self.peek(key)
+            if instance is not None and instance.not_expired(self.clock()):
+                return instance.value
+
+            result = await func(*args, **kwargs)
+            self.assign(key, result, expires)
+            return result
+
+        async def refresh(key, args, kwargs):
+            result = await func(*args, **kwargs)
+            self.assign(key, result, expires)
+            return result
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+
+            if stale_while_revalidate:
+                instance = self.peek(key)
+                if instance is not None and instance.expired(self.clock()):
+                    if not flight.in_flight(key):
+                        # держим ссылку на задачу, иначе её может собрать сборщик мусора
+                        task = asyncio.ensure_future(flight.do(key, refresh, key, args, kwargs))
+                        refreshes.add(task)
+                        task.add_done_callback(refreshes.discard)
+                    counters[0] += 1
+                    return instance.value
+
+            result = self.extract(key, MISSING)
+            if result is MISSING:
+                counters[1] += 1
+                result = await flight.do(key, load, key, args, kwargs)
+            else:
+                counters[0] += 1
+            return result
+        return wrapper
+
+    def cache_call(self, expires: Optional[int] = None, stale_while_revalidate: bool = False):
+        """
+        Кешировать результат выполнения функции (обычной или корутинной)
+
+        Ключ строится из имени функции, позиционных и именованных аргументов,
+        все они должны быть хешируемыми. Если декорированную функцию вызывают
+        из нескольких потоков, используйте ShardedCachingMachine
         """
         def decorator(func: FunctionType):
-            def wrapper(*args):
-                key = (func.__name__, args)
-                if key in self:
-                    result = self.extract(key)
-                else:
-                    result = func(*args)
-                    self.assign(key, result, expires)
-                return result
-            return wrapper
+            name = func.__name__
+
+            def make_key(args, kwargs):
+                if kwargs:
+                    return name, args, _KWARGS_MARK, *kwargs.items()
+                return name, args
+            return self._cached(func, make_key, expires, stale_while_revalidate)
         return decorator
 
-    def cache_call_using_strings(self, expires: Optional[int] = None):
+    def cache_call_using_strings(self, expires: Optional[int] = None,
+                                 stale_while_revalidate: bool = False):
         """
-        Кешировать результат выполнения функции, но ключи хранить в виде строк
+        Кешировать результат выполнения функции (обычной или корутинной),
+        но ключи хранить в виде строк
         """
         def decorator(func: FunctionType):
-            def wrapper(*args):
-                key = f'{func.__name__}_' + '_'.join(str(x) for x in args)
-                if key not in self:
-                    result = func(*args)
-                    self.assign(key, result, expires)
-                value = self.extract(key)
-                return value
-            return wrapper
+            prefix = f'{func.__name__}_'
+
+            def make_key(args, kwargs):
+                key = prefix + '_'.join(str(x) for x in args)
+                if kwargs:
+                    key += '_' + '_'.join(f'{name}={value}' for name, value in kwargs.items())
+                return key
+            return self._cached(func, make_key, expires, stale_while_revalidate)
         return decorator
@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Кеширующие машины для конкурентного доступа
+
+    ShardedCachingMachine - для потоков. Ключи раскладываются по нескольким независимым
+    машинам (шардам) по хешу ключа, у каждого шарда свой замок. Потоки, работающие
+    с разными ключами, почти никогда не ждут друг друга.
+
+    AsyncCachingMachine - для корутин. Операции асинхронные, но внутри не отдают управление
+    циклу событий, поэтому их можно безопасно вызывать из разных задач одного цикла событий.
+
+"""
+# встроенные модули
+import sys
+import time
+import asyncio
+import threading
+from typing import Any, Optional, Callable, List, Dict, Iterable
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+from trivial_tools.storage.caching_instance import CachingInstance
+from trivial_tools.storage.caching_machine import CachingMachine
+from trivial_tools.storage.periodic import PeriodicThread
+
+
+def _split(total: int, parts: int) -> List[int]:
+    """
+    Разделить ограничение между шардами так, чтобы доли в сумме давали ровно total
+    """
+    share, remainder = divmod(total, parts)
+    return [share + 1 if i < remainder else share for i in range(parts)]
+
+
+class ShardedCachingMachine(CachingMachine):
+    """
+    Потокобезопасная кеширующая машина с разбиением на шарды
+
+    Ограничения max_items и max_bytes делятся поровну между шардами (остаток достаётся
+    первым шардам, в сумме доли дают ровно ограничение), поэтому вытеснение и очистка
+    работают в пределах одного шарда и не требуют глобальной блокировки.
+    Шардов создаётся не больше, чем max_items.
+    Значение больше доли одного шарда в max_bytes не сохраняется.
+    Декораторы cache_call и cache_call_using_strings наследуются без изменений
+    """
+    thread_safe = True
+
+    def __init__(self, expiration: Optional[int] = None, max_items: int = 1000,
+                 policy: str = 'lru', clock: Callable[[], float] = time.monotonic,
+                 max_bytes: Optional[int] = None, sizer: Callable[[Any], int] = sys.getsizeof,
+                 shards: int = 16):
+        """
+        Создание экземпляра
+
+        :param shards: количество независимых частей со своими замками
+        """
+        if shards < 1:
+            fail(f'Для создания экземпляра {s_type(self)} необходимо указать '
+                 f'положительное количество шардов', reason=ValueError)
+
+        self.expiration = expiration
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.clock = clock
+        self.policy = policy
+        # шардов не больше, чем элементов, иначе часть из них не смогла бы хранить ничего
+        shards = max(1, min(shards, max_items))
+        items = _split(max_items, shards)
+        sizes = [None] * shards if max_bytes is None else _split(max_bytes, shards)
+        self._shards = [CachingMachine(expiration, items[i], policy, clock, sizes[i], sizer)
+                        for i in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._function_stats: Dict[str, List[int]] = {}
+        self._sweep_cursor = 0
+
+    def _route(self, key: Any) -> int:
+        """
+        Номер шарда, в котором лежит ключ
+        """
+        return hash(key) % len(self._shards)
+
+    def __getitem__(self, item):
+        """
+        Прямой доступ к содержимому словаря
+        """
+        index = self._route(item)
+        with self._locks[index]:
+            return self._shards[index][item]
+
+    def __contains__(self, item):
+        """
+        Проверка наличия внутри кеша
+        """
+        index = self._route(item)
+        with self._locks[index]:
+            return item in self._shards[index]
+
+    def extract(self, key: Any, default: Any = None) -> Optional[Any]:
+        """
+        Извлечь значение по ключу
+        """
+        index = self._route(key)
+        with self._locks[index]:
+            return self._shards[index].extract(key, default)
+
+    def peek(self, key: Any) -> Optional[CachingInstance]:
+        """
+        Получить хранимый экземпляр без проверки срока и без учёта обращения
+        """
+        index = self._route(key)
+        with self._locks[index]:
+            return self._shards[index].peek(key)
+
+    def assign(self, key: Any, value: Any, expires: Optional[int] = None,
+               size: Optional[int] = None) -> bool:
+        """
+        Установить значение по ключу
+        """
+        index = self._route(key)
+        with self._locks[index]:
+            return self._shards[index].assign(key, value, expires, size)
+
+    def _group(self, keys: Iterable[Any]) -> Dict[int, List[int]]:
+        """
+        Разложить позиции ключей по шардам, чтобы брать замок шарда один раз
+        """
+        groups: Dict[int, List[int]] = {}
+        route = self._route
+        for position, key in enumerate(keys):
+            groups.setdefault(route(key), []).append(position)
+        return groups
+
+    def extract_many(self, keys: Iterable[Any], default: Any = None) -> List[Any]:
+        """
+        Извлечь значения сразу для многих ключей, каждый шард блокируется один раз
+        """
+        keys = list(keys)
+        result = [default] * len(keys)
+        now = self.clock()
+        for index, positions in self._group(keys).items():
+            shard = self._shards[index]
+            with self._locks[index]:
+                for position in positions:
+                    result[position] = shard._extract(keys[position], default, now)
+        return result
+
+    def assign_many(self, mapping: Dict[Any, Any], expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много значений, каждый шард блокируется один раз
+        """
+        items = list(mapping.items())
+        now = self.clock()
+        stored = True
+        for index, positions in self._group(key for key, _ in items).items():
+            shard = self._shards[index]
+            with self._locks[index]:
+                for position in positions:
+                    key, value = items[position]
+                    stored &= shard._assign(key, value, expires, None, now)
+        return stored
+
+    def delete_many(self, keys: Iterable[Any]) -> int:
+        """
+        Удалить сразу много значений, каждый шард блокируется один раз
+        """
+        keys = list(keys)
+        removed = 0
+        for index, positions in self._group(keys).items():
+            shard = self._shards[index]
+            with self._locks[index]:
+                removed += sum(shard._remove(keys[position]) for position in positions)
+        return removed
+
+    def evict(self) -> Optional[Any]:
+        """
+        Вытеснить один элемент из самого заполненного шарда, вернуть его ключ
+        """
+        index = max(range(len(self._shards)), key=lambda i: self._shards[i].total())
+        with self._locks[index]:
+            return self._shards[index].evict()
+
+    @property
+    def bytes_used(self) -> int:
+        """
+        Суммарный учтённый размер хранимых значений в байтах
+        """
+        return sum(shard.bytes_used for shard in self._shards)
+
+    @property
+    def evictions(self) -> int:
+        """
+        Сколько элементов было вытеснено политикой во всех шардах
+        """
+        return sum(shard.evictions for shard in self._shards)
+
+    def _counters(self) -> Dict[str, Any]:
+        """
+        Значения счётчиков, просуммированные по всем шардам
+        """
+        result: Dict[str, Any] = {}
+        for shard in self._shards:
+            for name, value in shard._counters().items():
+                result[name] = result.get(name, 0) + value
+        return result
+
+    def reset_stats(self) -> None:
+        """
+        Обнулить счётчики статистики во всех шардах
+        """
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.reset_stats()
+        for counters in self._function_stats.values():
+            counters[:] = [0, 0]
+
+    def exists(self, key: str) -> bool:
+        """
+        Проверить, есть ли у нас значение для этого ключа
+        """
+        return key in self
+
+    def delete(self, key: str) -> bool:
+        """
+        Удалить значение из кеша
+        """
+        index = self._route(key)
+        with self._locks[index]:
+            return self._shards[index].delete(key)
+
+    def total(self) -> int:
+        """
+        Узнать сколько элементов мы храним
+        """
+        return sum(shard.total() for shard in self._shards)
+
+    def clear(self):
+        """
+        Очистить память
+        """
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+    def cleanup(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """
+        Удалить устаревшие элементы, шарды блокируются по очереди
+
+        :param limit: сколько записей кучи разобрать не более в каждом шарде
+        """
+        if now is None:
+            now = self.clock()
+
+        removed = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                removed += shard.cleanup(now, limit)
+        return removed
+
+    def has_expired(self, now: Optional[float] = None) -> bool:
+        """
+        Остались ли устаревшие записи хотя бы в одном шарде
+        """
+        if now is None:
+            now = self.clock()
+        return any(shard.has_expired(now) for shard in self._shards)
+
+    def sweep(self, max_seconds: float = 0.001, batch: int = 64) -> int:
+        """
+        Активная очистка небольшими порциями, ограниченная по времени
+
+        Шарды обходятся по кругу, замок шарда держится только на время одной порции,
+        поэтому читатели других ключей ждут не дольше обработки batch записей.
+        Следующий вызов продолжает обход с того шарда, на котором остановился предыдущий
+        """
+        started = time.perf_counter()
+        now = self.clock()
+        removed = 0
+        count = len(self._shards)
+        idle = 0
+        while idle < count:
+            index = self._sweep_cursor
+            self._sweep_cursor = (index + 1) % count
+            shard = self._shards[index]
+            with self._locks[index]:
+                removed += shard.cleanup(now, batch)
+                pending = shard.has_expired(now)
+
+            idle = 0 if pending else idle + 1
+            if time.perf_counter() - started >= max_seconds:
+                break
+        return removed
+
+    def start_sweeper(self, interval: float = 1.0, max_seconds: float = 0.001,
+                      batch: int = 64) -> PeriodicThread:
+        """
+        Запустить фоновый поток активной очистки
+
+        :param interval: пауза между вызовами sweep в секундах
+        :return: запущенная задача, её можно остановить через stop()
+        """
+        return PeriodicThread(interval, lambda: self.sweep(max_seconds, batch)).start()
+
+    def keys(self) -> List[Any]:
+        """
+        Получить все ключи машины
+        """
+        result = []
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                result.extend(shard.keys())
+        return result
+
+
+class AsyncCachingMachine:
+    """
+    Кеширующая машина для работы из корутин одного цикла событий
+
+    Замок не нужен: операции машины синхронные и не отдают управление циклу событий,
+    поэтому другая задача не может вклиниться посреди операции. Методы оставлены
+    асинхронными, чтобы вызывающий код не менялся, если хранилище станет внешним
+    """
+    __slots__ = ('machine',)
+
+    def __init__(self, expiration: Optional[int] = None, max_items: int = 1000,
+                 policy: str = 'lru', clock: Callable[[], float] = time.monotonic,
+                 max_bytes: Optional[int] = None, sizer: Callable[[Any], int] = sys.getsizeof):
+        self.machine = CachingMachine(expiration, max_items, policy, clock, max_bytes, sizer)
+
+    def __getitem__(self, item):
+        """
+        Прямой доступ к содержимому словаря
+        """
+        return self.machine[item]
+
+    def __contains__(self, item):
+        """
+        Проверка наличия внутри кеша
+        """
+        return item in self.machine
+
+    async def extract(self, key: Any, default: Any = None) -> Optional[Any]:
+        """
+        Извлечь значение по ключу
+        """
+        return self.machine.extract(key, default)
+
+    def peek(self, key: Any) -> Optional[CachingInstance]:
+        """
+        Получить хранимый экземпляр без проверки срока и без учёта обращения
+        """
+        return self.machine.peek(key)
+
+    async def assign(self, key: Any, value: Any, expires: Optional[int] = None,
+                     size: Optional[int] = None) -> bool:
+        """
+        Установить значение по ключу
+        """
+        return self.machine.assign(key, value, expires, size)
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Получить строковое значение по ключу
+        """
+        return self.machine.get(key)
+
+    async def set(self, key: str, value: str, expires: Optional[int] = None,
+                  size: Optional[int] = None) -> bool:
+        """
+        Установить строковое значение по ключу
+        """
+        return self.machine.set(key, value, expires, size)
+
+    async def extract_many(self, keys: Iterable[Any], default: Any = None) -> List[Any]:
+        """
+        Извлечь значения сразу для многих ключей
+        """
+        return self.machine.extract_many(keys, default)
+
+    async def assign_many(self, mapping: Dict[Any, Any], expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много значений
+        """
+        return self.machine.assign_many(mapping, expires)
+
+    async def get_many(self, keys: Iterable[str]) -> List[Optional[str]]:
+        """
+        Получить строковые значения сразу для многих ключей
+        """
+        return self.machine.get_many(keys)
+
+    async def set_many(self, mapping: Dict[str, str], expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много строковых значений
+        """
+        return self.machine.set_many(mapping, expires)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Удалить сразу много значений
+        """
+        return self.machine.delete_many(keys)
+
+    async def delete(self, key: str) -> bool:
+        """
+        Удалить значение из кеша
+        """
+        return self.machine.delete(key)
+
+    async def evict(self) -> Optional[Any]:
+        """
+        Вытеснить один элемент согласно политике, вернуть его ключ
+        """
+        return self.machine.evict()
+
+    @property
+    def bytes_used(self) -> int:
+        """
+        Суммарный учтённый размер хранимых значений в байтах
+        """
+        return self.machine.bytes_used
+
+    @property
+    def evictions(self) -> int:
+        """
+        Сколько элементов было вытеснено политикой (протухшие не считаются)
+        """
+        return self.machine.evictions
+
+    async def cleanup(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """
+        Удалить устаревшие элементы
+        """
+        return self.machine.cleanup(now, limit)
+
+    def has_expired(self, now: Optional[float] = None) -> bool:
+        """
+        Остались ли в куче устаревшие записи
+        """
+        return self.machine.has_expired(now)
+
+    async def sweep(self, max_seconds: float = 0.001, batch: int = 64) -> int:
+        """
+        Активная очистка небольшими порциями, ограниченная по времени (см. CachingMachine.sweep)
+        """
+        return self.machine.sweep(max_seconds, batch)
+
+    def start_sweeper(self, interval: float = 1.0, max_seconds: float = 0.001,
+                      batch: int = 64) -> asyncio.Task:
+        """
+        Запустить фоновую задачу активной очистки в текущем цикле событий.
+        Задачу можно остановить через cancel()
+        """
+        return asyncio.ensure_future(self.machine.sweep_forever(interval, max_seconds, batch))
+
+    async def clear(self):
+        """
+        Очистить память
+        """
+        self.machine.clear()
+
+    def exists(self, key: str) -> bool:
+        """
+        Проверить, есть ли у нас значение для этого ключа
+        """
+        return self.machine.exists(key)
+
+    def total(self) -> int:
+        """
+        Узнать сколько элементов мы храним
+        """
+        return self.machine.total()
+
+    def is_full(self):
+        """
+        Проверить заполнен ли кеш
+        """
+        return self.machine.is_full()
+
+    def keys(self) -> list:
+        """
+        Получить все ключи машины
+        """
+        return self.machine.keys()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Снимок статистики работы машины
+        """
+        return self.machine.stats()
+
+    def reset_stats(self) -> None:
+        """
+        Обнулить статистику
+        """
+        self.machine.reset_stats()
+
+    def report_stats(self, callback: Callable[[Dict[str, Any]], None],
+                     interval: float = 60.0) -> PeriodicThread:
+        """
+        Периодически передавать снимок статистики в callback (см. CachingMachine.report_stats)
+        """
+        return self.machine.report_stats(callback, interval)
+
+    def cache_call(self, expires: Optional[int] = None, stale_while_revalidate: bool = False):
+        """
+        Кешировать результат выполнения корутинной функции (см. CachingMachine.cache_call)
+        """
+        return self.machine.cache_call(expires, stale_while_revalidate)
+
+    def cache_call_using_strings(self, expires: Optional[int] = None,
+                                 stale_while_revalidate: bool = False):
+        """
+        Кешировать результат выполнения корутинной функции, ключи хранить в виде строк
+        """
+        return self.machine.cache_call_using_strings(expires, stale_while_revalidate)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Политики вытеснения для кеширующей машины
+
+    Политика только следит за порядком ключей и подсказывает, кого выбросить,
+    сами значения хранятся в машине. Все операции стоят O(1).
+
+    LRU  - выбрасывается ключ, к которому дольше всех не обращались
+    LFU  - выбрасывается ключ с наименьшим числом обращений (при равенстве - самый старый)
+    FIFO - выбрасывается ключ, который был добавлен раньше всех
+
+"""
+# встроенные модули
+from collections import OrderedDict
+from typing import Any, Dict
+
+# модули проекта
+from trivial_tools.special.special import fail
+
+
+class LRUPolicy:
+    """
+    Вытеснение давно не используемых ключей
+    """
+    __slots__ = ('_order',)
+
+    def __init__(self):
+        self._order: Dict[Any, None] = OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        Количество отслеживаемых ключей
+        """
+        return len(self._order)
+
+    def insert(self, key: Any) -> None:
+        """
+        Учесть запись ключа
+        """
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def touch(self, key: Any) -> None:
+        """
+        Учесть обращение к ключу
+        """
+        self._order.move_to_end(key)
+
+    def remove(self, key: Any) -> None:
+        """
+        Перестать отслеживать ключ
+        """
+        self._order.pop(key, None)
+
+    def victim(self) -> Any:
+        """
+        Ключ, который следует вытеснить первым
+        """
+        return next(iter(self._order))
+
+    def clear(self) -> None:
+        """
+        Забыть все ключи
+        """
+        self._order.clear()
+
+
+class FIFOPolicy(LRUPolicy):
+    """
+    Вытеснение самых старых ключей, обращения на порядок не влияют
+    """
+    __slots__ = ()
+
+    def touch(self, key: Any) -> None:
+        """
+        Обращение к ключу порядок не меняет
+        """
+
+
+class _Frequency:
+    """
+    Узел списка частот LFU: ключи с одинаковым числом обращений в порядке добавления
+    """
+    __slots__ = ('count', 'keys', 'prev', 'next')
+
+    def __init__(self, count: int):
+        self.count = count
+        self.keys: Dict[Any, None] = OrderedDict()
+        self.prev: '_Frequency' = self
+        self.next: '_Frequency' = self
+
+    def link_after(self, node: '_Frequency') -> '_Frequency':
+        """
+        Вставить новый узел сразу после заданного
+        """
+        self.prev = node
+        self.next = node.next
+        node.next.prev = self
+        node.next = self
+        return self
+
+    def unlink(self) -> None:
+        """
+        Исключить узел из списка
+        """
+        self.prev.next = self.next
+        self.next.prev = self.prev
+
+
+class LFUPolicy:
+    """
+    Вытеснение редко используемых ключей
+
+    Узлы частот связаны в кольцевой список по возрастанию числа обращений, поэтому
+    наименьшая частота всегда лежит сразу после головы и не требует поиска
+    """
+    __slots__ = ('_nodes', '_head')
+
+    def __init__(self):
+        self._nodes: Dict[Any, _Frequency] = {}
+        self._head = _Frequency(0)
+
+    def __len__(self) -> int:
+        """
+        Количество отслеживаемых ключей
+        """
+        return len(self._nodes)
+
+    def _unlink(self, key: Any, node: _Frequency) -> None:
+        """
+        Убрать ключ из узла, пустой узел исключить из списка
+        """
+        del node.keys[key]
+        if not node.keys:
+            node.unlink()
+
+    def insert(self, key: Any) -> None:
+        """
+        Учесть запись ключа (перезапись считается обращением)
+        """
+        if key in self._nodes:
+            self.touch(key)
+            return
+
+        head = self._head
+        node = head.next
+        if node.count != 1:
+            node = _Frequency(1).link_after(head)
+        node.keys[key] = None
+        self._nodes[key] = node
+
+    def touch(self, key: Any) -> None:
+        """
+        Учесть обращение к ключу
+        """
+        node = self._nodes[key]
+        target = node.next
+        if target.count != node.count + 1:
+            target = _Frequency(node.count + 1).link_after(node)
+        target.keys[key] = None
+        self._nodes[key] = target
+        self._unlink(key, node)
+
+    def remove(self, key: Any) -> None:
+        """
+        Перестать отслеживать ключ
+        """
+        node = self._nodes.pop(key, None)
+        if node is not None:
+            self._unlink(key, node)
+
+    def victim(self) -> Any:
+        """
+        Ключ, который следует вытеснить первым
+        """
+        return next(iter(self._head.next.keys))
+
+    def clear(self) -> None:
+        """
+        Забыть все ключи
+        """
+        self._nodes.clear()
+        self._head = _Frequency(0)
+
+
+POLICIES = {
+    'lru': LRUPolicy,
+    'lfu': LFUPolicy,
+    'fifo': FIFOPolicy,
+}
+
+
+def make_policy(name: str):
+    """
+    Создать политику вытеснения по названию
+    """
+    if name not in POLICIES:
+        fail(f'Неизвестная политика вытеснения {name!r}, '
+             f'допустимые варианты: {tuple(POLICIES)}', reason=ValueError)
+
+    return POLICIES[name]()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Периодический вызов функции в фоновом потоке
+
+    Пример работы:
+    task = PeriodicThread(60, lambda: print(machine.stats())).start()
+    ...
+    task.stop()
+
+"""
+# встроенные модули
+import threading
+from typing import Callable, Optional
+
+# модули проекта
+from trivial_tools.formatters.base import s_type
+
+
+class PeriodicThread:
+    """
+    Вызывает функцию раз в interval секунд, пока его не остановят.
+    Исключение в функции не прерывает работу, следующий вызов будет по расписанию
+    """
+    __slots__ = ('interval', 'func', '_stop', '_thread')
+
+    def __init__(self, interval: float, func: Callable[[], None]):
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return f'{s_type(self)}(interval={self.interval}, running={self.running})'
+
+    @property
+    def running(self) -> bool:
+        """
+        Работает ли фоновый поток
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'PeriodicThread':
+        """
+        Запустить фоновый поток
+        """
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Остановить фоновый поток и дождаться его завершения
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """
+        Основной цикл фонового потока
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as exc:
+                print(f'{s_type(self)}: ошибка при периодическом вызове: {exc!r}')
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Кеширующая машина с вторым уровнем на диске
+
+    Первый уровень - обычная CachingMachine в памяти. Второй - файл sqlite, в котором
+    значения лежат в сериализованном через pickle виде. Сроки хранения на диске хранятся
+    по системным часам (time.time), потому что монотонные часы после перезапуска
+    процесса начинают отсчёт заново.
+
+    При промахе в памяти значение ищется на диске и, если оно ещё не протухло,
+    поднимается в память с оставшимся сроком. Поэтому после перезапуска кеш
+    прогревается постепенно, по мере обращений.
+
+    Пример работы:
+    machine = PersistentCachingMachine('cache.sqlite3', expiration=600)
+    machine.set('key', 'value')
+    machine.snapshot()          # запись на диск идёт в фоновом потоке
+    ...
+    machine = PersistentCachingMachine('cache.sqlite3', expiration=600)
+    machine.get('key')          # 'value', поднято с диска
+
+"""
+# встроенные модули
+import sys
+import time
+import pickle
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Optional, Callable, Iterator, Tuple, List, Dict, Iterable, Set
+
+# модули проекта
+from trivial_tools.storage.caching_machine import CachingMachine, MISSING
+
+_SCHEMA = 'CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, value BLOB, expires REAL)'
+_UNPICKLABLE = (pickle.PicklingError, TypeError, AttributeError)
+
+
+class SqliteStore:
+    """
+    Хранилище сериализованных значений в файле sqlite. Потокобезопасно
+
+    Файл работает в режиме WAL, а чтение идёт через отдельное соединение, поэтому
+    длинная транзакция записи (например снимок) не задерживает чтение отдельных ключей
+    """
+    __slots__ = ('path', '_connection', '_lock', '_reader', '_read_lock')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(_SCHEMA)
+
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._read_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return f'{type(self).__name__}({self.path!r})'
+
+    def __len__(self) -> int:
+        """
+        Количество записей на диске
+        """
+        with self._read_lock:
+            return self._reader.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def load(self, key: bytes) -> Optional[Tuple[bytes, Optional[float]]]:
+        """
+        Получить сериализованное значение и момент протухания по системным часам
+        """
+        with self._read_lock:
+            return self._reader.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+
+    def save_many(self, rows: List[Tuple[bytes, bytes, Optional[float]]]) -> None:
+        """
+        Записать пачку значений одной транзакцией
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)', rows
+            )
+
+    def delete(self, key: bytes) -> None:
+        """
+        Удалить значение с диска
+        """
+        self.delete_many([key])
+
+    def delete_many(self, keys: List[bytes]) -> None:
+        """
+        Удалить пачку значений одной транзакцией
+        """
+        with self._lock, self._connection:
+            self._connection.executemany('DELETE FROM cache WHERE key = ?',
+                                         [(key,) for key in keys])
+
+    def purge(self, now: float) -> int:
+        """
+        Удалить записи, протухшие к указанному моменту системных часов
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                'DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?', (now,)
+            )
+        return cursor.rowcount
+
+    def items(self) -> Iterator[Tuple[bytes, bytes, Optional[float]]]:
+        """
+        Все записи на диске
+        """
+        with self._read_lock:
+            rows = self._reader.execute('SELECT key, value, expires FROM cache').fetchall()
+        return iter(rows)
+
+    def clear(self) -> None:
+        """
+        Удалить все записи
+        """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM cache')
+
+    def close(self) -> None:
+        """
+        Закрыть файл
+        """
+        with self._lock, self._read_lock:
+            self._reader.close()
+            self._connection.close()
+
+
+class _Flush:
+    """
+    Незавершённая запись снимка. Ключи, удалённые или записанные на диск в обход
+    снимка после его начала, попадают в superseded, и снимок их не пишет
+    """
+    __slots__ = ('superseded', 'cleared')
+
+    def __init__(self):
+        self.superseded: Set[Any] = set()
+        self.cleared = False
+
+
+class PersistentCachingMachine(CachingMachine):
+    """
+    Кеширующая машина, которая переживает перезапуск процесса
+
+    По умолчанию диск трогается только при промахе в памяти и при вызове snapshot,
+    так что запись значения не ждёт файловой системы. С write_through=True каждое
+    значение сразу пишется и на диск. Значения, вытесненные из памяти политикой,
+    на диске остаются, как и протухшие (они отбрасываются при чтении и чистятся
+    при снимке). Значения, которые не удаётся сериализовать, живут только в памяти
+
+    Без write_through запись делает строку на диске устаревшей. Такие ключи помечаются,
+    и промах по ним не поднимает старое значение с диска, пока снимок не запишет
+    новое значение или не удалит старую строку
+
+    Удаление, очистка и запись с write_through во время фоновой записи снимка
+    помечают ключи для этого снимка, так что снимок не вернёт на диск
+    удалённое или более старое значение
+    """
+    def __init__(self, path: str, expiration: Optional[int] = None, max_items: int = 1000,
+                 policy: str = 'lru', clock: Callable[[], float] = time.monotonic,
+                 max_bytes: Optional[int] = None, sizer: Callable[[Any], int] = sys.getsizeof,
+                 write_through: bool = False, wall_clock: Callable[[], float] = time.time):
+        """
+        Создание экземпляра
+
+        :param path: путь к файлу sqlite
+        :param write_through: сразу писать каждое значение на диск
+        :param wall_clock: системные часы, по которым хранятся сроки на диске
+        """
+        super().__init__(expiration, max_items, policy, clock, max_bytes, sizer)
+        self.store = SqliteStore(path)
+        self.write_through = write_through
+        self.wall_clock = wall_clock
+        self._dirty: Set[Any] = set()
+        self._flushing: Dict[Any, int] = Counter()
+        self._flushes: List[_Flush] = []
+        self._guard = threading.Lock()
+
+    def _to_row(self, key: Any, value: Any,
+                expires: Optional[float], now: float, wall: float) -> Optional[tuple]:
+        """
+        Подготовить строку для записи на диск, None если значение не сериализуется
+        """
+        try:
+            row_key = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+            row_value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except _UNPICKLABLE:
+            return None
+
+        wall_expires = None if expires is None else wall + (expires - now)
+        return row_key, row_value, wall_expires
+
+    def extract(self, key: Any, default: Any = None) -> Optional[Any]:
+        """
+        Извлечь значение из памяти, а при промахе - с диска
+        """
+        result = super().extract(key, MISSING)
+        if result is not MISSING:
+            return result
+        return self._from_disk(key, default)
+
+    def _from_disk(self, key: Any, default: Any) -> Any:
+        """
+        Поднять значение с диска после промаха в памяти
+        """
+        if key in self._dirty or key in self._flushing:
+            # на диске лежит значение, которое уже было перезаписано
+            return default
+
+        try:
+            row = self.store.load(pickle.dumps(key, pickle.HIGHEST_PROTOCOL))
+        except _UNPICKLABLE:
+            return default
+
+        if row is None:
+            return default
+
+        value, wall_expires = row
+        remaining = None
+        if wall_expires is not None:
+            remaining = wall_expires - self.wall_clock()
+            if remaining <= 0:
+                return default
+
+        value = pickle.loads(value)
+        super().assign(key, value, remaining)
+        return value
+
+    def assign(self, key: Any, value: Any, expires: Optional[int] = None,
+               size: Optional[int] = None) -> bool:
+        """
+        Установить значение, при write_through - сразу и на диске
+        """
+        if not self.write_through:
+            self._dirty.add(key)
+
+        stored = super().assign(key, value, expires, size)
+        if stored and self.write_through:
+            instance = self._cache[key]
+            row = self._to_row(key, value, instance.expires, self.clock(), self.wall_clock())
+            if row is not None:
+                with self._guard:
+                    self._supersede([key])
+                    self.store.save_many([row])
+        return stored
+
+    def _supersede(self, keys: Iterable[Any]) -> None:
+        """
+        Запретить незавершённым снимкам писать эти ключи. Вызывается под self._guard
+        """
+        for flush in self._flushes:
+            flush.superseded.update(keys)
+
+    def extract_many(self, keys: Iterable[Any], default: Any = None) -> List[Any]:
+        """
+        Извлечь значения сразу для многих ключей, промахи в памяти ищутся на диске
+        """
+        keys = list(keys)
+        result = super().extract_many(keys, MISSING)
+        for position, value in enumerate(result):
+            if value is MISSING:
+                result[position] = self._from_disk(keys[position], default)
+        return result
+
+    def assign_many(self, mapping: Dict[Any, Any], expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много значений, при write_through - одной транзакцией на диске
+        """
+        if not self.write_through:
+            self._dirty.update(mapping)
+            return super().assign_many(mapping, expires)
+
+        now = self.clock()
+        wall = self.wall_clock()
+        stored = True
+        rows = []
+        for key, value in mapping.items():
+            if not self._assign(key, value, expires, None, now):
+                stored = False
+                continue
+            row = self._to_row(key, value, self._cache[key].expires, now, wall)
+            if row is not None:
+                rows.append(row)
+
+        with self._guard:
+            self._supersede(mapping)
+            self.store.save_many(rows)
+        return stored
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Удалить сразу много значений из памяти и с диска
+        """
+        return sum(self.delete(key) for key in keys)
+
+    def delete(self, key: str) -> bool:
+        """
+        Удалить значение из памяти и с диска
+        """
+        with self._guard:
+            self._supersede([key])
+            try:
+                self.store.delete(pickle.dumps(key, pickle.HIGHEST_PROTOCOL))
+            except _UNPICKLABLE:
+                pass
+        self._dirty.discard(key)
+        return super().delete(key)
+
+    def clear(self):
+        """
+        Очистить память и диск
+        """
+        super().clear()
+        self._dirty.clear()
+        with self._guard:
+            for flush in self._flushes:
+                flush.cleared = True
+            self.store.clear()
+
+    def snapshot(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Сохранить содержимое памяти на диск
+
+        В вызывающем потоке только собирается список живых элементов, сериализация и
+        запись выполняются в фоновом потоке (его можно дождаться через join).
+        Строки перезаписанных с прошлого снимка ключей, которых уже нет в памяти,
+        удаляются с диска. Снимки могут пересекаться во времени: ключ остаётся
+        скрытым от чтения с диска, пока его не допишут все снимки, в которые он попал
+
+        :param background: писать в фоновом потоке
+        :return: фоновый поток или None, если запись выполнена сразу
+        """
+        now = self.clock()
+        wall = self.wall_clock()
+        entries = [(key, instance.value, instance.expires)
+                   for key, instance in self._cache.items() if instance.not_expired(now)]
+        dirty, self._dirty = self._dirty, set()
+        flush = _Flush()
+        with self._guard:
+            self._flushing.update(dirty)
+            self._flushes.append(flush)
+
+        def write():
+            try:
+                rows = [(key, self._to_row(key, value, expires, now, wall))
+                        for key, value, expires in entries]
+                written = {row[0] for _, row in rows if row is not None}
+                stale = []
+                for key in dirty:
+                    try:
+                        row_key = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+                    except _UNPICKLABLE:
+                        continue
+                    if row_key not in written:
+                        stale.append((key, row_key))
+
+                with self._guard:
+                    if not flush.cleared:
+                        superseded = flush.superseded
+                        self.store.delete_many([row_key for key, row_key in stale
+                                                if key not in superseded])
+                        self.store.save_many([row for key, row in rows
+                                              if row is not None and key not in superseded])
+                    self.store.purge(wall)
+            finally:
+                with self._guard:
+                    self._flushes.remove(flush)
+                    self._flushing.subtract(dirty)
+                    for key in dirty:
+                        if self._flushing[key] <= 0:
+                            del self._flushing[key]
+
+        if not background:
+            write()
+            return None
+
+        thread = threading.Thread(target=write, daemon=True)
+        thread.start()
+        return thread
+
+    def restore(self, limit: Optional[int] = None) -> int:
+        """
+        Заранее поднять в память ещё не протухшие значения с диска
+
+        Обычно не требуется, значения поднимаются сами при первом обращении
+
+        :param limit: сколько элементов поднять не более (по умолчанию - сколько влезет)
+        :return: количество поднятых элементов
+        """
+        if limit is None:
+            limit = self.max_items
+
+        wall = self.wall_clock()
+        restored = 0
+        for row_key, row_value, wall_expires in self.store.items():
+            if restored >= limit:
+                break
+
+            remaining = None
+            if wall_expires is not None:
+                remaining = wall_expires - wall
+                if remaining <= 0:
+                    continue
+
+            super().assign(pickle.loads(row_key), pickle.loads(row_value), remaining)
+            restored += 1
+        return restored
+
+    def close(self) -> None:
+        """
+        Закрыть файл хранилища
+        """
+        self.store.close()
@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Кеширующая машина в общей памяти нескольких процессов
+
+    Таблица лежит в отображённом в память файле (лучше всего в /dev/shm), поэтому все
+    рабочие процессы одного хоста видят один и тот же кеш. Хранятся только строки и байты.
+
+    Устройство:
+    - файл разбит на ячейки фиксированного размера, ключ ищется открытой адресацией
+      (линейное пробирование не дальше max_probe ячеек от начальной);
+    - хеш ключа считается через blake2b, потому что встроенный hash различается
+      между процессами;
+    - тип ключа (строка или байты) хранится в заголовке ячейки, как и тип значения,
+      поэтому 'a' и b'a' - разные ключи;
+    - чтение не берёт блокировок: у каждой ячейки есть счётчик версий (seqlock).
+      Писатель делает счётчик нечётным на время записи и чётным после неё,
+      читатель повторяет чтение, если счётчик был нечётным или изменился;
+    - писатели упорядочиваются блокировкой файла (fcntl.flock) между процессами
+      и обычным замком между потоками.
+
+    Сроки хранения считаются по системным часам, так как монотонные часы у разных
+    процессов формально не обязаны совпадать. Работает только на unix.
+
+    Пример работы:
+    machine = SharedCachingMachine('/dev/shm/my_cache', slots=4096, slot_size=512)
+    machine.set('key', 'value', expires=60)
+    machine.get('key')  # в любом процессе, открывшем тот же файл
+
+"""
+# встроенные модули
+import os
+import time
+import mmap
+import fcntl
+import struct
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Optional, Callable, List, Union, Tuple, Iterator, Dict, Iterable
+
+# модули проекта
+from trivial_tools.special.special import fail
+from trivial_tools.formatters.base import s_type
+
+MAGIC = b'TTCM'
+VERSION = 2
+
+# заголовок файла: метка, версия, количество ячеек, размер ячейки
+_HEADER = struct.Struct('<4sIII')
+_HEADER_SIZE = 64
+
+# заголовок ячейки: версия (seqlock), состояние (оно же тип значения), тип ключа,
+# хеш ключа, срок, длины ключа и значения
+_SLOT = struct.Struct('<IBB2xQdH2xI')
+_SEQ = struct.Struct('<I')
+_MASK = 0xFFFFFFFF
+
+EMPTY = 0
+STR = 1
+BYTES = 2
+DELETED = 3
+
+_RETRIES = 64
+
+
+def _key_hash(key_type: int, key: bytes) -> int:
+    """
+    Хеш ключа с учётом его типа, одинаковый во всех процессах
+    """
+    digest = hashlib.blake2b(bytes([key_type]) + key, digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _encode(data: Union[str, bytes]) -> Tuple[int, bytes]:
+    """
+    Представить строку или байты в виде байт с пометкой типа
+    """
+    if isinstance(data, bytes):
+        return BYTES, data
+    return STR, data.encode('utf-8')
+
+
+class SharedCachingMachine:
+    """
+    Кеширующая машина для строк и байт, общая для всех процессов хоста
+    """
+    def __init__(self, path: str, slots: int = 4096, slot_size: int = 512,
+                 expiration: Optional[int] = None, max_probe: int = 32,
+                 clock: Callable[[], float] = time.time):
+        """
+        Создание экземпляра
+
+        Если файл уже существует, размеры таблицы берутся из него
+
+        :param path: путь к файлу таблицы (например /dev/shm/имя)
+        :param slots: количество ячеек
+        :param slot_size: размер ячейки в байтах (ключ и значение должны в неё влезать)
+        :param expiration: срок хранения по умолчанию в секундах
+        :param max_probe: сколько ячеек проверять в поисках ключа
+        :param clock: системные часы
+        """
+        if slots < 1 or slot_size <= _SLOT.size:
+            fail(f'Для создания экземпляра {s_type(self)} необходимо указать положительное '
+                 f'количество ячеек и размер ячейки больше {_SLOT.size} байт',
+                 reason=ValueError)
+
+        self.path = path
+        self.expiration = expiration
+        self.clock = clock
+        self._thread_lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        with self._locked():
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, _HEADER_SIZE + slots * slot_size)
+                os.pwrite(self._fd, _HEADER.pack(MAGIC, VERSION, slots, slot_size), 0)
+
+            magic, version, slots, slot_size = _HEADER.unpack(
+                os.pread(self._fd, _HEADER.size, 0))
+
+        if magic != MAGIC or version != VERSION:
+            os.close(self._fd)
+            fail(f'Файл {path!r} не является таблицей {s_type(self)}', reason=ValueError)
+
+        self.slots = slots
+        self.slot_size = slot_size
+        self.max_probe = min(max_probe, slots)
+        self._map = mmap.mmap(self._fd, _HEADER_SIZE + slots * slot_size)
+
+    def __repr__(self) -> str:
+        """
+        Текстовое представление
+        """
+        return (f'{s_type(self)}({self.path!r}, slots={self.slots}, '
+                f'slot_size={self.slot_size})')
+
+    def __contains__(self, item):
+        """
+        Проверка наличия внутри кеша
+        """
+        return self.exists(item)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Исключительный доступ на запись для потоков и процессов
+        """
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, index: int) -> int:
+        """
+        Смещение ячейки в файле
+        """
+        return _HEADER_SIZE + index * self.slot_size
+
+    def _probe(self, key_hash: int) -> Iterator[int]:
+        """
+        Смещения ячеек, в которых может лежать ключ
+        """
+        start = key_hash % self.slots
+        for step in range(self.max_probe):
+            yield self._offset((start + step) % self.slots)
+
+    def _read(self, offset: int) -> Tuple[int, int, int, float, bytes, bytes]:
+        """
+        Согласованно прочитать ячейку без блокировки
+
+        :return: состояние, тип ключа, хеш ключа, срок, ключ, значение
+        """
+        mapping = self._map
+        for _ in range(_RETRIES):
+            before = _SEQ.unpack_from(mapping, offset)[0]
+            if before & 1:
+                # писатель как раз сейчас работает с этой ячейкой
+                time.sleep(0)
+                continue
+
+            _, state, key_type, key_hash, expires, key_len, value_len = _SLOT.unpack_from(
+                mapping, offset)
+            start = offset + _SLOT.size
+            if state in (STR, BYTES) and key_len + value_len <= self.slot_size - _SLOT.size:
+                key = mapping[start:start + key_len]
+                value = mapping[start + key_len:start + key_len + value_len]
+            else:
+                key = value = b''
+
+            if _SEQ.unpack_from(mapping, offset)[0] == before:
+                return state, key_type, key_hash, expires, key, value
+
+        # ячейку непрерывно переписывают, считаем что её нет
+        return DELETED, 0, 0, 0.0, b'', b''
+
+    def _write(self, offset: int, state: int, key_type: int = 0, key_hash: int = 0,
+               expires: float = 0.0, key: bytes = b'', value: bytes = b'') -> None:
+        """
+        Записать ячейку. Вызывается только под блокировкой
+        """
+        mapping = self._map
+        seq = _SEQ.unpack_from(mapping, offset)[0]
+        _SEQ.pack_into(mapping, offset, (seq + 1) & _MASK)
+        _SLOT.pack_into(mapping, offset, (seq + 1) & _MASK, state, key_type, key_hash,
+                        expires, len(key), len(value))
+        start = offset + _SLOT.size
+        mapping[start:start + len(key) + len(value)] = key + value
+        _SEQ.pack_into(mapping, offset, (seq + 2) & _MASK)
+
+    def _find(self, key_type: int, key: bytes,
+              key_hash: int) -> Optional[Tuple[int, int, float, bytes]]:
+        """
+        Найти живую ячейку с ключом
+
+        :return: смещение, состояние, срок и значение или None
+        """
+        for offset in self._probe(key_hash):
+            state, found_type, found_hash, expires, found_key, value = self._read(offset)
+            if state == EMPTY:
+                return None
+            if (state != DELETED and found_hash == key_hash
+                    and found_type == key_type and found_key == key):
+                return offset, state, expires, value
+        return None
+
+    def _locate(self, key: Union[str, bytes]) -> Optional[Tuple[int, int, float, bytes]]:
+        """
+        Найти живую ячейку по исходному ключу
+        """
+        key_type, raw_key = _encode(key)
+        return self._find(key_type, raw_key, _key_hash(key_type, raw_key))
+
+    def extract(self, key: Union[str, bytes], default: Any = None) -> Any:
+        """
+        Получить значение по ключу без блокировок
+
+        :param default: что вернуть, если значения нет или оно протухло
+        """
+        found = self._locate(key)
+        if found is None:
+            return default
+
+        _, state, expires, value = found
+        if expires and expires <= self.clock():
+            return default
+
+        return value.decode('utf-8') if state == STR else value
+
+    def extract_many(self, keys: Iterable[Union[str, bytes]], default: Any = None) -> List[Any]:
+        """
+        Получить значения сразу для многих ключей без блокировок.
+        Часы читаются один раз на всю пачку
+        """
+        now = self.clock()
+        result = []
+        for key in keys:
+            found = self._locate(key)
+            if found is None or (found[2] and found[2] <= now):
+                result.append(default)
+            else:
+                value = found[3]
+                result.append(value.decode('utf-8') if found[1] == STR else value)
+        return result
+
+    def assign(self, key: Union[str, bytes], value: Union[str, bytes],
+               expires: Optional[int] = None) -> bool:
+        """
+        Установить значение по ключу
+
+        Если рядом с начальной ячейкой нет свободного места, вытесняется значение
+        с ближайшим сроком протухания
+
+        :return: False, если ключ и значение не влезают в ячейку
+        """
+        return self.assign_many({key: value}, expires)
+
+    def assign_many(self, mapping: Dict[Union[str, bytes], Union[str, bytes]],
+                    expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много значений под одной блокировкой.
+        Часы читаются один раз на всю пачку
+
+        :return: False, если хотя бы одно значение не удалось сохранить
+        """
+        if expires is None:
+            expires = self.expiration
+
+        prepared = []
+        stored = True
+        for key, value in mapping.items():
+            if not isinstance(value, (str, bytes)):
+                print('Метод assign принимает только строковые или байтовые значения!')
+                stored = False
+                continue
+
+            key_type, raw_key = _encode(key)
+            state, raw_value = _encode(value)
+            if _SLOT.size + len(raw_key) + len(raw_value) > self.slot_size:
+                stored = False
+                continue
+
+            prepared.append((key_type, raw_key, _key_hash(key_type, raw_key), state, raw_value))
+
+        if not prepared:
+            return stored
+
+        with self._locked():
+            now = self.clock()
+            moment = 0.0 if expires is None else now + expires
+            for key_type, raw_key, key_hash, state, raw_value in prepared:
+                target = self._choose_slot(key_type, raw_key, key_hash, now)
+                self._write(target, state, key_type, key_hash, moment, raw_key, raw_value)
+        return stored
+
+    def _choose_slot(self, key_type: int, key: bytes, key_hash: int, now: float) -> int:
+        """
+        Выбрать ячейку для записи. Вызывается только под блокировкой
+        """
+        free = None
+        victim = None
+        victim_expires = float('inf')
+
+        for offset in self._probe(key_hash):
+            state, found_type, found_hash, expires, found_key, _ = self._read(offset)
+            if state == EMPTY:
+                return offset if free is None else free
+
+            if state == DELETED or (expires and expires <= now):
+                if free is None:
+                    free = offset
+                continue
+
+            if found_hash == key_hash and found_type == key_type and found_key == key:
+                return offset
+
+            current = expires or float('inf')
+            if victim is None or current < victim_expires:
+                victim, victim_expires = offset, current
+
+        return free if free is not None else victim
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Получить строковое значение по ключу
+        """
+        return self.extract(key)
+
+    def set(self, key: str, value: str, expires: Optional[int] = None) -> bool:
+        """
+        Установить строковое значение по ключу
+        """
+        if not isinstance(value, str):
+            print('Метод set принимает только строковые значения!')
+            return False
+
+        return self.assign(key, value, expires)
+
+    def get_many(self, keys: Iterable[str]) -> List[Optional[str]]:
+        """
+        Получить строковые значения сразу для многих ключей
+        """
+        return self.extract_many(keys)
+
+    def set_many(self, mapping: Dict[str, str], expires: Optional[int] = None) -> bool:
+        """
+        Установить сразу много строковых значений
+        """
+        if not all(isinstance(value, str) for value in mapping.values()):
+            print('Метод set_many принимает только строковые значения!')
+            return False
+
+        return self.assign_many(mapping, expires)
+
+    def exists(self, key: Union[str, bytes]) -> bool:
+        """
+        Проверить, есть ли у нас значение для этого ключа
+        """
+        return self._locate(key) is not None
+
+    def delete(self, key: Union[str, bytes]) -> bool:
+        """
+        Удалить значение из кеша
+        """
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: Iterable[Union[str, bytes]]) -> int:
+        """
+        Удалить сразу много значений под одной блокировкой, вернуть сколько было удалено
+        """
+        hashed = []
+        for key in keys:
+            key_type, raw_key = _encode(key)
+            hashed.append((key_type, raw_key, _key_hash(key_type, raw_key)))
+
+        removed = 0
+        with self._locked():
+            for key_type, raw_key, key_hash in hashed:
+                found = self._find(key_type, raw_key, key_hash)
+                if found is not None:
+                    self._write(found[0], DELETED)
+                    removed += 1
+        return removed
+
+    def _live(self) -> Iterator[Tuple[int, int, float, bytes]]:
+        """
+        Все занятые ячейки: смещение, тип ключа, срок, ключ
+        """
+        for index in range(self.slots):
+            offset = self._offset(index)
+            state, key_type, _, expires, key, _ = self._read(offset)
+            if state in (STR, BYTES):
+                yield offset, key_type, expires, key
+
+    def total(self) -> int:
+        """
+        Узнать сколько элементов мы храним
+        """
+        now = self.clock()
+        return sum(1 for _, _, expires, _ in self._live() if not expires or expires > now)
+
+    def keys(self) -> List[Union[str, bytes]]:
+        """
+        Получить все ключи машины, байтовые ключи возвращаются байтами
+        """
+        now = self.clock()
+        return [key.decode('utf-8') if key_type == STR else key
+                for _, key_type, expires, key in self._live()
+                if not expires or expires > now]
+
+    def cleanup(self) -> int:
+        """
+        Удалить устаревшие элементы
+        """
+        removed = 0
+        with self._locked():
+            now = self.clock()
+            for offset, _, expires, _ in list(self._live()):
+                if expires and expires <= now:
+                    self._write(offset, DELETED)
+                    removed += 1
+        return removed
+
+    def clear(self):
+        """
+        Очистить память
+        """
+        with self._locked():
+            for index in range(self.slots):
+                offset = self._offset(index)
+                if self._map[offset + 4] != EMPTY:
+                    self._write(offset, EMPTY)
+
+    def close(self) -> None:
+        """
+        Отключиться от общей таблицы (сам файл остаётся)
+        """
+        self._map.close()
+        os.close(self._fd)
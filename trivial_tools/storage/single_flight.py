@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Объединение одновременных запросов (single-flight)
+
+    Если несколько вызывающих одновременно просят вычислить значение для одного и того же
+    ключа, вычисление выполняется только один раз. Первый вызывающий (ведущий) выполняет
+    функцию, остальные дожидаются его результата или исключения.
+
+    SingleFlight      - для потоков
+    AsyncSingleFlight - для корутин одного цикла событий
+
+    Пример работы:
+    flight = SingleFlight()
+    value = flight.do('key', load_from_database, 'key')
+
+"""
+# встроенные модули
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Awaitable
+
+
+class _Call:
+    """
+    Выполняющийся вызов, которого ждут остальные потоки
+    """
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Объединение одновременных вызовов из разных потоков
+    """
+    __slots__ = ('_lock', '_calls')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Выполняется ли сейчас вызов для этого ключа
+        """
+        return key in self._calls
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        Выполнить функцию, если для этого ключа она ещё не выполняется,
+        иначе дождаться результата уже идущего вызова
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Объединение одновременных вызовов из разных корутин
+    """
+    __slots__ = ('_calls',)
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Выполняется ли сейчас вызов для этого ключа
+        """
+        return key in self._calls
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """
+        Выполнить корутинную функцию, если для этого ключа она ещё не выполняется,
+        иначе дождаться результата уже идущего вызова
+
+        Функция выполняется в отдельной задаче, и все вызывающие, включая первого,
+        ждут её через shield. Отмена любого из них не отменяет общее вычисление
+        и не задевает остальных
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._finish, key))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        """
+        Забыть завершённый вызов
+        """
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # помечаем исключение полученным, даже если все вызывающие уже отменены
+            task.exception()
@@ -415,3 +415,47 @@ def test_is_sentinel():
 
     with pytest.raises(IndexError):
         _ = c[0]
+
+
+def test_push_many():
+    """
+    Проверка пакетного добавления элементов
+    """
+    c = Carousel(window=4)
+
+    assert c.push_many([]) == []
+    assert c.push_many([1, 2]) == []
+    assert c.get_contents() == [1, 2]
+
+    assert c.push_many(iter([3, 4, 5])) == [1]
+    assert c.get_contents() == [2, 3, 4, 5]
+
+    assert c.push_many(range(6, 12)) == [2, 3, 4, 5, 6, 7]
+    assert c.get_contents() == [8, 9, 10, 11]
+    assert len(c) == 4
+
+    c.push(12)
+    assert c.get_contents() == [9, 10, 11, 12]
+
+
+def test_push_many_same_as_push():
+    """
+    Пакетное добавление должно давать тот же результат, что и поэлементное
+    """
+    for window in range(1, 6):
+        for chunk in range(0, 8):
+            reference = Carousel(window=window)
+            batched = Carousel(window=window)
+
+            for start in range(0, 20, max(chunk, 1)):
+                values = list(range(start, start + chunk))
+
+                evicted = []
+                for value in values:
+                    old_value = reference.push(value)
+                    if old_value is not reference._sentinel:
+                        evicted.append(old_value)
+
+                assert batched.push_many(values) == evicted
+                assert batched.get_contents() == reference.get_contents()
+                assert len(batched) == len(reference)
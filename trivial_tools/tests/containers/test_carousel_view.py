@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты представления карусели
+
+"""
+# встроенные модули
+from array import array
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.containers.class_carousel import Carousel
+from trivial_tools.containers.class_numeric_carousel import NumericCarousel
+
+
+def test_view_empty():
+    """
+    Проверка представления пустой карусели
+    """
+    v = Carousel(window=3).view()
+    assert len(v) == 0
+    assert list(v) == []
+    assert v[:] == []
+
+    with pytest.raises(IndexError):
+        assert v[0]
+
+
+def test_view_order():
+    """
+    Представление должно сохранять порядок добавления
+    """
+    c = Carousel(window=4)
+    for i in range(1, 11):
+        c.push(i)
+        v = c.view()
+        assert len(v) == len(c)
+        assert list(v) == c.get_contents()
+        assert v.tolist() == c.get_contents()
+        assert [v[i] for i in range(len(v))] == c.get_contents()
+        assert [v[-i] for i in range(1, len(v) + 1)] == c.get_contents()[::-1]
+        assert v[1:3] == c[1:3]
+        assert v[::2] == c[::2]
+
+    with pytest.raises(IndexError):
+        assert v[4]
+
+    with pytest.raises(IndexError):
+        # noinspection PyTypeChecker
+        assert v['test']
+
+
+def test_view_no_copy():
+    """
+    Представление читает данные прямо из хранилища
+    """
+    c = Carousel([1, 2, 3])
+    v = c.view()
+    assert v._data is c._data
+
+    c[0] = 9
+    assert list(v) == [9, 2, 3]
+
+
+def test_view_segments():
+    """
+    Проверка выдачи отрезков хранилища
+    """
+    c = NumericCarousel([1, 2, 3, 4], dtype='q')
+    c.push(5)
+    first, second = c.view().segments()
+    assert first.tolist() == [2, 3, 4]
+    assert second.tolist() == [5]
+    assert first.obj is c._data
+
+    # буфер не мешает дальнейшей работе карусели
+    c.push(6)
+    c.push_many([])
+    c.push_many([7, 8])
+    assert array('q', first) == array('q', [6, 7, 8])
+
+    with pytest.raises(TypeError):
+        Carousel([1, 2]).view().segments()
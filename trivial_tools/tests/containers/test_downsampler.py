@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты прореживателя
+
+"""
+# встроенные модули
+from datetime import datetime, timedelta
+
+# сторонние модули
+import pytest
+from pytest import approx
+
+# модули проекта
+from trivial_tools.containers.class_downsampler import Downsampler
+
+
+def test_creation():
+    """
+    Проверка создания
+    """
+    with pytest.raises(ValueError):
+        Downsampler(interval=0)
+
+    with pytest.raises(ValueError):
+        Downsampler(aggregates=('median',))
+
+    d = Downsampler()
+    assert repr(d) == "Downsampler(interval=60, datetime_index=0, aggregates=('mean',))"
+    assert d.flush() == []
+    assert d.push(()) == []
+
+
+def test_push():
+    """
+    Проверка сворачивания в интервалы
+    """
+    d = Downsampler(interval=60, aggregates=('mean', 'min', 'max', 'sum', 'count', 'last'),
+                    epoch=True)
+
+    assert d.push((0, 1.0)) == []
+    assert d.push((30, 3.0)) == []
+    assert d.push((59, None)) == []
+    assert d.push((61, 7.0)) == [[0, 2.0, 1.0, 3.0, 4.0, 2, 3.0]]
+
+    # слишком старое значение
+    assert d.push((20, 100.0)) == []
+
+    # пустые интервалы не выдаются
+    assert d.push((300, 5.0)) == [[60, 7.0, 7.0, 7.0, 7.0, 1, 7.0]]
+    assert d.flush() == [[300, 5.0, 5.0, 5.0, 5.0, 1, 5.0]]
+    assert d.flush() == []
+
+
+def test_datetime_and_columns():
+    """
+    Проверка работы с datetime и несколькими столбцами
+    """
+    start = datetime(2019, 12, 1, 12, 0, 0)
+    rows = [(start + timedelta(seconds=i), float(i), -i) for i in range(150)]
+
+    d = Downsampler(interval=60, aggregates=('mean', 'last'))
+    result = d.push_batch(rows) + d.flush()
+
+    assert [row[0] for row in result] == [start,
+                                          start + timedelta(minutes=1),
+                                          start + timedelta(minutes=2)]
+    assert approx(result[0][1:]) == [29.5, 59.0, -29.5, -59]
+    assert approx(result[2][1:]) == [134.5, 149.0, -134.5, -149]
+
+
+def test_hours():
+    """
+    Проверка сворачивания в часы с меткой времени не с начала часа
+    """
+    d = Downsampler(interval=3600, aggregates=('count',), datetime_index=1, epoch=True)
+    result = d.push_batch((1, second) for second in range(1800, 9000, 10))
+    assert result == [[0, 180], [3600, 360]]
+    assert d.flush() == [[7200, 180]]
@@ -164,3 +164,31 @@ def test_setitem(numbers):
 
     with pytest.raises(IndexError):
         m[:] = [7.0, 28.0, 31.0, -900.0]
+
+
+def test_push_many(reference, numbers):
+    """
+    Проверка пакетного добавления элементов
+    """
+    m = MovingAverage(window=4)
+
+    m.push_many([])
+    assert approx(m.avg) == 0.0
+
+    m.push_many(numbers[:6])
+    assert approx(m.avg) == reference[5]
+
+    m.push_many(numbers[6:])
+    assert approx(m.avg) == reference[-1]
+
+
+def test_correction():
+    """
+    Среднее считается по скорректированной сумме
+    """
+    m = MovingAverage(window=2, correction='neumaier')
+    for number in [1e16, 1.0, 1.0]:
+        m.push(number)
+
+    assert m.avg == 1.0
+    assert m.correction == 'neumaier'
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты скользящих минимума, максимума и размаха
+
+"""
+# встроенные модули
+import random
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.containers.class_moving_min import MovingMin
+from trivial_tools.containers.class_moving_max import MovingMax
+from trivial_tools.containers.class_moving_range import MovingRange
+
+
+@pytest.fixture()
+def numbers():
+    """
+    Исходные данные для вычисления экстремумов
+    """
+    random.seed(7)
+    return [random.randint(-50, 50) for _ in range(200)]
+
+
+def test_creation():
+    """
+    Проверка создания
+    """
+    with pytest.raises(ValueError):
+        MovingMin()
+
+    m = MovingMax(window=3)
+    assert m.max is None
+
+    r = MovingRange(window=3)
+    assert r.min is None
+    assert r.max is None
+    assert r.range == 0
+
+    r = MovingRange([5, 3, 4, 1], window=3)
+    assert r.min == 1
+    assert r.max == 4
+    assert r.range == 3
+
+
+def test_pushing(numbers):
+    """
+    Проверка добавления элементов
+    """
+    low = MovingMin(window=7)
+    high = MovingMax(window=7)
+    both = MovingRange(window=7)
+
+    for i, number in enumerate(numbers):
+        low.push(number)
+        high.push(number)
+        both.push(number)
+
+        window = numbers[max(0, i - 6):i + 1]
+        assert low.min == min(window)
+        assert high.max == max(window)
+        assert both.range == max(window) - min(window)
+
+
+def test_push_many(numbers):
+    """
+    Проверка пакетного добавления элементов
+    """
+    both = MovingRange(window=10)
+    reference = []
+
+    for size in [3, 0, 5, 1, 10, 25, 4, 9, 2, 60]:
+        chunk = numbers[:size]
+        numbers = numbers[size:]
+        reference = (reference + chunk)[-10:]
+
+        both.push_many(chunk)
+        assert both.get_contents() == reference
+        assert both.min == min(reference)
+        assert both.max == max(reference)
+
+        both.push(0)
+        reference = (reference + [0])[-10:]
+        assert both.min == min(reference)
+        assert both.max == max(reference)
+
+
+def test_resize(numbers):
+    """
+    Проверка изменения размеров
+    """
+    both = MovingRange(numbers, window=5)
+
+    both.resize(20)
+    assert both.min == min(numbers[-5:])
+    assert both.max == max(numbers[-5:])
+
+    for number in numbers:
+        both.push(number)
+    assert both.min == min(numbers[-20:])
+    assert both.max == max(numbers[-20:])
+
+    both.resize(3)
+    assert both.min == min(numbers[-3:])
+    assert both.max == max(numbers[-3:])
+
+
+def test_setitem():
+    """
+    Проверка подмены элемента
+    """
+    both = MovingRange([5, 3, 4, 1], window=3)
+
+    both[1] = 100
+    assert both.max == 100
+
+    both[0] = -7
+    assert both.min == -7
+    assert both.range == 107
+
+    both.push(2)
+    assert both.get_contents() == [100, 1, 2]
+    assert both.min == 1
+
+    with pytest.raises(IndexError):
+        both[:] = [1, 2, 3]
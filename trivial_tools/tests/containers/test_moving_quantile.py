@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты скользящих квантилей
+
+"""
+# встроенные модули
+import random
+
+# сторонние модули
+import pytest
+from pytest import approx
+
+# модули проекта
+from trivial_tools.containers.class_moving_quantile import MovingQuantile
+
+
+def reference_quantile(values, q):
+    """
+    Эталонный квантиль с линейной интерполяцией
+    """
+    values = sorted(values)
+    position = q * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+@pytest.fixture()
+def numbers():
+    """
+    Исходные данные для вычисления квантилей
+    """
+    random.seed(11)
+    return [random.uniform(-100, 100) for _ in range(300)]
+
+
+def test_creation():
+    """
+    Проверка создания
+    """
+    with pytest.raises(ValueError):
+        MovingQuantile()
+
+    m = MovingQuantile(window=4)
+    assert m.median is None
+
+    m = MovingQuantile([7, 1, 3, 9, 5], window=4)
+    assert m.median == 4.0
+    assert approx(m.quantile(0.95)) == 8.4
+    assert m.quantile(0) == 1
+    assert m.quantile(1) == 9
+
+    with pytest.raises(ValueError):
+        m.quantile(1.5)
+
+
+def test_pushing(numbers):
+    """
+    Проверка добавления элементов
+    """
+    m = MovingQuantile(window=25)
+
+    for i, number in enumerate(numbers):
+        m.push(number)
+        window = numbers[max(0, i - 24):i + 1]
+        for q in [0.0, 0.05, 0.5, 0.95, 1.0]:
+            assert approx(m.quantile(q)) == reference_quantile(window, q)
+
+
+def test_push_many(numbers):
+    """
+    Проверка пакетного добавления элементов
+    """
+    m = MovingQuantile(window=10)
+
+    for size in [3, 0, 5, 10, 25, 4, 9]:
+        chunk = numbers[:size]
+        numbers = numbers[size:]
+        reference = (m.get_contents() + chunk)[-10:]
+
+        m.push_many(chunk)
+        assert approx(m.median) == reference_quantile(reference, 0.5)
+        assert approx(m.quantile(0.9)) == reference_quantile(reference, 0.9)
+
+
+def test_resize_and_setitem(numbers):
+    """
+    Проверка изменения размеров и подмены элемента
+    """
+    m = MovingQuantile(numbers, window=10)
+
+    m.resize(20)
+    assert approx(m.median) == reference_quantile(numbers[-10:], 0.5)
+
+    m.resize(5)
+    assert approx(m.median) == reference_quantile(numbers[-5:], 0.5)
+
+    m[0] = 1000.0
+    assert m.quantile(1) == 1000.0
+    assert approx(m.median) == reference_quantile([1000.0] + numbers[-4:], 0.5)
+
+    with pytest.raises(IndexError):
+        m[:] = [1, 2, 3, 4, 5]
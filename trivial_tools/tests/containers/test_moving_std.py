@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты скользящего стандартного отклонения
+
+"""
+# встроенные модули
+import statistics
+
+# сторонние модули
+from pytest import approx
+
+# модули проекта
+from trivial_tools.containers.class_moving_std import MovingStd
+
+
+def test_std():
+    """
+    Проверка вычисления отклонения
+    """
+    numbers = [8, 41, 9, 6, 32, 58, 8, 78, 3, 2, 45, 6, 9, 87, 51, 23]
+    m = MovingStd(window=6)
+
+    for i, number in enumerate(numbers):
+        m.push(number)
+        if i:
+            assert approx(m.std) == statistics.stdev(numbers[max(0, i - 5):i + 1])
+
+
+def test_zscore():
+    """
+    Проверка вычисления z-оценки
+    """
+    m = MovingStd(window=3)
+    assert m.zscore(5) == 0.0
+
+    m.push_many([1, 2, 3])
+    assert approx(m.zscore(5)) == 3.0
+    assert approx(m.zscore(2)) == 0.0
+    assert approx(m.zscore(0)) == -2.0
@@ -4,6 +4,10 @@
     Тесты скольщяей суммы
 
 """
+# встроенные модули
+import random
+from math import fsum
+
 # сторонние модули
 import pytest
 from pytest import approx
@@ -181,3 +185,77 @@ def test_setitem(numbers_1, numbers_2):
 
     with pytest.raises(IndexError):
         s[:] = [7.0, 28.0, 31.0, -900.0]
+
+
+def test_push_many(reference_1, numbers_1):
+    """
+    Проверка пакетного добавления элементов
+    """
+    s = MovingSum(window=4)
+
+    assert s.push_many(numbers_1[:3]) == []
+    assert approx(s.sum) == reference_1[2]
+
+    assert s.push_many(numbers_1[3:5]) == [8]
+    assert approx(s.sum) == reference_1[4]
+
+    assert s.push_many(numbers_1[5:]) == numbers_1[1:12]
+    assert approx(s.sum) == reference_1[-1]
+
+
+def test_correction_wrong():
+    """
+    Проверка создания с неизвестным режимом коррекции
+    """
+    with pytest.raises(ValueError):
+        MovingSum(window=4, correction='magic')
+
+
+def test_correction_neumaier():
+    """
+    Компенсированное суммирование не теряет младшие разряды
+    """
+    s = MovingSum(window=2)
+    c = MovingSum(window=2, correction='neumaier')
+
+    for number in [1e16, 1.0, 1.0]:
+        s.push(number)
+        c.push(number)
+
+    assert s.sum == 1.0
+    assert c.sum == 2.0
+
+    c[0] = 3.0
+    assert c.sum == 4.0
+
+    c.push_many([1e16, 5.0, 1.0])
+    assert c.sum == 6.0
+
+
+def test_correction_recompute():
+    """
+    Периодический пересчёт восстанавливает точную сумму
+    """
+    c = MovingSum(window=2, correction='recompute')
+
+    for number in [1e16, 1.0, 1.0, 1.0]:
+        c.push(number)
+
+    assert c.sum == 2.0
+
+    c.push_many([1e16, 5.0, 1.0])
+    assert c.sum == 6.0
+
+
+def test_correction_long_run():
+    """
+    На длинном потоке скорректированная сумма совпадает с точной
+    """
+    random.seed(42)
+    numbers = [random.choice([1e12, -1e12, 0.1, 7.0]) * random.random() for _ in range(20000)]
+
+    for correction in ['neumaier', 'recompute']:
+        s = MovingSum(window=100, correction=correction)
+        for number in numbers:
+            s.push(number)
+        assert s.sum == approx(fsum(numbers[-100:]), abs=1e-6)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты скользящей дисперсии
+
+"""
+# встроенные модули
+import statistics
+
+# сторонние модули
+import pytest
+from pytest import approx
+
+# модули проекта
+from trivial_tools.containers.class_moving_variance import MovingVariance
+
+
+@pytest.fixture()
+def numbers():
+    """
+    Исходные данные для вычисления дисперсии
+    """
+    return [1, 3, 5, 6, 8, 41, 9, 6, 32, 58, 8, 78, 3, 2, 45, 6, 9, 87, 51, 23]
+
+
+def test_creation():
+    """
+    Проверка создания
+    """
+    with pytest.raises(ValueError):
+        MovingVariance()
+
+    m = MovingVariance(window=2)
+    assert m.mean == 0.0
+    assert m.variance == 0.0
+
+    m = MovingVariance([1, 2, 3, 7], window=3)
+    assert approx(m.mean) == 4.0
+    assert approx(m.variance) == 7.0
+
+    m = MovingVariance([1, 2, 3, 7], window=3, ddof=0)
+    assert approx(m.variance) == statistics.pvariance([2, 3, 7])
+
+
+def test_pushing(numbers):
+    """
+    Проверка добавления элементов
+    """
+    m = MovingVariance(window=4)
+
+    for i, number in enumerate(numbers):
+        m.push(number)
+        window = numbers[max(0, i - 3):i + 1]
+        assert approx(m.mean) == statistics.mean(window)
+        if len(window) > 1:
+            assert approx(m.variance) == statistics.variance(window)
+
+
+def test_push_many(numbers):
+    """
+    Проверка пакетного добавления элементов
+    """
+    m = MovingVariance(window=5)
+
+    for chunk in [numbers[:2], numbers[2:5], numbers[5:8], numbers[8:15], [], numbers[15:]]:
+        reference = m.get_contents() + chunk
+        m.push_many(chunk)
+        assert approx(m.mean) == statistics.mean(reference[-5:])
+        assert approx(m.variance) == statistics.variance(reference[-5:])
+
+
+def test_resize(numbers):
+    """
+    Проверка изменения размеров
+    """
+    m = MovingVariance(numbers, window=4)
+
+    m.resize(10)
+    assert approx(m.variance) == statistics.variance(numbers[-4:])
+
+    for number in numbers:
+        m.push(number)
+    assert approx(m.variance) == statistics.variance(numbers[-10:])
+
+    m.resize(3)
+    assert approx(m.variance) == statistics.variance(numbers[-3:])
+
+
+def test_setitem(numbers):
+    """
+    Проверка подмены элемента
+    """
+    m = MovingVariance(numbers, window=4)
+
+    m[0] = 99.0
+    m[-1] = -4.0
+    assert approx(m.mean) == statistics.mean([99.0, 87, 51, -4.0])
+    assert approx(m.variance) == statistics.variance([99.0, 87, 51, -4.0])
+
+    with pytest.raises(IndexError):
+        m[:] = [7.0, 28.0, 31.0, -900.0]
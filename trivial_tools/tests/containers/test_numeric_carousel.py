@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты типизированной карусели
+
+"""
+# встроенные модули
+from array import array
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.containers.class_numeric_carousel import NumericCarousel
+
+
+def test_creation():
+    """
+    Проверка создания
+    """
+    with pytest.raises(ValueError):
+        NumericCarousel()
+
+    c = NumericCarousel(window=2)
+    assert len(c) == 0
+    assert c.window == 2
+    assert c.dtype == 'd'
+    assert c.itemsize == 8
+    assert list(c.get_contents()) == []
+
+    c = NumericCarousel([1, 2, 3])
+    assert len(c) == 3
+    assert c.window == 3
+    assert list(c.get_contents()) == [1, 2, 3]
+    assert list(c.extract()) == [1, 2, 3]
+    assert len(c) == 0
+
+    c = NumericCarousel([1, 2, 3], window=2, dtype='q')
+    assert len(c) == 2
+    assert c.window == 2
+    assert c.get_contents() == array('q', [2, 3])
+
+
+def test_push():
+    """
+    Проверка добавления элемента
+    """
+    c = NumericCarousel(window=3)
+
+    assert c.push(1) is None
+    assert c.push(2) is None
+    assert c.push(3) is None
+    assert list(c.get_contents()) == [1, 2, 3]
+
+    assert c.push(4) == 1
+    assert list(c.get_contents()) == [2, 3, 4]
+
+    assert c.push(5) == 2
+    assert c.push(6) == 3
+    assert list(c.get_contents()) == [4, 5, 6]
+    assert list(c._data) == [4, 5, 6]
+
+    with pytest.raises(TypeError):
+        c.push('test')
+
+
+def test_str():
+    """
+    Проверка текстового представления
+    """
+    c = NumericCarousel(window=4)
+    assert str(c) == 'NumericCarousel([], window=4)'
+    assert repr(c) == 'NumericCarousel([NULL, NULL, NULL, NULL], window=4)'
+
+    c = NumericCarousel([1, 2], window=3, dtype='l')
+    assert str(c) == 'NumericCarousel([1, 2], window=3)'
+    assert repr(c) == 'NumericCarousel([1, 2, NULL], window=3)'
+
+
+def test_resize():
+    """
+    Проверка изменения размера
+    """
+    c = NumericCarousel([1, 2, 3], window=2)
+    c.resize(5)
+    assert len(c) == 2
+    assert list(c) == [2, 3]
+
+    for i in range(4, 8):
+        c.push(i)
+    assert list(c) == [3, 4, 5, 6, 7]
+
+    c.resize(2)
+    assert len(c) == 2
+    assert list(c) == [6, 7]
+
+
+def test_getitem():
+    """
+    Проверка обращения к элементу
+    """
+    c = NumericCarousel(window=4)
+
+    with pytest.raises(IndexError):
+        assert c[0]
+
+    with pytest.raises(IndexError):
+        # noinspection PyTypeChecker
+        assert c['test']
+
+    c.push(1)
+    assert c[0] == 1
+    assert c[-1] == 1
+
+    with pytest.raises(IndexError):
+        assert c[2]
+
+    for i in range(2, 9):
+        c.push(i)
+
+    assert [c[i] for i in range(4)] == [5, 6, 7, 8]
+    assert [c[-i] for i in range(1, 5)] == [8, 7, 6, 5]
+    assert list(c[1:]) == [6, 7, 8]
+    assert list(c[0:3:2]) == [5, 7]
+
+    with pytest.raises(IndexError):
+        assert c[4]
+
+    with pytest.raises(IndexError):
+        assert c[-5]
+
+
+def test_setitem():
+    """
+    Проверка подмены элемента
+    """
+    c = NumericCarousel(window=3)
+
+    with pytest.raises(IndexError):
+        c[0] = 1
+
+    for i in range(1, 7):
+        c.push(i)
+
+    c[0] = 9
+    c[-1] = 78
+    assert list(c) == [9, 5, 78]
+
+    with pytest.raises(IndexError):
+        c[75] = 6
+
+    with pytest.raises(IndexError):
+        c[:] = [1, 2, 3]
+
+
+def test_push_many():
+    """
+    Проверка пакетного добавления элементов
+    """
+    c = NumericCarousel(window=4, dtype='q')
+
+    assert c.push_many([1, 2]) == array('q')
+    assert c.push_many(array('q', [3, 4, 5])) == array('q', [1])
+    assert list(c) == [2, 3, 4, 5]
+
+    assert c.push_many(range(6, 12)) == array('q', [2, 3, 4, 5, 6, 7])
+    assert list(c) == [8, 9, 10, 11]
+
+    c.push(12)
+    assert list(c) == [9, 10, 11, 12]
@@ -5,6 +5,7 @@
 
 """
 # встроенные модули
+import asyncio
 from datetime import datetime
 
 # сторонние модули
@@ -205,3 +206,111 @@ def test_clear(var_a, var_b):
 
     assert r.push(var_a) == []
     assert r.push(var_b) == ref
+
+
+def test_push_batch(var_items):
+    """
+    Пакетный вариант должен давать те же данные, что и построчный, но по столбцам
+    """
+    rows = [
+        (datetime(2019, 12, 1, 12, 0, 0), 'A', 1),
+        (),
+        (datetime(2019, 12, 1, 12, 0, 0), 'B', 2),
+        (datetime(2019, 12, 1, 12, 0, 3), 'C', 3),
+        (datetime(2019, 12, 1, 12, 0, 1), 'D', 4),
+        (datetime(2019, 12, 1, 12, 0, 4), 'E', 5),
+        (datetime(2019, 12, 1, 12, 0, 12), 'F', 6),
+        (datetime(2019, 12, 1, 12, 0, 14), 'G', 7),
+    ]
+
+    reference = Resampler(max_gap=5, placeholder='null')
+    batched = Resampler(max_gap=5, placeholder='null')
+
+    expected = []
+    for row in rows:
+        expected.extend(reference.push(row))
+
+    columns = batched.push_batch(rows)
+    assert [list(x) for x in zip(*columns)] == expected
+    assert columns[1].count('null') == 7
+    assert batched.previous == reference.previous
+
+    # пачки можно чередовать с построчным добавлением
+    assert batched.push_batch([]) == []
+    row = (datetime(2019, 12, 1, 12, 0, 16), 'H', 8)
+    assert batched.push(row) == reference.push(row)
+
+    r = Resampler()
+    assert r.push_batch([var_items[0]]) == []
+    assert [x[1] for x in zip(*r.push_batch(var_items[1:]))] == list('AAAAABBBBBCCCCCDDDDDE')
+
+
+def test_epoch():
+    """
+    Режим целых секунд эпохи должен давать те же данные, что и режим datetime
+    """
+    rows = [
+        (datetime(2019, 12, 1, 12, 0, 0), 'A'),
+        (datetime(2019, 12, 1, 12, 0, 3), 'B'),
+        (datetime(2019, 12, 1, 12, 0, 2), 'C'),
+        (datetime(2019, 12, 1, 12, 0, 4), 'D'),
+        (datetime(2019, 12, 1, 12, 0, 11), 'E'),
+    ]
+    epoch_rows = [(int(moment.timestamp()), value) for moment, value in rows]
+
+    reference = Resampler(max_gap=5, placeholder='null')
+    r = Resampler(max_gap=5, placeholder='null', epoch=True)
+    assert repr(r) == "Resampler(max_gap=5, datetime_index=0, placeholder='null', epoch=True)"
+    assert str(r) == 'Resampler[None]'
+
+    for row, epoch_row in zip(rows, epoch_rows):
+        expected = [[int(x[0].timestamp()), x[1]] for x in reference.push(row)]
+        assert r.push(epoch_row) == expected
+
+    assert str(r) == f'Resampler[{epoch_rows[-1][0]}]'
+
+    r.clear()
+    reference.clear()
+    columns = r.push_batch(epoch_rows)
+    assert columns[0] == [int(x.timestamp()) for x in reference.push_batch(rows)[0]]
+    assert columns[0] == list(range(epoch_rows[0][0], epoch_rows[-1][0] + 1))
+
+
+def test_aiter_push():
+    """
+    Асинхронный вариант должен выдавать те же строки и уступать циклу событий
+    """
+    rows = [
+        (datetime(2019, 12, 1, 12, 0, 0), 'A'),
+        (datetime(2019, 12, 1, 12, 0, 5), 'B'),
+        (datetime(2019, 12, 1, 12, 1, 0), 'C'),
+    ]
+
+    reference = Resampler(max_gap=100)
+    expected = [row for payload in rows for row in reference.push(payload)]
+
+    async def source():
+        for payload in rows:
+            yield payload
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(len(result))
+                await asyncio.sleep(0)
+
+        result = []
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+
+        async for row in Resampler(max_gap=100).aiter_push(source(), yield_every=10):
+            result.append(row)
+
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == expected
+    assert len(ticks) >= len(expected) // 10
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты банка ресемплеров
+
+"""
+# встроенные модули
+import random
+from datetime import datetime, timedelta
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.containers.class_resampler import Resampler
+from trivial_tools.containers.class_resampler_bank import ResamplerBank
+
+
+def test_creation():
+    """
+    Проверка создания
+    """
+    with pytest.raises(ValueError):
+        ResamplerBank([])
+
+    with pytest.raises(ValueError):
+        ResamplerBank(['A', 'A'])
+
+    b = ResamplerBank(['A', 'B'], max_gap=5)
+    assert repr(b) == 'ResamplerBank(sources=2, max_gap=5, placeholder=None, epoch=False)'
+    assert b.flush() == []
+
+    with pytest.raises(KeyError):
+        b.push('C', datetime(2019, 12, 1), 1)
+
+
+def test_push():
+    """
+    Проверка выдачи строк по мере их завершения
+    """
+    b = ResamplerBank(['A', 'B'], max_gap=3, placeholder='null', epoch=True)
+
+    assert b.push('A', 100, 1) == []
+    assert b.push('B', 100, 5) == []
+    assert b.push('A', 102, 2) == []
+    assert b.push('B', 102, 6) == [[100, 1, 5], [101, 1, 5]]
+
+    # слишком старое показание
+    assert b.push('A', 101, 9) == []
+
+    # источник B замолчал дольше max_gap
+    assert b.push('A', 103, 3) == []
+    assert b.push('A', 104, 4) == []
+    assert b.push('A', 105, 5) == []
+    assert b.push('A', 106, 6) == [[102, 2, 6], [103, 3, 'null'],
+                                   [104, 4, 'null'], [105, 5, 'null']]
+    assert b.flush() == [[106, 6, 'null']]
+
+    b.clear()
+    assert b.push('B', 200, 1) == []
+    assert b.push('B', 201, 2) == [[200, 'null', 1]]
+
+
+def test_same_as_resampler():
+    """
+    Банк должен давать те же значения, что и отдельные ресемплеры по каждому источнику
+    """
+    random.seed(9)
+    sources = ['A', 'B', 'C']
+    start = datetime(2019, 12, 1, 12, 0, 0)
+
+    samples = []
+    for source in sources:
+        moment = random.randint(0, 5)
+        while moment < 300:
+            samples.append((moment, source, random.random()))
+            moment += random.choice([1, 1, 2, 3, 7, 12])
+    samples.sort()
+
+    bank = ResamplerBank(sources, max_gap=5, placeholder='null')
+    rows = []
+    for moment, source, value in samples:
+        rows.extend(bank.push(source, start + timedelta(seconds=moment), value))
+    rows.extend(bank.flush())
+
+    first = samples[0][0]
+    assert [row[0] for row in rows] == [start + timedelta(seconds=first + i)
+                                        for i in range(len(rows))]
+
+    for column, source in enumerate(sources, start=1):
+        resampler = Resampler(max_gap=5, placeholder='null')
+        reference = {}
+        for moment, each, value in samples:
+            if each == source:
+                for row in resampler.push((start + timedelta(seconds=moment), value)):
+                    reference[row[0]] = row[1]
+
+        for row in rows:
+            if row[0] in reference:
+                assert row[column] == reference[row[0]]
+            elif row[0] != resampler.previous[0]:
+                assert row[column] == 'null'
+
+
+def test_same_second():
+    """
+    Повторное показание с той же меткой заменяет предыдущее, как и в Resampler
+    """
+    b = ResamplerBank(['A', 'B'], epoch=True)
+    assert b.push('A', 100, 1) == []
+    assert b.push('B', 100, 5) == []
+    assert b.push('A', 100, 2) == []
+    assert b.push('B', 102, 6) == []
+    assert b.push('A', 102, 3) == [[100, 2, 5], [101, 2, 5]]
+    assert b.flush() == [[102, 3, 6]]
+
+    start = datetime(2019, 12, 1)
+    resampler = Resampler()
+    rows = []
+    for moment, value in [(100, 1), (100, 2), (102, 3)]:
+        rows.extend(resampler.push((start + timedelta(seconds=moment), value)))
+    assert [row[1] for row in rows[:2]] == [2, 2]
+
+
+def test_push_batch():
+    """
+    Проверка пакетного варианта со столбцами на выходе
+    """
+    b = ResamplerBank(['A', 'B'], epoch=True)
+    columns = b.push_batch([('A', 1, 'a'), ('B', 1, 'b'), ('A', 3, 'c'), ('B', 3, 'd'),
+                            ('A', 4, 'e'), ('B', 4, 'f')])
+    assert columns == [[1, 2, 3], ['a', 'a', 'c'], ['b', 'b', 'd']]
+    assert b.push_batch([]) == []
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты отсортированной коллекции
+
+"""
+# встроенные модули
+import random
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.containers.class_sorted_blocks import SortedBlocks
+
+
+def test_add_remove():
+    """
+    Проверка добавления и удаления с делением и слиянием блоков
+    """
+    random.seed(3)
+    s = SortedBlocks(load=4)
+    reference = []
+
+    for _ in range(500):
+        if reference and random.random() < 0.4:
+            value = random.choice(reference)
+            reference.remove(value)
+            s.remove(value)
+        else:
+            value = random.randint(0, 100)
+            reference.append(value)
+            s.add(value)
+
+        reference.sort()
+        assert len(s) == len(reference)
+        assert list(s) == reference
+        for index in range(0, len(reference), 7):
+            assert s[index] == reference[index]
+
+    assert s[-1] == reference[-1]
+
+
+def test_errors():
+    """
+    Проверка ошибочных обращений
+    """
+    s = SortedBlocks()
+
+    with pytest.raises(IndexError):
+        assert s[0]
+
+    with pytest.raises(ValueError):
+        s.remove(1)
+
+    s.add(1)
+    s.add(5)
+
+    with pytest.raises(ValueError):
+        s.remove(3)
+
+    with pytest.raises(ValueError):
+        s.remove(6)
+
+    s.clear()
+    assert len(s) == 0
+    assert list(s) == []
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты карусели с окном по времени
+
+"""
+# встроенные модули
+from datetime import datetime, timedelta
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.containers.class_timed_carousel import TimedCarousel
+
+
+def test_creation():
+    """
+    Проверка создания
+    """
+    with pytest.raises(ValueError):
+        TimedCarousel(duration=0)
+
+    with pytest.raises(ValueError):
+        TimedCarousel(duration=5, capacity=0)
+
+    c = TimedCarousel(duration=60, capacity=4)
+    assert len(c) == 0
+    assert c.capacity == 4
+    assert c.newest is None
+    assert c.get_contents() == []
+    assert repr(c) == 'TimedCarousel(len=0, duration=60)'
+
+
+def test_push():
+    """
+    Проверка добавления и выталкивания по возрасту
+    """
+    c = TimedCarousel(duration=60)
+
+    assert c.push(0, 'A') == []
+    assert c.push(30, 'B') == []
+    assert c.push(60, 'C') == ['A']
+    assert c.push(61, 'D') == []
+    assert c.push(200, 'E') == ['B', 'C', 'D']
+
+    assert c.get_contents() == ['E']
+    assert c.items() == [(200, 'E')]
+
+    with pytest.raises(ValueError):
+        c.push(199, 'F')
+
+    assert c.expire(260) == ['E']
+    assert len(c) == 0
+
+
+def test_grow():
+    """
+    Хранилище растёт при нехватке места и сохраняет порядок
+    """
+    c = TimedCarousel(duration=10, capacity=2)
+
+    for second in range(25):
+        c.push(second, second)
+        assert c.get_contents() == list(range(max(0, second - 9), second + 1))
+        assert c.get_timestamps() == c.get_contents()
+
+    assert c.capacity == 16
+    assert list(c) == list(range(15, 25))
+
+    c.restore()
+    assert len(c) == 0
+    assert c.capacity == 16
+
+
+def test_datetime():
+    """
+    Проверка работы с datetime
+    """
+    start = datetime(2019, 12, 1, 12, 0, 0)
+    c = TimedCarousel(duration=timedelta(minutes=1))
+
+    c.push(start, 1)
+    c.push(start + timedelta(seconds=59), 2)
+    assert c.push(start + timedelta(seconds=61), 3) == [1]
+    assert c.newest == start + timedelta(seconds=61)
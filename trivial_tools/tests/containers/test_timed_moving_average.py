@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты скользящих суммы и среднего в окне по времени
+
+"""
+# встроенные модули
+import random
+
+# сторонние модули
+from pytest import approx
+
+# модули проекта
+from trivial_tools.containers.class_timed_moving_sum import TimedMovingSum
+from trivial_tools.containers.class_timed_moving_average import TimedMovingAverage
+
+
+def test_sum():
+    """
+    Проверка скользящей суммы
+    """
+    m = TimedMovingSum(duration=60)
+    assert m.sum == 0
+
+    m.push(0, 8)
+    m.push(30, 41)
+    assert m.sum == 49
+
+    m.push(65, 9)
+    assert m.sum == 50
+
+    m.expire(100)
+    assert m.sum == 9
+
+    m.expire(1000)
+    assert m.sum == 0
+
+    m.push(1000, 3)
+    m.restore()
+    assert m.sum == 0
+
+
+def test_average():
+    """
+    Проверка скользящего среднего на неравномерном потоке
+    """
+    random.seed(5)
+    m = TimedMovingAverage(duration=60.0)
+    assert m.avg == 0.0
+
+    moment = 0.0
+    history = []
+    for _ in range(500):
+        moment += random.expovariate(1 / 7)
+        value = random.uniform(-10, 10)
+        history.append((moment, value))
+        m.push(moment, value)
+
+        window = [v for t, v in history if t > moment - 60.0]
+        assert len(m) == len(window)
+        assert approx(m.sum) == sum(window)
+        assert approx(m.avg) == sum(window) / len(window)
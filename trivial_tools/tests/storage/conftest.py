@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Общие приспособления для тестов хранилищ
+
+"""
+# сторонние модули
+import pytest
+
+
+class FakeClock:
+    """
+    Подменные часы для машины
+    """
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    """
+    Монотонные часы, которые идут только по команде
+    """
+    return FakeClock(1000.0)
+
+
+@pytest.fixture()
+def wall_clock():
+    """
+    Системные часы, которые идут только по команде
+    """
+    return FakeClock(1_600_000_000.0)
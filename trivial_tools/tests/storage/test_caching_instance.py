@@ -5,7 +5,6 @@
 
 """
 # встроенные модули
-from datetime import datetime
 from unittest.mock import patch
 
 # модули проекта
@@ -21,33 +20,39 @@ def test_expiration_persistent():
     assert inst.not_expired
     assert inst.not_expired()
     assert not inst.expired()
+    assert not inst.expired(now=10.0 ** 12)
 
 
 def test_expiration():
     """
     Проверка протухания экземпляра
     """
-    with patch('trivial_tools.storage.caching_instance.datetime') as fake:
-        fake.now.return_value = datetime(2019, 10, 31, 18, 6, 0)
-        inst = CachingInstance(123, 5)
-        assert inst.value == 123
-        assert inst.expires == datetime(2019, 10, 31, 18, 6, 5)
-        assert inst.not_expired()
-        assert not inst.expired()
+    inst = CachingInstance(123, 5, now=1000.0)
+    assert inst.value == 123
+    assert inst.expires == 1005.0
+
+    assert inst.not_expired(now=1000.0)
+    assert not inst.expired(now=1000.0)
+
+    assert inst.not_expired(now=1004.0)
+    assert not inst.expired(now=1004.0)
 
-    with patch('trivial_tools.storage.caching_instance.datetime') as fake:
-        fake.now.return_value = datetime(2019, 10, 31, 18, 6, 4)
-        assert inst.value == 123
-        assert inst.expires == datetime(2019, 10, 31, 18, 6, 5)
+    assert inst.expired(now=1005.0)
+    assert not inst.not_expired(now=1005.0)
+
+
+def test_monotonic():
+    """
+    Без явного момента используются монотонные часы
+    """
+    with patch('trivial_tools.storage.caching_instance.time') as fake:
+        fake.monotonic.return_value = 50.0
+        inst = CachingInstance(123, 5)
+        assert inst.expires == 55.0
         assert inst.not_expired()
-        assert not inst.expired()
 
-    with patch('trivial_tools.storage.caching_instance.datetime') as fake:
-        fake.now.return_value = datetime(2019, 10, 31, 18, 6, 5)
-        assert inst.value == 123
-        assert inst.expires == datetime(2019, 10, 31, 18, 6, 5)
+        fake.monotonic.return_value = 55.0
         assert inst.expired()
-        assert not inst.not_expired()
 
 
 def test_repr():
@@ -57,8 +62,5 @@ def test_repr():
     inst = CachingInstance(123)
     assert str(inst) == 'CachingInstance(value=123, expires=None)'
 
-    with patch('trivial_tools.storage.caching_instance.datetime') as fake:
-        fake.now.return_value = datetime(2019, 10, 31, 18, 6, 5)
-        inst = CachingInstance(345, 56)
-        assert str(inst) == ('CachingInstance(value=345, '
-                             'expires=datetime.datetime(2019, 10, 31, 18, 7, 1))')
+    inst = CachingInstance(345, 56, now=4.0)
+    assert str(inst) == 'CachingInstance(value=345, expires=60.0)'
@@ -5,8 +5,8 @@
 
 """
 # встроенные модули
-from datetime import datetime
-from unittest.mock import patch
+import asyncio
+import threading
 
 # сторонние модули
 import pytest
@@ -24,49 +24,47 @@ def machine_persistent():
 
 
 @pytest.fixture()
-def machine_not_persistent():
+def machine_not_persistent(clock):
     """
     Машина со сроком хранения 5 секунд
     """
-    return CachingMachine(expiration=5)
+    return CachingMachine(expiration=5, clock=clock)
 
 
 @pytest.fixture()
-def machine_tiny():
+def machine_tiny(clock):
     """
     Машина со сроком хранения 5 секунд и всего на 4 элемента
     """
-    return CachingMachine(expiration=5, max_items=4)
+    return CachingMachine(expiration=5, max_items=4, clock=clock)
 
 
 def test_fill(machine_tiny):
     """
     Проверка заполнения машины
     """
-    with patch('trivial_tools.storage.caching_instance.datetime') as fake:
-        fake.now.return_value = datetime(2019, 10, 31, 18, 6, 0)
-        assert machine_tiny.total() == 0
+    assert machine_tiny.total() == 0
 
-        machine_tiny.set('key_1', 'value')
-        assert machine_tiny.total() == 1
+    machine_tiny.set('key_1', 'value')
+    assert machine_tiny.total() == 1
 
-        machine_tiny.set('key_1', 'value')
-        assert machine_tiny.total() == 1
+    machine_tiny.set('key_1', 'value')
+    assert machine_tiny.total() == 1
 
-        machine_tiny.set('key_2', 'value')
-        assert machine_tiny.total() == 2
+    machine_tiny.set('key_2', 'value')
+    assert machine_tiny.total() == 2
 
-        machine_tiny.set('key_3', 'value')
-        assert machine_tiny.total() == 3
+    machine_tiny.set('key_3', 'value')
+    assert machine_tiny.total() == 3
 
-        machine_tiny.set('key_4', 'value')
-        assert machine_tiny.total() == 4
+    machine_tiny.set('key_4', 'value')
+    assert machine_tiny.total() == 4
 
-        machine_tiny.set('key_5', 'value')
-        assert machine_tiny.total() == 4
+    machine_tiny.set('key_5', 'value')
+    assert machine_tiny.total() == 4
 
-        machine_tiny.clear()
-        assert machine_tiny.total() == 0
+    machine_tiny.clear()
+    assert machine_tiny.total() == 0
 
 
 def test_caching(machine_persistent):
@@ -98,3 +96,433 @@ def test_caching_string(machine_persistent):
     assert func(1, 2) == 3
 
     assert machine_persistent.keys() == ['func_1_2', 'func_2_3']
+
+
+def test_eviction_lru():
+    """
+    Заполненная машина вытесняет давно не используемый ключ
+    """
+    machine = CachingMachine(max_items=3)
+    assert machine.policy == 'lru'
+
+    for key in ['a', 'b', 'c']:
+        assert machine.set(key, key)
+
+    assert machine.get('a') == 'a'
+    assert machine.set('d', 'd')
+    assert machine.total() == 3
+    assert machine.keys() == ['a', 'c', 'd']
+
+    # перезапись существующего ключа ничего не вытесняет
+    assert machine.set('c', 'x')
+    assert machine.keys() == ['a', 'c', 'd']
+
+
+def test_eviction_lfu():
+    """
+    Заполненная машина вытесняет редко используемый ключ
+    """
+    machine = CachingMachine(max_items=3, policy='lfu')
+
+    for key in ['a', 'b', 'c']:
+        machine.set(key, key)
+
+    machine.get('a')
+    machine.get('a')
+    machine.get('c')
+
+    machine.set('d', 'd')
+    assert sorted(machine.keys()) == ['a', 'c', 'd']
+
+    machine.set('e', 'e')
+    assert sorted(machine.keys()) == ['a', 'c', 'e']
+
+
+def test_eviction_fifo():
+    """
+    Заполненная машина вытесняет самый старый ключ
+    """
+    machine = CachingMachine(max_items=2, policy='fifo')
+    machine.set('a', 'a')
+    machine.set('b', 'b')
+    machine.get('a')
+    machine.set('c', 'c')
+    assert machine.keys() == ['b', 'c']
+
+
+def test_eviction_expired_first(clock):
+    """
+    Перед вытеснением удаляются устаревшие элементы
+    """
+    machine = CachingMachine(max_items=2, clock=clock)
+    machine.set('a', 'a')
+    machine.set('b', 'b', expires=5)
+    machine.get('b')
+
+    clock.now += 10
+    machine.set('c', 'c')
+    assert machine.keys() == ['a', 'c']
+
+
+def test_wrong_policy():
+    """
+    Проверка создания с неизвестной политикой
+    """
+    with pytest.raises(ValueError):
+        CachingMachine(policy='random')
+
+
+def test_cleanup_index(machine_not_persistent, clock):
+    """
+    Очистка трогает только устаревшие элементы
+    """
+    machine = machine_not_persistent
+    for i in range(10):
+        machine.set(f'short_{i}', 'value', expires=i + 1)
+    machine.set('default', 'value', expires=None)
+    machine.assign('long', 'value', expires=100)
+
+    # перезапись и удаление оставляют в куче устаревшие записи
+    machine.set('short_0', 'value', expires=50)
+    machine.delete('short_1')
+    assert machine.cleanup() == 0
+
+    clock.now += 5
+    assert machine.cleanup() == 4
+    assert machine.total() == 7
+
+    clock.now += 55
+    assert machine.cleanup() == 6
+    assert machine.keys() == ['long']
+
+    machine.clear()
+    assert machine.cleanup() == 0
+
+
+def test_clock(machine_not_persistent, clock):
+    """
+    Проверка протухания по подменным часам
+    """
+    machine = machine_not_persistent
+    machine.set('key', 'value')
+
+    clock.now += 4.9
+    assert machine.get('key') == 'value'
+
+    clock.now += 0.1
+    assert machine.get('key') is None
+    assert machine.total() == 0
+
+
+def test_cleanup_compaction():
+    """
+    Куча сроков хранения не растёт бесконечно при перезаписи ключей
+    """
+    machine = CachingMachine(expiration=60, max_items=10)
+    for i in range(1000):
+        machine.set(f'key_{i % 5}', 'value')
+
+    assert machine.total() == 5
+    assert len(machine._expiry) <= 2 * 5 + 64
+
+
+def test_cache_call_none_value(machine_persistent):
+    """
+    Закешированное значение None не вызывает повторного вычисления
+    """
+    calls = []
+
+    @machine_persistent.cache_call()
+    def func(x):
+        calls.append(x)
+
+    assert func(1) is None
+    assert func(1) is None
+    assert calls == [1]
+
+
+def test_cache_call_kwargs(machine_persistent):
+    """
+    Именованные аргументы входят в ключ, метаданные функции сохраняются
+    """
+    calls = []
+
+    @machine_persistent.cache_call()
+    def func(x, y=1):
+        """Документация"""
+        calls.append((x, y))
+        return x + y
+
+    assert func(1) == 2
+    assert func(1, y=5) == 6
+    assert func(1, y=5) == 6
+    assert func(1) == 2
+    assert calls == [(1, 1), (1, 5)]
+    assert func.__name__ == 'func'
+    assert func.__doc__ == 'Документация'
+    assert func.__wrapped__(1, y=2) == 3
+
+
+def test_cache_call_using_strings_kwargs(machine_persistent):
+    """
+    Именованные аргументы входят в строковый ключ
+    """
+    @machine_persistent.cache_call_using_strings()
+    def func(x, y=1):
+        return x * y
+
+    assert func(2, y=3) == 6
+    assert machine_persistent.keys() == ['func_2_y=3']
+
+
+def test_cache_call_async(machine_persistent):
+    """
+    Для корутинных функций кешируется результат, а не объект корутины
+    """
+    calls = []
+
+    @machine_persistent.cache_call()
+    async def func(x, *, scale=1):
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return x * scale
+
+    async def main():
+        first = await asyncio.gather(*(func(2, scale=3) for _ in range(4)))
+        second = await func(2, scale=3)
+        return first, second
+
+    assert asyncio.run(main()) == ([6] * 4, 6)
+    assert calls == [2]
+    assert asyncio.iscoroutinefunction(func)
+    assert machine_persistent[machine_persistent.keys()[0]].value == 6
+
+
+def test_max_bytes():
+    """
+    Вытеснение удерживает суммарный размер в пределах ограничения
+    """
+    machine = CachingMachine(max_bytes=100)
+    assert machine.assign('a', 'a', size=40)
+    assert machine.assign('b', 'b', size=40)
+    assert machine.bytes_used == 80
+
+    assert machine.assign('c', 'c', size=50)
+    assert machine.keys() == ['b', 'c']
+    assert machine.bytes_used == 90
+    assert machine.evictions == 1
+
+    # перезапись учитывает освобождаемое место
+    assert machine.assign('c', 'c', size=60)
+    assert machine.keys() == ['b', 'c']
+    assert machine.bytes_used == 100
+
+    assert not machine.assign('huge', 'huge', size=101)
+    assert 'huge' not in machine
+
+    machine.delete('b')
+    assert machine.bytes_used == 60
+
+    machine.clear()
+    assert machine.bytes_used == 0
+    assert machine.evictions == 1
+
+
+def test_max_bytes_sizer():
+    """
+    Размер оценивается функцией, если не передан явно
+    """
+    machine = CachingMachine(max_bytes=10, sizer=len)
+    machine.set('a', 'xxxx')
+    machine.set('b', 'yyyy')
+    machine.set('c', 'zzzzzz')
+    assert machine.keys() == ['b', 'c']
+    assert machine.bytes_used == 10
+
+    machine = CachingMachine(max_bytes=10 ** 6)
+    machine.set('key', 'x' * 1000)
+    assert machine.bytes_used > 1000
+
+
+def test_batch_operations(machine_not_persistent, clock):
+    """
+    Пакетные операции читают часы один раз на пачку
+    """
+    machine = machine_not_persistent
+    calls = []
+
+    def counting_clock():
+        calls.append(1)
+        return clock()
+
+    machine.clock = counting_clock
+    assert machine.set_many({'a': '1', 'b': '2', 'c': '3'})
+    assert len(calls) == 1
+
+    assert machine.get_many(['a', 'x', 'c']) == ['1', None, '3']
+    assert machine.extract_many(['x'], default=0) == [0]
+    assert len(calls) == 3
+
+    assert not machine.set_many({'d': '4', 'e': 5})
+    assert 'd' not in machine
+
+    clock.now += 10
+    assert machine.get_many(['a', 'b']) == [None, None]
+    assert machine.total() == 1
+
+    machine.assign_many({'a': 1, 'b': 2})
+    assert machine.delete_many(['a', 'b', 'x']) == 2
+    assert machine.keys() == ['c']
+
+
+def test_stats(clock):
+    """
+    Проверка счётчиков статистики
+    """
+    machine = CachingMachine(expiration=5, max_items=2, clock=clock)
+    machine.set('a', '1')
+    machine.set('b', '2')
+    machine.get('a')
+    machine.get('x')
+    machine.set('c', '3')
+
+    clock.now += 10
+    machine.get('a')
+    assert machine.cleanup() == 1
+
+    stats = machine.stats()
+    assert stats['items'] == 0
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['hit_ratio'] == pytest.approx(1 / 3)
+    assert stats['evictions'] == 1
+    assert stats['expirations'] == 2
+    assert stats['cleanups'] == 2
+    assert stats['cleanup_seconds'] >= 0
+
+    machine.reset_stats()
+    stats = machine.stats()
+    assert stats['hits'] == stats['misses'] == stats['evictions'] == 0
+    assert stats['hit_ratio'] == 0.0
+
+
+def test_stats_functions(machine_persistent):
+    """
+    Попадания и промахи по каждой функции под cache_call
+    """
+    @machine_persistent.cache_call()
+    def first(x):
+        return x
+
+    @machine_persistent.cache_call_using_strings()
+    def second(x):
+        return x
+
+    for x in (1, 1, 1, 2):
+        first(x)
+    second(1)
+
+    stats = machine_persistent.stats()
+    assert stats['functions'] == {
+        'test_stats_functions.<locals>.first': {'hits': 2, 'misses': 2},
+        'test_stats_functions.<locals>.second': {'hits': 0, 'misses': 1},
+    }
+    # промах декорированной функции засчитывается машине ровно один раз
+    assert stats['hits'] == 2
+    assert stats['misses'] == 3
+    assert stats['hit_ratio'] == pytest.approx(2 / 5)
+
+    machine_persistent.reset_stats()
+    assert machine_persistent.stats()['functions'][
+        'test_stats_functions.<locals>.first'] == {'hits': 0, 'misses': 0}
+
+
+def test_report_stats(machine_persistent):
+    """
+    Статистика периодически передаётся в функцию обратного вызова
+    """
+    reports = []
+    reported = threading.Event()
+
+    def callback(stats):
+        reports.append(stats)
+        reported.set()
+
+    machine_persistent.set('key', 'value')
+    task = machine_persistent.report_stats(callback, interval=0.01)
+    assert reported.wait(1)
+    task.stop()
+
+    assert not task.running
+    assert reports[0]['items'] == 1
+
+
+def test_cleanup_limit(machine_not_persistent, clock):
+    """
+    Очистка разбирает не больше указанного количества записей
+    """
+    machine = machine_not_persistent
+    for i in range(10):
+        machine.set(f'key_{i}', 'value')
+
+    clock.now += 10
+    assert machine.has_expired()
+    assert machine.cleanup(limit=3) == 3
+    assert machine.total() == 7
+    assert machine.cleanup() == 7
+    assert not machine.has_expired()
+
+
+def test_sweep(clock):
+    """
+    Активная очистка порциями с ограничением по времени
+    """
+    machine = CachingMachine(expiration=5, max_items=2000, clock=clock)
+    for i in range(1000):
+        machine.set(f'key_{i}', 'value')
+    machine.set('fresh', 'value', expires=100)
+
+    clock.now += 10
+    # нулевой бюджет - только одна порция
+    assert machine.sweep(max_seconds=0, batch=10) == 10
+    assert machine.sweep(max_seconds=10, batch=10) == 990
+    assert machine.keys() == ['fresh']
+    assert machine.sweep() == 0
+
+
+def test_sweep_forever(machine_not_persistent, clock):
+    """
+    Фоновая очистка в цикле событий
+    """
+    machine = machine_not_persistent
+    for i in range(500):
+        machine.set(f'key_{i}', 'value')
+    clock.now += 10
+
+    async def main():
+        task = asyncio.ensure_future(machine.sweep_forever(interval=10, max_seconds=0, batch=16))
+        for _ in range(100):
+            await asyncio.sleep(0)
+            if not machine.total():
+                break
+        task.cancel()
+        return machine.total()
+
+    assert asyncio.run(main()) == 0
+
+
+def test_stale_while_revalidate_needs_thread_safety(machine_not_persistent):
+    """
+    Фоновое обновление обычной функции запрещено на непотокобезопасной машине,
+    для корутинной оно идёт в том же цикле событий и разрешено
+    """
+    with pytest.raises(ValueError):
+        @machine_not_persistent.cache_call(stale_while_revalidate=True)
+        def func(x):
+            return x
+
+    @machine_not_persistent.cache_call(stale_while_revalidate=True)
+    async def coroutine(x):
+        return x
+
+    assert asyncio.run(coroutine(1)) == 1
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты кеширующих машин для конкурентного доступа
+
+"""
+# встроенные модули
+import time
+import asyncio
+import threading
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.storage.concurrent_machine import ShardedCachingMachine, AsyncCachingMachine
+
+
+def test_sharded_basic(clock):
+    """
+    Проверка основных операций машины с шардами
+    """
+    machine = ShardedCachingMachine(expiration=5, max_items=64, shards=4, clock=clock)
+    for i in range(10):
+        machine.set(f'key_{i}', str(i))
+
+    assert machine.total() == 10
+    assert sorted(machine.keys()) == sorted(f'key_{i}' for i in range(10))
+    assert machine.get('key_3') == '3'
+    assert 'key_3' in machine
+    assert machine.exists('key_3')
+    assert machine['key_3'].value == '3'
+
+    assert machine.delete('key_3')
+    assert not machine.delete('key_3')
+    assert machine.get('key_3') is None
+
+    clock.now += 10
+    assert machine.cleanup() == 9
+    assert machine.total() == 0
+
+    machine.set('key', 'value')
+    machine.clear()
+    assert machine.total() == 0
+
+    with pytest.raises(ValueError):
+        ShardedCachingMachine(shards=0)
+
+
+def test_sharded_eviction():
+    """
+    Ограничение по количеству элементов делится между шардами
+    """
+    machine = ShardedCachingMachine(max_items=8, shards=2)
+    for i in range(100):
+        machine.assign(i, i)
+    assert machine.total() == 8
+
+    assert machine.evict() is not None
+    assert machine.total() == 7
+
+
+def test_sharded_limits_sum():
+    """
+    Доли шардов в сумме дают ровно max_items, лишних шардов не создаётся
+    """
+    machine = ShardedCachingMachine(max_items=4)
+    assert len(machine._shards) == 4
+    for i in range(100):
+        machine.assign(i, i)
+    assert machine.total() == 4
+
+    machine = ShardedCachingMachine(max_items=1000, max_bytes=1003, sizer=lambda x: 1)
+    assert sum(shard.max_items for shard in machine._shards) == 1000
+    assert sum(shard.max_bytes for shard in machine._shards) == 1003
+    for i in range(5000):
+        machine.assign(i, i)
+    assert machine.total() == 1000
+    assert machine.is_full()
+
+
+def test_sharded_cache_call():
+    """
+    Декоратор работает поверх шардов
+    """
+    machine = ShardedCachingMachine()
+    calls = []
+
+    @machine.cache_call()
+    def func(x):
+        calls.append(x)
+        return x * 2
+
+    assert func(2) == 4
+    assert func(2) == 4
+    assert calls == [2]
+
+
+def test_sharded_threads():
+    """
+    Одновременная запись, чтение, удаление и очистка из многих потоков
+    """
+    machine = ShardedCachingMachine(expiration=0, max_items=100, shards=4)
+    errors = []
+
+    def worker(number):
+        try:
+            for i in range(2000):
+                key = (number, i % 50)
+                machine.assign(key, i)
+                machine.extract(key)
+                if i % 7 == 0:
+                    machine.delete(key)
+                if i % 100 == 0:
+                    machine.cleanup()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert machine.total() <= 100
+
+
+def test_async_machine(clock):
+    """
+    Проверка асинхронной машины
+    """
+    machine = AsyncCachingMachine(expiration=5, clock=clock)
+
+    async def writer(number):
+        for i in range(100):
+            await machine.assign((number, i), i)
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(*(writer(n) for n in range(5)))
+        assert machine.total() == 500
+        assert await machine.extract((1, 5)) == 5
+        assert await machine.set('key', 'value')
+        assert await machine.get('key') == 'value'
+        assert machine.exists('key')
+        assert 'key' in machine
+        assert await machine.delete('key')
+
+        clock.now += 10
+        assert await machine.cleanup() == 500
+
+        await machine.set('key', 'value')
+        await machine.clear()
+        return machine.keys()
+
+    assert asyncio.run(main()) == []
+
+
+def test_async_cache_call(clock):
+    """
+    Одновременные промахи корутин вычисляются один раз, протухшее значение
+    отдаётся во время фонового обновления
+    """
+    machine = AsyncCachingMachine(expiration=5, clock=clock)
+    calls = []
+
+    @machine.cache_call(stale_while_revalidate=True)
+    async def func(x):
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        first = await asyncio.gather(*(func('a') for _ in range(5)))
+
+        clock.now += 10
+        stale = await func('a')
+        await asyncio.sleep(0.05)
+        fresh = await func('a')
+        return first, stale, fresh
+
+    assert asyncio.run(main()) == ([1] * 5, 1, 2)
+    assert calls == ['a', 'a']
+
+
+def test_async_cache_call_cancel():
+    """
+    Отмена первого вызывающего не роняет остальных, ждущих того же ключа
+    """
+    machine = AsyncCachingMachine()
+    calls = []
+
+    @machine.cache_call()
+    async def func(x):
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return x * 2
+
+    async def main():
+        first = asyncio.ensure_future(func(3))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(func(3))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, await func(3)
+
+    assert asyncio.run(main()) == (6, 6)
+    assert calls == [3]
+
+
+def test_sharded_max_bytes():
+    """
+    Ограничение по байтам делится между шардами
+    """
+    machine = ShardedCachingMachine(max_bytes=400, shards=4, sizer=len)
+    for i in range(100):
+        machine.assign(i, 'x' * 30)
+
+    assert machine.bytes_used <= 400
+    assert machine.bytes_used == machine.total() * 30
+    assert machine.evictions == 100 - machine.total()
+    assert not machine.assign('big', 'x' * 101)
+
+
+def test_sharded_batch():
+    """
+    Пакетные операции поверх шардов
+    """
+    machine = ShardedCachingMachine(shards=4)
+    assert machine.set_many({f'key_{i}': str(i) for i in range(20)})
+    keys = [f'key_{i}' for i in range(25)]
+    assert machine.get_many(keys) == [str(i) for i in range(20)] + [None] * 5
+    assert machine.delete_many(keys[::2]) == 10
+    assert machine.total() == 10
+
+
+def test_async_batch():
+    """
+    Пакетные операции асинхронной машины
+    """
+    machine = AsyncCachingMachine()
+
+    async def main():
+        assert await machine.set_many({'a': '1', 'b': '2'})
+        assert await machine.assign_many({'c': 3})
+        assert await machine.get_many(['a', 'x']) == ['1', None]
+        assert await machine.extract_many(['c']) == [3]
+        return await machine.delete_many(['a', 'b', 'c'])
+
+    assert asyncio.run(main()) == 3
+
+
+def test_async_forwarding(clock):
+    """
+    Асинхронная машина принимает те же параметры и отдаёт ту же статистику, что и обычная
+    """
+    machine = AsyncCachingMachine(expiration=5, max_bytes=100, sizer=len, clock=clock)
+    reports = []
+
+    async def main():
+        for i in range(5):
+            await machine.assign(i, 'x' * 30)
+        assert machine.bytes_used == 90
+        assert machine.evictions == 2
+        assert machine.peek(4).value == 'x' * 30
+        assert await machine.evict() == 2
+        assert await machine.extract(4) == 'x' * 30
+        assert await machine.extract(0) is None
+
+        clock.now += 10
+        assert machine.has_expired()
+        assert await machine.sweep(max_seconds=1) == 2
+        return machine.stats()
+
+    stats = asyncio.run(main())
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 1, 3)
+
+    machine.reset_stats()
+    assert machine.stats()['hits'] == 0
+
+    task = machine.report_stats(reports.append, interval=0.01)
+    for _ in range(100):
+        if reports:
+            break
+        time.sleep(0.01)
+    task.stop()
+    assert reports[0]['items'] == 0
+
+
+def test_sharded_stats():
+    """
+    Статистика суммируется по шардам
+    """
+    machine = ShardedCachingMachine(max_items=100, shards=2)
+
+    @machine.cache_call()
+    def func(x):
+        return x
+
+    for i in range(10):
+        func(i % 5)
+
+    stats = machine.stats()
+    assert stats['functions'] == {'test_sharded_stats.<locals>.func': {'hits': 5, 'misses': 5}}
+    assert stats['hits'] == 5
+    assert stats['misses'] == 5
+    assert stats['hit_ratio'] == 0.5
+    assert stats['items'] == machine.total()
+
+    machine.reset_stats()
+    assert machine.stats()['hits'] == 0
+    assert AsyncCachingMachine().stats()['items'] == 0
+
+
+def test_sharded_sweep(clock):
+    """
+    Активная очистка шардов по кругу и в фоновом потоке
+    """
+    machine = ShardedCachingMachine(expiration=5, shards=4, clock=clock)
+    for i in range(400):
+        machine.set(f'key_{i}', 'value')
+
+    clock.now += 10
+    assert machine.has_expired()
+    assert machine.sweep(max_seconds=0, batch=10) == 10
+    assert machine.total() == 390
+    assert machine.cleanup(limit=5) == 20
+
+    sweeper = machine.start_sweeper(interval=0.01)
+    for _ in range(100):
+        if not machine.total():
+            break
+        time.sleep(0.01)
+    sweeper.stop()
+
+    assert machine.total() == 0
+    assert not machine.has_expired()
+
+
+def test_async_sweeper(clock):
+    """
+    Фоновая очистка асинхронной машины
+    """
+    machine = AsyncCachingMachine(expiration=5, clock=clock)
+
+    async def main():
+        for i in range(100):
+            await machine.set(f'key_{i}', 'value')
+        clock.now += 10
+        task = machine.start_sweeper(interval=10)
+        for _ in range(100):
+            await asyncio.sleep(0)
+            if not machine.total():
+                break
+        task.cancel()
+        return machine.total()
+
+    assert asyncio.run(main()) == 0
+
+
+def test_join_running_refresh(clock):
+    """
+    Обычный промах, присоединившийся к фоновому обновлению, получает новое значение
+    """
+    machine = ShardedCachingMachine(expiration=5, clock=clock)
+    release = threading.Event()
+    calls = []
+
+    @machine.cache_call(stale_while_revalidate=True)
+    def func(x):
+        calls.append(x)
+        if len(calls) > 1:
+            release.wait(1)
+        return len(calls)
+
+    assert func(1) == 1
+
+    clock.now += 10
+    assert func(1) == 1
+
+    # устаревшее значение пропало, пока обновление ещё идёт
+    assert machine.cleanup() == 1
+    results = []
+    joiner = threading.Thread(target=lambda: results.append(func(1)))
+    joiner.start()
+    time.sleep(0.05)
+    release.set()
+    joiner.join()
+
+    assert results == [2]
+    assert calls == [1, 1]
+
+
+def test_sharded_cache_call_coalescing():
+    """
+    Одновременные промахи по одному ключу вычисляются один раз
+    """
+    machine = ShardedCachingMachine()
+    calls = []
+
+    @machine.cache_call()
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return x * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow(3))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [3]
+    assert results == [6] * 8
+
+
+def test_sharded_stale_while_revalidate(clock):
+    """
+    Протухшее значение отдаётся сразу, пока идёт фоновое обновление
+    """
+    machine = ShardedCachingMachine(expiration=5, clock=clock)
+    release = threading.Event()
+    calls = []
+
+    @machine.cache_call(stale_while_revalidate=True)
+    def func(x):
+        calls.append(x)
+        if len(calls) > 1:
+            release.wait(1)
+        return len(calls)
+
+    assert func('a') == 1
+
+    clock.now += 10
+    assert func('a') == 1
+    assert func('a') == 1
+
+    release.set()
+    for _ in range(100):
+        if machine.get(('func', ('a',))) == 2:
+            break
+        time.sleep(0.01)
+    assert func('a') == 2
+    assert calls == ['a', 'a']
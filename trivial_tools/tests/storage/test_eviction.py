@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты политик вытеснения
+
+"""
+# встроенные модули
+import random
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.storage.eviction import LRUPolicy, LFUPolicy, FIFOPolicy, make_policy
+
+
+def test_make_policy():
+    """
+    Проверка создания политики по названию
+    """
+    assert isinstance(make_policy('lru'), LRUPolicy)
+    assert isinstance(make_policy('lfu'), LFUPolicy)
+    assert isinstance(make_policy('fifo'), FIFOPolicy)
+
+    with pytest.raises(ValueError):
+        make_policy('mru')
+
+
+def test_lru():
+    """
+    Проверка порядка LRU
+    """
+    policy = LRUPolicy()
+    for key in 'abc':
+        policy.insert(key)
+
+    assert policy.victim() == 'a'
+    policy.touch('a')
+    assert policy.victim() == 'b'
+    policy.remove('b')
+    assert policy.victim() == 'c'
+    policy.insert('c')
+    assert policy.victim() == 'a'
+    assert len(policy) == 2
+
+    policy.clear()
+    assert len(policy) == 0
+
+
+def test_fifo():
+    """
+    Проверка порядка FIFO
+    """
+    policy = FIFOPolicy()
+    for key in 'abc':
+        policy.insert(key)
+
+    policy.touch('a')
+    assert policy.victim() == 'a'
+
+
+def test_lfu():
+    """
+    Проверка порядка LFU
+    """
+    policy = LFUPolicy()
+    for key in 'abc':
+        policy.insert(key)
+
+    policy.touch('a')
+    policy.touch('b')
+    assert policy.victim() == 'c'
+
+    policy.remove('c')
+    assert policy.victim() == 'a'
+
+    policy.touch('a')
+    assert policy.victim() == 'b'
+
+    policy.insert('d')
+    assert policy.victim() == 'd'
+
+    policy.remove('d')
+    policy.remove('b')
+    assert policy.victim() == 'a'
+    assert len(policy) == 1
+
+    policy.clear()
+    assert len(policy) == 0
+
+
+def test_lfu_random():
+    """
+    Жертва LFU совпадает с прямым поиском минимума при случайных операциях
+    """
+    random.seed(14)
+    policy = LFUPolicy()
+    counts = {}
+    order = {}
+    for step in range(3000):
+        key = random.randrange(30)
+        action = random.random()
+        if action < 0.2:
+            policy.remove(key)
+            counts.pop(key, None)
+        elif key in counts or action < 0.6:
+            policy.insert(key)
+            counts[key] = counts.get(key, 0) + 1
+            order[key] = step
+
+        if counts:
+            expected = min(counts, key=lambda x: (counts[x], order[x]))
+            assert policy.victim() == expected
+        assert len(policy) == len(counts)
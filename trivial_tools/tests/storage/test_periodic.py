@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты периодического вызова функции
+
+"""
+# встроенные модули
+import threading
+
+# модули проекта
+from trivial_tools.storage.periodic import PeriodicThread
+
+
+def test_periodic_thread(capsys):
+    """
+    Функция вызывается повторно, исключения не останавливают поток
+    """
+    calls = []
+    done = threading.Event()
+
+    def func():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError('boom')
+        if len(calls) >= 3:
+            done.set()
+
+    task = PeriodicThread(0.01, func)
+    assert repr(task) == 'PeriodicThread(interval=0.01, running=False)'
+
+    assert task.start() is task
+    assert task.running
+    assert done.wait(1)
+    task.stop()
+
+    assert not task.running
+    assert len(calls) >= 3
+    assert "ValueError('boom')" in capsys.readouterr().out
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты кеширующей машины с вторым уровнем на диске
+
+"""
+# встроенные модули
+import pickle
+import threading
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.storage.persistent_machine import PersistentCachingMachine, SqliteStore
+
+
+@pytest.fixture()
+def path(tmp_path):
+    """
+    Путь к файлу хранилища
+    """
+    return str(tmp_path / 'cache.sqlite3')
+
+
+def test_snapshot_and_lazy_warm(path, clock, wall_clock):
+    """
+    После перезапуска значения поднимаются с диска при первом обращении
+    """
+    machine = PersistentCachingMachine(path, expiration=60, clock=clock, wall_clock=wall_clock)
+    machine.set('short', 'a', expires=5)
+    machine.set('long', 'b')
+    machine.assign(('tuple', 1), {'x': [1, 2]})
+    machine.assign('lambda', lambda: None)
+    assert machine.snapshot().join() is None
+    assert len(machine.store) == 3
+    machine.close()
+
+    # новый процесс: монотонные часы начались заново, системные ушли вперёд
+    clock.now = 5.0
+    wall_clock.now += 10
+    machine = PersistentCachingMachine(path, expiration=60, clock=clock, wall_clock=wall_clock)
+    assert machine.total() == 0
+    assert machine.get('short') is None
+    assert machine.get('long') == 'b'
+    assert machine.extract(('tuple', 1)) == {'x': [1, 2]}
+    assert machine.get('lambda') is None
+    assert machine.total() == 2
+
+    # оставшийся срок сохраняется
+    assert machine['long'].expires == pytest.approx(5.0 + 50)
+
+
+def test_eviction_keeps_disk(path):
+    """
+    Вытесненное из памяти значение остаётся на диске, удалённое - нет
+    """
+    machine = PersistentCachingMachine(path, max_items=2, write_through=True)
+    machine.set('a', '1')
+    machine.set('b', '2')
+    machine.set('c', '3')
+    assert machine.keys() == ['b', 'c']
+    assert len(machine.store) == 3
+
+    assert machine.get('a') == '1'
+    assert 'a' in machine
+
+    machine.delete('a')
+    assert machine.get('a') is None
+    assert len(machine.store) == 2
+
+    machine.clear()
+    assert len(machine.store) == 0
+
+
+def test_restore(path):
+    """
+    Заранее поднять значения с диска
+    """
+    machine = PersistentCachingMachine(path)
+    for i in range(10):
+        machine.assign(i, i * i)
+    machine.snapshot(background=False)
+
+    machine = PersistentCachingMachine(path, max_items=5)
+    assert machine.restore() == 5
+    assert machine.total() == 5
+    assert repr(machine.store) == f'SqliteStore({path!r})'
+
+
+def test_store_purge(path):
+    """
+    Протухшие записи удаляются с диска
+    """
+    store = SqliteStore(path)
+    store.save_many([(b'a', b'1', 10.0), (b'b', b'2', 20.0), (b'c', b'3', None)])
+    assert store.purge(15.0) == 1
+    assert sorted(key for key, _, _ in store.items()) == [b'b', b'c']
+    assert store.load(b'b') == (b'2', 20.0)
+    assert store.load(b'a') is None
+
+
+def test_batch(path):
+    """
+    Пакетные операции затрагивают оба уровня
+    """
+    machine = PersistentCachingMachine(path, max_items=2, write_through=True)
+    assert machine.set_many({'a': '1', 'b': '2', 'c': '3'})
+    assert len(machine.store) == 3
+    assert machine.keys() == ['b', 'c']
+
+    assert machine.get_many(['a', 'b', 'x']) == ['1', '2', None]
+    assert machine.delete_many(['a', 'b']) == 2
+    assert len(machine.store) == 1
+
+    machine = PersistentCachingMachine(path)
+    assert machine.assign_many({'d': 4})
+    assert len(machine.store) == 1
+
+
+def test_overwrite_hides_disk_row(path):
+    """
+    Перезаписанное значение не возвращается со старой строки на диске
+    """
+    machine = PersistentCachingMachine(path, max_items=1)
+    machine.set('k', 'v1')
+    machine.snapshot(background=False)
+    machine.set('k', 'v2')
+    machine.set('other', 'x')
+    assert 'k' not in machine
+    assert machine.get('k') is None
+    assert machine.get_many(['k']) == [None]
+
+    # снимок удаляет устаревшую строку, дальше промах снова идёт на диск
+    machine.snapshot(background=False)
+    assert machine.store.load(pickle.dumps('k', pickle.HIGHEST_PROTOCOL)) is None
+
+    machine.set('k', 'v3')
+    machine.snapshot(background=False)
+    machine.set('other', 'y')
+    assert machine.get('k') == 'v3'
+
+
+def test_read_during_write_transaction(path):
+    """
+    Долгая транзакция записи не задерживает чтение
+    """
+    store = SqliteStore(path)
+    store.save_many([(b'a', b'1', None)])
+
+    with store._lock:
+        store._connection.execute('BEGIN')
+        store._connection.execute("INSERT INTO cache VALUES (x'62', x'32', NULL)")
+
+        result = []
+        reader = threading.Thread(target=lambda: result.append(store.load(b'a')))
+        reader.start()
+        reader.join(1)
+        assert result == [(b'1', None)]
+        assert store.load(b'b') is None
+
+        store._connection.commit()
+
+    assert store.load(b'b') == (b'2', None)
+    store.close()
+
+
+def _gated(machine, gates):
+    """
+    Задержать сериализацию значений снимка, пока не откроют их ворота
+    """
+    to_row = machine._to_row
+
+    def slow_to_row(key, value, *args):
+        gates[value].wait(1)
+        return to_row(key, value, *args)
+
+    machine._to_row = slow_to_row
+
+
+def test_delete_during_snapshot(path):
+    """
+    Удаление во время фоновой записи снимка не возвращает значение на диск
+    """
+    gates = {'v2': threading.Event(), 'x': threading.Event()}
+    machine = PersistentCachingMachine(path)
+    _gated(machine, gates)
+    machine.set('k', 'v2')
+    thread = machine.snapshot()
+    machine.delete('k')
+    gates['v2'].set()
+    thread.join()
+    assert machine.get('k') is None
+
+    machine.set('k', 'v2')
+    machine.set('other', 'x')
+    thread = machine.snapshot()
+    machine.clear()
+    gates['x'].set()
+    thread.join()
+    assert len(machine.store) == 0
+    machine.close()
+
+    machine = PersistentCachingMachine(path)
+    assert machine.get('k') is None
+
+
+def test_overlapping_snapshots(path):
+    """
+    Ключ остаётся скрытым от чтения с диска, пока его не допишут все снимки
+    """
+    gates = {'v1': threading.Event(), 'v2': threading.Event()}
+    machine = PersistentCachingMachine(path)
+    _gated(machine, gates)
+    machine.set('k', 'v1')
+    first = machine.snapshot()
+    machine.set('k', 'v2')
+    second = machine.snapshot()
+
+    gates['v1'].set()
+    first.join()
+    assert machine.evict() == 'k'
+    assert machine.get('k') is None
+
+    gates['v2'].set()
+    second.join()
+    assert machine.get('k') == 'v2'
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты кеширующей машины в общей памяти
+
+"""
+# встроенные модули
+import multiprocessing
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.storage.shared_machine import SharedCachingMachine
+
+
+@pytest.fixture()
+def path(tmp_path):
+    """
+    Путь к файлу таблицы
+    """
+    return str(tmp_path / 'shared_cache')
+
+
+def test_basic(path, wall_clock):
+    """
+    Проверка основных операций
+    """
+    machine = SharedCachingMachine(path, slots=64, slot_size=128, clock=wall_clock)
+    assert machine.set('key', 'значение')
+    assert machine.assign(b'raw', b'\x00\x01')
+    assert machine.get('key') == 'значение'
+    assert machine.extract(b'raw') == b'\x00\x01'
+    assert 'key' in machine
+    assert machine.total() == 2
+    assert set(machine.keys()) == {'key', b'raw'}
+
+    assert machine.set('key', 'другое')
+    assert machine.get('key') == 'другое'
+    assert machine.total() == 2
+
+    assert not machine.set('key', 1)
+    assert not machine.set('big', 'x' * 200)
+    assert machine.get('big') is None
+
+    assert machine.delete('key')
+    assert not machine.delete('key')
+    assert machine.get('key') is None
+
+    machine.clear()
+    assert machine.total() == 0
+    assert repr(machine) == f'SharedCachingMachine({path!r}, slots=64, slot_size=128)'
+
+
+def test_key_types(path):
+    """
+    Строковый и байтовый ключи с одинаковыми байтами - разные элементы
+    """
+    machine = SharedCachingMachine(path, slots=64, slot_size=128)
+    assert machine.assign(b'a', b'bytes')
+    assert machine.set('a', 'str')
+    assert machine.total() == 2
+    assert machine.extract(b'a') == b'bytes'
+    assert machine.get('a') == 'str'
+
+    assert machine.assign(b'\xff', b'x')
+    assert set(machine.keys()) == {'a', b'a', b'\xff'}
+
+    assert machine.delete(b'a')
+    assert machine.get('a') == 'str'
+    assert machine.extract(b'a') is None
+
+
+def test_expiration(path, wall_clock):
+    """
+    Проверка сроков хранения и очистки
+    """
+    machine = SharedCachingMachine(path, slots=64, slot_size=128, expiration=10, clock=wall_clock)
+    machine.set('short', 'a', expires=5)
+    machine.set('default', 'b')
+    machine.set('forever', 'c', expires=10 ** 9)
+
+    wall_clock.now += 6
+    assert machine.get('short') is None
+    assert machine.get('default') == 'b'
+    assert machine.total() == 2
+
+    wall_clock.now += 5
+    assert machine.cleanup() == 2
+    assert machine.keys() == ['forever']
+
+
+def test_collisions_and_eviction(path, wall_clock):
+    """
+    При переполнении окна пробирования вытесняется ближайший к протуханию элемент
+    """
+    machine = SharedCachingMachine(path, slots=4, slot_size=64, max_probe=4, clock=wall_clock)
+    for i in range(4):
+        machine.set(f'key_{i}', str(i), expires=100 + i)
+    assert machine.total() == 4
+
+    machine.set('new', 'value')
+    assert machine.total() == 4
+    assert machine.get('new') == 'value'
+    assert machine.get('key_0') is None
+
+    # удалённые ячейки используются повторно, ключи не дублируются
+    machine.delete('key_1')
+    machine.set('key_2', 'again')
+    machine.set('other', 'x')
+    assert sorted(machine.keys()) == ['key_2', 'key_3', 'new', 'other']
+    assert machine.get('key_2') == 'again'
+
+
+def test_reopen(path):
+    """
+    Размеры берутся из существующего файла
+    """
+    SharedCachingMachine(path, slots=16, slot_size=64).set('key', 'value')
+    machine = SharedCachingMachine(path)
+    assert (machine.slots, machine.slot_size) == (16, 64)
+    assert machine.get('key') == 'value'
+    machine.close()
+
+    with open(path, 'r+b') as file:
+        file.write(b'XXXX')
+    with pytest.raises(ValueError):
+        SharedCachingMachine(path)
+
+    with pytest.raises(ValueError):
+        SharedCachingMachine(path + '_new', slot_size=8)
+
+
+def _child(path, start):
+    """
+    Писатель в отдельном процессе
+    """
+    machine = SharedCachingMachine(path)
+    for i in range(start, start + 50):
+        machine.set(f'key_{i}', f'value_{i}')
+
+
+def test_processes(path):
+    """
+    Несколько процессов пишут в одну таблицу, все записи видны всем
+    """
+    machine = SharedCachingMachine(path, slots=1024, slot_size=64)
+    context = multiprocessing.get_context('fork')
+    children = [context.Process(target=_child, args=(path, n * 50)) for n in range(4)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+
+    assert machine.total() == 200
+    assert all(machine.get(f'key_{i}') == f'value_{i}' for i in range(200))
+
+
+def test_batch(path):
+    """
+    Пакетные операции
+    """
+    machine = SharedCachingMachine(path, slots=64, slot_size=64)
+    assert machine.set_many({'a': '1', 'b': '2'})
+    assert not machine.set_many({'c': 3})
+    assert not machine.assign_many({'d': 'x' * 100, 'e': b'5'})
+    assert machine.get_many(['a', 'b', 'x']) == ['1', '2', None]
+    assert machine.extract_many(['e', 'd'], default=0) == [b'5', 0]
+    assert machine.delete_many(['a', 'e', 'x']) == 2
+    assert not machine.delete('a')
+    assert machine.keys() == ['b']
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Тесты объединения одновременных запросов
+
+"""
+# встроенные модули
+import time
+import asyncio
+import threading
+
+# сторонние модули
+import pytest
+
+# модули проекта
+from trivial_tools.storage.single_flight import SingleFlight, AsyncSingleFlight
+
+
+def test_single_flight():
+    """
+    Потоки с одним ключом получают результат одного вызова
+    """
+    flight = SingleFlight()
+    calls = []
+
+    def func(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return x + 1
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', func, 1)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [2] * 5
+    assert not flight.in_flight('key')
+
+    assert flight.do('key', func, 5) == 6
+    assert calls == [1, 5]
+
+
+def test_single_flight_error():
+    """
+    Исключение ведущего получают все ожидающие
+    """
+    flight = SingleFlight()
+    errors = []
+
+    def func():
+        time.sleep(0.05)
+        raise ValueError('boom')
+
+    def worker():
+        try:
+            flight.do('key', func)
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ['boom'] * 3
+    assert not flight.in_flight('key')
+
+
+def test_async_single_flight():
+    """
+    Корутины с одним ключом получают результат одного вызова
+    """
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def func(x):
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return x + 1
+
+    async def main():
+        results = await asyncio.gather(*(flight.do('key', func, 1) for _ in range(5)))
+        assert not flight.in_flight('key')
+        return results
+
+    assert asyncio.run(main()) == [2] * 5
+    assert calls == [1]
+
+
+def test_async_single_flight_error():
+    """
+    Исключение ведущей корутины получают все ожидающие
+    """
+    flight = AsyncSingleFlight()
+
+    async def func():
+        await asyncio.sleep(0.01)
+        raise ValueError('boom')
+
+    async def main():
+        return await asyncio.gather(*(flight.do('key', func) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(x) for x in results] == [ValueError] * 3
+
+    with pytest.raises(ValueError):
+        asyncio.run(flight.do('key', func))
+
+
+def test_async_single_flight_cancel_leader():
+    """
+    Отмена первой корутины не отменяет вычисление для остальных
+    """
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def func():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'done'
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do('key', func))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do('key', func))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await follower
+        assert leader.cancelled()
+        assert not flight.in_flight('key')
+        return result
+
+    assert asyncio.run(main()) == 'done'
+    assert calls == [1]